@@ -0,0 +1,2 @@
+# api_scraping/__init__.py
+# (can be empty)
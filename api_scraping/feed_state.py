@@ -0,0 +1,99 @@
+# Per-feed ingestion state: HTTP validators and high-water marks
+#
+# For every source we keep the last ETag / Last-Modified the server sent and
+# the newest posted-date seen so far, together with the job IDs posted on that
+# date. The next run sends a conditional request and only keeps jobs that are
+# newer than the high-water mark.
+import json
+import os
+from datetime import datetime, timezone
+
+from core.records import job_key
+
+STATE_PATH = "jsonFiles/.feed_state.json"
+
+
+class FeedState:
+    def __init__(self, path=STATE_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    def conditional_headers(self, name):
+        """Headers that let the server answer 304 if the feed didn't change"""
+        entry = self.data.get(name, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_new(self, name, job):
+        entry = self.data.get(name, {})
+        hwm_date = entry.get("hwm_date")
+        posted = job.get("posted-date")
+        if not hwm_date or not posted:
+            return True
+        return posted > hwm_date or (posted == hwm_date and job.get("jobid") not in entry.get("hwm_ids", []))
+
+    def select_new(self, name, jobs):
+        """Drop jobs at or below the source's high-water mark"""
+        return [job for job in jobs if self.is_new(name, job)]
+
+    def commit(self, name, res, jobs):
+        """Advance the source's validators and high-water mark after a successful write"""
+        entry = self.data.setdefault(name, {})
+        if res is not None and res.status_code == 200:
+            entry["etag"] = res.headers.get("ETag")
+            entry["last_modified"] = res.headers.get("Last-Modified")
+
+        dated = [job for job in jobs if job.get("posted-date")]
+        if dated:
+            newest = max(job["posted-date"] for job in dated)
+            newest_ids = [job.get("jobid") for job in dated if job["posted-date"] == newest]
+            if newest > (entry.get("hwm_date") or ""):
+                entry["hwm_date"] = newest
+                entry["hwm_ids"] = newest_ids
+            elif newest == entry.get("hwm_date"):
+                entry["hwm_ids"] = sorted(set(entry.get("hwm_ids", [])) | set(newest_ids))
+
+        entry["last_run"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        entry["last_new_jobs"] = len(jobs)
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def append_jobs(path, jobs):
+    """Append jobs to a JSON array file, skipping ones already in it. Returns the number added"""
+    try:
+        with open(path) as f:
+            existing = json.load(f)
+    except (OSError, ValueError):
+        existing = []
+
+    seen = {job_key(job) for job in existing}
+    added = 0
+    for job in jobs:
+        key = job_key(job)
+        if key in seen:
+            continue
+        seen.add(key)
+        existing.append(job)
+        added += 1
+
+    if added or not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(existing, f, indent=2)
+        os.replace(tmp_path, path)
+    return added
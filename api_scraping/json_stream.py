@@ -0,0 +1,134 @@
+# Incremental decoding of large JSON arrays from a response stream
+#
+# The job APIs return one big array (RemoteOK) or an object holding one
+# (Arbeitnow's {"data": [...], "links": {...}}). JsonArrayStream decodes the
+# array one element at a time from the raw chunks, so a caller that only wants
+# the first `limit` jobs can stop reading there and never holds the whole
+# document in memory.
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class _Buffer:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def fill(self, min_chars=1):
+        """Read at least min_chars more characters. Returns False at end of stream"""
+        if self.eof:
+            return False
+        parts = [self.text[self.pos:]]
+        added = 0
+        while added < min_chars:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                parts.append(self.decoder.decode(b'', final=True))
+                self.eof = True
+                break
+            self.bytes_read += len(chunk)
+            decoded = self.decoder.decode(chunk)
+            parts.append(decoded)
+            added += len(decoded)
+        self.text = ''.join(parts)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it, '' at end of stream"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found or 'end of stream'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.text, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so a large element isn't re-parsed once per chunk
+            self.fill(max(len(self.text) - self.pos, 1))
+
+
+class JsonArrayStream:
+    """Iterate the elements of a JSON array as the bytes arrive
+
+    `chunks` is any iterable of bytes, e.g. response.iter_content(). With `key`,
+    the document is an object and the array is the value of that member; the
+    other top-level members are collected in `members` (those after the array
+    only once iteration has finished).
+    """
+
+    def __init__(self, chunks, key=None):
+        self.buffer = _Buffer(chunks)
+        self.key = key
+        self.members = {}
+
+    @property
+    def bytes_read(self):
+        return self.buffer.bytes_read
+
+    def __iter__(self):
+        buf = self.buffer
+        if self.key is not None:
+            buf.expect('{')
+            if not self._read_members(until_key=self.key):
+                return
+
+        buf.expect('[')
+        if buf.peek() == ']':
+            buf.pos += 1
+        else:
+            while True:
+                yield buf.value()
+                separator = buf.peek()
+                buf.pos += 1
+                if separator == ']':
+                    break
+                if separator != ',':
+                    raise ValueError(f"Expected ',' or ']' in JSON array, found {separator or 'end of stream'!r}")
+
+        if self.key is not None:
+            if buf.peek() == ',':
+                buf.pos += 1
+            self._read_members()
+
+    def _read_members(self, until_key=None):
+        """Read object members into self.members. Returns True when until_key is reached"""
+        buf = self.buffer
+        while True:
+            if buf.peek() == '}':
+                buf.pos += 1
+                return False
+            name = buf.value()
+            buf.expect(':')
+            if name == until_key:
+                return True
+            self.members[name] = buf.value()
+            if buf.peek() == ',':
+                buf.pos += 1
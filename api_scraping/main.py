@@ -1,190 +1,415 @@
-import requests, json
+# Run from the repo root: python -m api_scraping.main
+import requests
+import asyncio
+import contextvars
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
 import feedparser
+from lxml import etree
+
+from api_scraping.feed_state import FeedState, append_jobs
+from api_scraping.json_stream import JsonArrayStream
+from api_scraping.rss import RecordingChunks, iter_entries
+from core.cdc import capture_changes
+from core.corpus import append_to_corpus
+from core.http_client import get_client
+from core.log import flush_logs, get_logger
+from core.metrics import get_metrics, record_items, serve_metrics, write_report
+from core.profiling import profiled, stage
+from core.search_index import index_jobs
+from core.tracing import span, start_span, write_trace
+from core.skills import tag_jobs
+
+client = get_client()
+state = FeedState()
+logger = get_logger('api_scraping')
+
+OUTPUT_DIR = "jsonFiles"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+REMOTEOK_URL = "https://remoteok.io/api"
+ARBEITNOW_URL = "https://www.arbeitnow.com/api/job-board-api"
+PYTHON_JOBS_URL = "https://www.python.org/jobs/feed/rss/"
+REMOTE_PYTHON_URL = "https://www.remotepython.com/latest/jobs/feed/"
+WEWORKREMOTELY_URL = "https://weworkremotely.com/categories/remote-programming-jobs.rss"
+
+ARBEITNOW_MAX_PAGES = 20
 
-def scrape_post_remoteOk(limit=1000):
-    url = "https://remoteok.io/api"
-    headers = {"User-Agent": "Mozilla/5.0"}
 
+def fetch(url, name=None, stream=False):
+    """GET a feed, conditional on the validators stored for it
+
+    With stream=True only the headers have been read when this returns; the
+    parser pulls the body as it needs it.
+    """
+    headers = dict(HEADERS)
+    if name:
+        headers.update(state.conditional_headers(name))
+    with span('fetch', url=url, stream=stream) as fetch_span:
+        res = client.get(url, headers=headers, timeout=10, stream=stream)
+        fetch_span.set(status=res.status_code)
+    res.raise_for_status()
+    return res
+
+
+def parse_new(source, res, limit):
+    """Map the response and keep only jobs above the source's high-water mark"""
     try:
-        res = requests.get(url, headers=headers, timeout=10)
-        res.raise_for_status()
-        data = res.json()[1:]  # skip metadata
-
-        jobs = []
-        for job in data[:limit]:
-            jobs.append({
-                "jobid": str(job.get("id")),
-                "jobtitle": job.get("title") or job.get("position"),
-                "company": job.get("company"),
-                "location": job.get("location"),
-                "type": job.get("type"), 
-                "salary": None,  # not in API
-                "posted-date":  (
-                    datetime.fromisoformat(job.get("date")).date().isoformat()
-                    if job.get("date") else None
-                ),
-                "description": None,  # not in API
-                "job-link": job.get("url"),
-                "source": "remoteok.io",
-                "tags": job.get("tags") or [],
-                "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
-                "isActive": True,
-                "remote": "remote" in (job.get("tags") or []),
-                "qualification": None,  # not in API
-            })
-
-        with open("jsonFiles/remoteok_jobs.json", "w") as f:
-            json.dump(jobs, f, indent=2)
-
-        print(f"✅ Scraped and saved {len(jobs)} jobs to jobs.json")
+        if res.status_code == 304:
+            return []
+        # Streamed sources parse while the body arrives, so this includes the download
+        with get_metrics().parse_seconds.time(source=source.name, callback='parse'), span('extract'):
+            jobs = source.parse(res, limit)
+        return state.select_new(source.name, jobs)
+    finally:
+        # Streamed responses are usually abandoned before the end of the body
+        res.close()
 
-    except Exception as e:
-        print("❌ Error while scraping:", e)
-
-
-def scrape_post_arbeitnow(limit=1000): 
-    url = "https://www.arbeitnow.com/api/job-board-api"
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    try: 
-        res = requests.get(url, headers=headers, timeout=10 )
-        res.raise_for_status()
-        data = res.json().get("data", [])  
-
-        jobs = []
-        for idx, job in enumerate(data[:limit]):
-            jobs.append({
-                "jobid": f"arbeitnow-{idx}",  # Unique fallback ID
-                "jobtitle": job.get("title"),
-                "company": job.get("company_name"),
-                "location": job.get("location") or job.get("candidate_required_location"),
-                "type": job.get("job_type"), 
-                "salary": job.get("salary"),
-                "posted-date": (
-                    datetime.fromisoformat(job.get("publication_date")).date().isoformat()
-                    if job.get("publication_date") else None
-                ),
-                "description": job.get("description"),
-                "job-link": job.get("url"),
-                "source": "arbeitnow.com",
-                "tags": job.get("tags") or [],
-                "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
-                "isActive": True,
-                "remote": "remote" in (job.get("tags") or []),
-                "qualification": None,
-            })
-
-        with open("jsonFiles/arbeitnow_jobs.json", "w") as f:
-            json.dump(jobs, f, indent=2)
-
-        print(f"✅ Scraped and saved {len(jobs)} jobs to arbeitnow_jobs.json")
 
-    except Exception as e:
-        print("❌ Error while scraping Arbeitnow:", e)
+def save_new(source, res, jobs):
+    """Tag and append new jobs to the source's file, then advance its state"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with span('save', source=source.name, jobs=len(jobs)):
+        with span('normalize'):
+            tag_jobs(jobs)
+        with span('persist', target='json'):
+            added = append_jobs(os.path.join(OUTPUT_DIR, source.filename), jobs)
+        record_items(source.name, added, len(jobs) - added)
+        with span('persist', target='state'):
+            state.commit(source.name, res, jobs)
+            state.save()
+        if added:
+            with span('persist', target='index'):
+                index_jobs(jobs)
+            with span('persist', target='corpus'):
+                append_to_corpus(os.path.splitext(source.filename)[0], jobs)
+            with span('persist', target='cdc'):
+                # Only jobs above the high-water mark were fetched, so nothing can be called deleted
+                capture_changes(source.name, jobs, complete=False)
+    return added
 
 
-def scrape_python_jobs(limit=1000):
-    url = "https://www.python.org/jobs/feed/rss/"
-    feed = feedparser.parse(url)
-    jobs = []
+def scrape_source(source, limit=1000):
+    with span('source', source=source.name):
+        res = fetch(source.url, source.name, source.stream)
+        jobs = parse_new(source, res, limit)
+    added = save_new(source, res, jobs)
+    if res.status_code == 304:
+        logger.info("💤 %s: feed not modified since last run", source.filename)
+    else:
+        logger.info("✅ Scraped %s new jobs, appended %s to %s", len(jobs), added, source.filename)
+
 
-    for entry in feed.entries[:limit]:
+# --- RemoteOK -------------------------------------------------------------
+
+def parse_remoteok(res, limit=1000):
+    # Decode the array element by element and stop reading once limit is reached
+    data = JsonArrayStream(res.iter_content(STREAM_CHUNK_SIZE))
+
+    jobs = []
+    for job in islice(data, 1, limit + 1):  # skip metadata
         jobs.append({
-            "jobid": entry.get("id") or entry.get("link"),
-            "jobtitle": entry.get("title"),
-            "company": entry.get("author", None),
-            "location": None,
-            "type": None,
-            "salary": None,
-            "posted-date": (
-                datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).date().isoformat()
-                if hasattr(entry, "published_parsed") else None
+            "jobid": str(job.get("id")),
+            "jobtitle": job.get("title") or job.get("position"),
+            "company": job.get("company"),
+            "location": job.get("location"),
+            "type": job.get("type"),
+            "salary": None,  # not in API
+            "posted-date":  (
+                datetime.fromisoformat(job.get("date")).date().isoformat()
+                if job.get("date") else None
             ),
-            "description": entry.get("summary"),
-            "job-link": entry.get("link"),
-            "source": "python.org",
-            "tags": [],
+            "description": None,  # not in API
+            "job-link": job.get("url"),
+            "source": "remoteok.io",
+            "tags": job.get("tags") or [],
             "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
             "isActive": True,
-            "remote": True,
-            "qualification": None
+            "remote": "remote" in (job.get("tags") or []),
+            "qualification": None,  # not in API
         })
+    return jobs
 
-    with open("jsonFiles/pythonorg_jobs.json", "w") as f:
-        json.dump(jobs, f, indent=2)
-    print(f"✅ Scraped and saved {len(jobs)} jobs to pythonorg_jobs.json")
 
-def scrape_remote_python(limit=1000):
-    url = "https://www.remotepython.com/latest/jobs/feed/"
-    feed = feedparser.parse(url)
+def scrape_post_remoteOk(limit=1000):
+    try:
+        scrape_source(SOURCES_BY_NAME["remoteok.io"], limit)
+
+    except Exception as e:
+        logger.error("❌ Error while scraping: %s", e)
+
+
+# --- Arbeitnow ------------------------------------------------------------
+
+def _close_prefetched(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def iter_arbeitnow_pages(res, limit=1000, max_pages=ARBEITNOW_MAX_PAGES):
+    """Yield the raw jobs of each Arbeitnow page, following links.next
+
+    As soon as a page's cursor is known the next page is requested in the
+    background, so it downloads while the caller maps the current one. No
+    further page is requested once `limit` jobs have been yielded. A later
+    page that fails ends the paging; the jobs already yielded stand.
+    """
+    pool = ThreadPoolExecutor(max_workers=1)
+    pending = None
+    yielded = 0
+    try:
+        for page in range(1, max_pages + 1):
+            data = JsonArrayStream(res.iter_content(STREAM_CHUNK_SIZE), key="data")
+            try:
+                jobs = list(data)
+            except (requests.RequestException, ValueError) as e:
+                if page == 1:
+                    raise
+                logger.warning("⚠️ arbeitnow.com: page %s failed, keeping %s jobs: %s", page, yielded, e)
+                return
+            finally:
+                res.close()
+            yielded += len(jobs)
+
+            next_url = (data.members.get("links") or {}).get("next")
+            if next_url and jobs and yielded < limit and page < max_pages:
+                # copy_context: the prefetch belongs to this source's trace
+                pending = pool.submit(contextvars.copy_context().run, fetch, next_url, stream=True)
+            yield jobs
+
+            if pending is None:
+                return
+            future, pending = pending, None
+            try:
+                res = future.result()
+            except requests.RequestException as e:
+                logger.warning("⚠️ arbeitnow.com: page %s failed, keeping %s jobs: %s", page + 1, yielded, e)
+                return
+    finally:
+        # The caller stopped early: don't leave a prefetched page open
+        if pending is not None and not pending.cancel():
+            pending.add_done_callback(_close_prefetched)
+        pool.shutdown(wait=False)
+
+
+def parse_arbeitnow(res, limit=1000):
+    # Pages are newest first, so the first job we've already ingested means
+    # everything after it is old too
+    pages = iter_arbeitnow_pages(res, limit)
+
     jobs = []
+    try:
+        for page in pages:
+            for job in page:
+                mapped = map_arbeitnow_job(job)
+                if len(jobs) >= limit or not state.is_new("arbeitnow.com", mapped):
+                    return jobs
+                jobs.append(mapped)
+    finally:
+        pages.close()
+    return jobs
 
-    for entry in feed.entries[:limit]:
-        jobs.append({
-            "jobid": entry.get("id") or entry.get("link"),
-            "jobtitle": entry.get("title"),
-            "company": entry.get("author", None),
-            "location": None,
-            "type": None,
-            "salary": None,
-            "posted-date": (
-                datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                        .date().isoformat()
-                if hasattr(entry, "published_parsed") else None
-            ),
-            "description": entry.get("summary"),
-            "job-link": entry.get("link"),
-            "source": "remotepython.com",
-            "tags": [],
-            "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
-            "isActive": True,
-            "remote": True,
-            "qualification": None
-        })
 
-    with open("jsonFiles/remotepython_jobs.json", "w") as f:
-        json.dump(jobs, f, indent=2)
-    print(f"✅ Scraped and saved {len(jobs)} jobs to remotepython_jobs.json")
+def map_arbeitnow_job(job):
+    posted = None
+    if job.get("created_at"):
+        posted = datetime.fromtimestamp(job["created_at"], timezone.utc).date().isoformat()
+    elif job.get("publication_date"):
+        posted = datetime.fromisoformat(job["publication_date"]).date().isoformat()
 
+    return {
+        # The slug is stable across runs and pages; the list position is not
+        "jobid": f"arbeitnow-{job.get('slug') or job.get('url')}",
+        "jobtitle": job.get("title"),
+        "company": job.get("company_name"),
+        "location": job.get("location") or job.get("candidate_required_location"),
+        "type": job.get("job_type"),
+        "salary": job.get("salary"),
+        "posted-date": posted,
+        "description": job.get("description"),
+        "job-link": job.get("url"),
+        "source": "arbeitnow.com",
+        "tags": job.get("tags") or [],
+        "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
+        "isActive": True,
+        "remote": "remote" in (job.get("tags") or []),
+        "qualification": None,
+    }
 
-def scrape_weworkremotely(limit=1000):
-    url = "https://weworkremotely.com/categories/remote-programming-jobs.rss"
-    feed = feedparser.parse(url)
+
+def scrape_post_arbeitnow(limit=1000):
+    try:
+        scrape_source(SOURCES_BY_NAME["arbeitnow.com"], limit)
+
+    except Exception as e:
+        logger.error("❌ Error while scraping Arbeitnow: %s", e)
+
+
+# --- RSS feeds ------------------------------------------------------------
+
+def map_feed_entry(entry, source):
+    return {
+        "jobid": entry.get("id") or entry.get("link"),
+        "jobtitle": entry.get("title"),
+        "company": entry.get("author", None),
+        "location": None,
+        "type": None,
+        "salary": None,
+        "posted-date": (
+            datetime(*entry.get("published_parsed")[:6], tzinfo=timezone.utc).date().isoformat()
+            if entry.get("published_parsed") else None
+        ),
+        "description": entry.get("summary"),
+        "job-link": entry.get("link"),
+        "source": source,
+        "tags": [],
+        "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
+        "isActive": True,
+        "remote": True,
+        "qualification": None
+    }
+
+
+def parse_feed(res, limit=1000, source=None):
+    chunks = RecordingChunks(res.iter_content(STREAM_CHUNK_SIZE))
     jobs = []
+    try:
+        for entry in islice(iter_entries(chunks), limit):
+            # lxml accepts the feed, so the fallback won't need the raw bytes
+            chunks.stop()
+            jobs.append(map_feed_entry(entry, source))
+        return jobs
+    except etree.XMLSyntaxError:
+        if not chunks.recording:
+            logger.warning("⚠️ %s: feed broke off after %s entries, keeping those", source, len(jobs))
+            return jobs
+        # feedparser copes with the broken feeds lxml refuses
+        logger.warning("⚠️ %s: malformed feed, falling back to feedparser", source)
+        feed = feedparser.parse(chunks.replay(), response_headers=dict(res.headers))
+        return [map_feed_entry(entry, source) for entry in feed.entries[:limit]]
+
+
+def scrape_feed(name, limit=1000):
+    try:
+        scrape_source(SOURCES_BY_NAME[name], limit)
+    except requests.RequestException as e:
+        logger.error("❌ Error fetching %s: %s", SOURCES_BY_NAME[name].url, e)
+
+
+def scrape_python_jobs(limit=1000):
+    scrape_feed("python.org", limit)
+
+def scrape_remote_python(limit=1000):
+    scrape_feed("remotepython.com", limit)
 
-    for entry in feed.entries[:limit]:
-        jobs.append({
-            "jobid": entry.get("id") or entry.get("link"),
-            "jobtitle": entry.get("title"),
-            "company": entry.get("author") if "author" in entry else None,
-            "location": None,
-            "type": None,
-            "salary": None,
-            "posted-date": (
-                datetime(*entry.published_parsed[:6], tzinfo=timezone.utc).date().isoformat()
-                if "published_parsed" in entry else None
-            ),
-            "description": entry.get("summary"),
-            "job-link": entry.get("link"),
-            "source": "weworkremotely",
-            "tags": [],
-            "scrapedAt": datetime.now(timezone.utc).date().isoformat(),
-            "isActive": True,
-            "remote": True,
-            "qualification": None
-        })
 
-    with open("jsonFiles/weworkremotely_jobs.json", "w") as f:
-        json.dump(jobs, f, indent=2)
-    print(f"✅ Scraped and saved {len(jobs)} jobs to weworkremotely_jobs.json")
+def scrape_weworkremotely(limit=1000):
+    scrape_feed("weworkremotely", limit)
+
+
+# --- Concurrent runner ----------------------------------------------------
+
+# parse(response, limit) turns a fetched response into jobs.
+# Register new feeds here and run_sources() picks them up.
+# Sources with stream=True are parsed straight off the socket.
+Source = namedtuple("Source", "name url parse filename stream timeout", defaults=(False, 30))
+
+SOURCES = [
+    Source("remoteok.io", REMOTEOK_URL, parse_remoteok, "remoteok_jobs.json", stream=True),
+    Source("arbeitnow.com", ARBEITNOW_URL, parse_arbeitnow, "arbeitnow_jobs.json", stream=True),
+    Source("weworkremotely", WEWORKREMOTELY_URL, partial(parse_feed, source="weworkremotely"),
+           "weworkremotely_jobs.json", stream=True),
+    Source("python.org", PYTHON_JOBS_URL, partial(parse_feed, source="python.org"),
+           "pythonorg_jobs.json", stream=True),
+    Source("remotepython.com", REMOTE_PYTHON_URL, partial(parse_feed, source="remotepython.com"),
+           "remotepython_jobs.json", stream=True),
+]
+SOURCES_BY_NAME = {source.name: source for source in SOURCES}
+
 
+class JobWriter:
+    """Single writer task; sources hand it their jobs as soon as they are parsed"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.saved = {}
+
+    async def run(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                break
+            source, res, jobs = item
+            try:
+                added = await asyncio.to_thread(save_new, source, res, jobs)
+                self.saved[source.name] = added
+                logger.info("✅ %s: appended %s new jobs to %s", source.name, added, source.filename)
+            except Exception as e:
+                logger.error("❌ Error saving %s: %s", source.filename, e)
+
+    async def put(self, source, res, jobs):
+        await self.queue.put((source, res, jobs))
+
+    async def close(self):
+        await self.queue.put(None)
+
+
+async def run_source(source, writer, limit):
+    start = time.perf_counter()
+    try:
+        # Fetch and parse run in worker threads; parsing starts the moment this
+        # source's payload arrives, regardless of the other sources. The worker
+        # threads inherit this task's context, and with it the span.
+        with start_span('source', source=source.name) as source_span:
+            res = await asyncio.wait_for(asyncio.to_thread(fetch, source.url, source.name, source.stream),
+                                         source.timeout)
+            jobs = await asyncio.wait_for(asyncio.to_thread(parse_new, source, res, limit), source.timeout)
+            source_span.set(jobs=len(jobs))
+    except asyncio.TimeoutError:
+        logger.warning("⏱️ %s timed out after %ss", source.name, source.timeout)
+        return
+    except Exception as e:
+        logger.error("❌ Error while scraping %s: %s", source.name, e)
+        return
+    if res.status_code == 304:
+        logger.info("💤 %s: not modified since last run", source.name)
+    else:
+        logger.info("📥 %s: %s new jobs in %.2fs", source.name, len(jobs), time.perf_counter() - start)
+    await writer.put(source, res, jobs)
+
+
+async def run_sources(limit=100, sources=None):
+    """Fetch every source concurrently and write results through one writer"""
+    sources = SOURCES if sources is None else sources
+    writer = JobWriter()
+    writer_task = asyncio.create_task(writer.run())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_source(source, writer, limit) for source in sources))
+    await writer.close()
+    await writer_task
+
+    logger.info("🏁 %s/%s sources saved in %.2fs", len(writer.saved), len(sources), time.perf_counter() - start)
+    return writer.saved
+
+
+@profiled('api_scraping')
+def main():
+    serve_metrics()
+    with stage('sources'):
+        asyncio.run(run_sources(limit=100))
+    flush_logs()
+    client.report()
+    write_report('api_scraping')
+    write_trace('api_scraping')
 
 
 if __name__ == "__main__":
-    scrape_post_remoteOk(limit=100)
-    scrape_post_arbeitnow(limit=100)
-    scrape_weworkremotely(limit=100)
-    scrape_python_jobs(limit=100)
-    scrape_remote_python(limit=100)
-   
+    main()
+
@@ -0,0 +1,130 @@
+# Streaming RSS / Atom parser for the job feeds
+#
+# feedparser builds a rich object for every entry and sanitizes its HTML, only
+# for us to flatten it into a dict straight away. iter_entries() runs lxml's
+# pull parser over the raw response chunks instead, pulls out just the fields
+# map_feed_entry() reads (under the same names feedparser uses) and frees
+# every item once it's been handled. HTML in summaries is passed through as
+# the feed sent it.
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from lxml import etree
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+
+ENTRY_TAGS = {"item", RSS1 + "item", ATOM + "entry"}
+# Bytes RecordingChunks keeps for a fallback parse before giving up on one
+RECORD_LIMIT = 8 * 1024 * 1024
+
+
+def parse_date(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom, dc:date) date as a UTC struct_time"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.utctimetuple()
+
+
+def _text(elem):
+    if elem is None or elem.text is None:
+        return None
+    return elem.text.strip()
+
+
+def _atom_link(entry):
+    for link in entry.iterfind(ATOM + "link"):
+        if link.get("rel", "alternate") == "alternate":
+            return link.get("href")
+    return None
+
+
+def entry_fields(entry):
+    """Flatten one <item> / <entry> element into the fields the job mapping uses"""
+    if entry.tag == ATOM + "entry":
+        author = entry.find(ATOM + "author")
+        return {
+            "id": _text(entry.find(ATOM + "id")),
+            "title": _text(entry.find(ATOM + "title")),
+            "link": _atom_link(entry),
+            "author": _text(author.find(ATOM + "name")) if author is not None else None,
+            "summary": _text(entry.find(ATOM + "summary")) or _text(entry.find(ATOM + "content")),
+            "published_parsed": parse_date(_text(entry.find(ATOM + "published"))),
+        }
+
+    ns = RSS1 if entry.tag == RSS1 + "item" else ""
+    return {
+        "id": _text(entry.find("guid")) or entry.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"),
+        "title": _text(entry.find(ns + "title")),
+        "link": _text(entry.find(ns + "link")),
+        "author": _text(entry.find("author")) or _text(entry.find(DC + "creator")),
+        "summary": _text(entry.find(ns + "description")),
+        "published_parsed": parse_date(_text(entry.find("pubDate")) or _text(entry.find(DC + "date"))),
+    }
+
+
+def iter_entries(chunks):
+    """Yield feed entries as dicts while the bytes arrive
+
+    `chunks` is any iterable of bytes, e.g. response.iter_content(). Raises
+    lxml.etree.XMLSyntaxError on a malformed feed, possibly after some
+    entries have already been yielded.
+    """
+    parser = etree.XMLPullParser(events=("end",), tag=ENTRY_TAGS,
+                                 resolve_entities=False, no_network=True, huge_tree=True)
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, entry in parser.read_events():
+            yield entry_fields(entry)
+            # Drop the entry and everything before it so memory stays flat
+            entry.clear()
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+    parser.close()
+    for _, entry in parser.read_events():
+        yield entry_fields(entry)
+
+
+class RecordingChunks:
+    """Pass chunks through while keeping a copy, so a failed parse can start over
+
+    Recording stops at stop() (the parse is going fine) or once `limit`
+    bytes are held; after that the stream can no longer be replayed.
+    """
+
+    def __init__(self, chunks, limit=RECORD_LIMIT):
+        self.chunks = iter(chunks)
+        self.limit = limit
+        self.seen = []
+        self.size = 0
+        self.recording = True
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.recording:
+                self.seen.append(chunk)
+                self.size += len(chunk)
+                if self.size > self.limit:
+                    self.stop()
+            yield chunk
+
+    def stop(self):
+        self.recording = False
+        self.seen = []
+
+    def replay(self):
+        """Everything read so far followed by whatever is left of the stream"""
+        if not self.recording:
+            raise ValueError("recording stopped, the stream can't be replayed")
+        return b"".join(self.seen) + b"".join(self.chunks)
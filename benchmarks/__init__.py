@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Offline benchmarks, run from the repo root: python -m benchmarks.<name>
@@ -0,0 +1,183 @@
+# Load test for the read API over a synthetic corpus
+#
+# The server runs in its own process over a temp corpus; client threads keep
+# one HTTP/1.1 connection each and replay a mix of queries: first pages,
+# follow-up pages through next_cursor, and revalidations with If-None-Match.
+# Afterwards a batch of jobs is appended to the corpus to check that the
+# server picks up the ingest and that changed pages get new ETags.
+#
+#   python -m benchmarks.api_server --jobs 50000 --clients 16 --duration 10
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from core.api_server import JobService, make_server
+from core.corpus import CorpusWriter
+
+SOURCES = ('LinkedIn', 'Shine.com', 'TimesJobs.com', 'Internshala.com', 'remoteok.io')
+JOB_TYPES = ('Full Time', 'Part Time', 'Internship', 'Contract')
+CITIES = ('Bangalore', 'Pune', 'Hyderabad', 'Mumbai', 'Delhi', 'Chennai', 'Remote')
+TITLES = ('Python Developer', 'Data Analyst', 'Java Engineer', 'React Developer', 'DevOps Engineer')
+
+
+def synthetic_jobs(count, start=0, seed=3):
+    rng = random.Random(seed + start)
+    today = date.today()
+    return [{
+        'title': rng.choice(TITLES),
+        'company': f'Company {rng.randrange(5000)}',
+        'location': rng.choice(CITIES),
+        'link': f'https://jobs.example.com/view/{i}',
+        'source': rng.choice(SOURCES),
+        'job_type': rng.choice(JOB_TYPES),
+        'salary': f'{rng.randint(3, 20)}-{rng.randint(21, 40)} LPA',
+        'posted_on': (today - timedelta(days=rng.randrange(60))).isoformat(),
+        'description': 'Synthetic job',
+    } for i in range(start, start + count)]
+
+
+def query_pool(count, seed=9):
+    rng = random.Random(seed)
+    today = date.today()
+    queries = []
+    for _ in range(count):
+        params = {}
+        if rng.random() < 0.6:
+            params['source'] = rng.choice(SOURCES)
+        if rng.random() < 0.4:
+            params['location'] = rng.choice(CITIES).lower()
+        if rng.random() < 0.3:
+            params['job_type'] = rng.choice(JOB_TYPES)
+        if rng.random() < 0.3:
+            params['posted_after'] = (today - timedelta(days=rng.randrange(30))).isoformat()
+        params['limit'] = rng.choice((10, 20, 50))
+        queries.append(params)
+    return queries
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(corpus_path, port, ready):
+    service = JobService(corpus_path)
+    service.watch(interval=0.5)
+    server = make_server(service, port=port)
+    ready.set()
+    server.serve_forever()
+
+
+def get(conn, path, etag=None):
+    headers = {'If-None-Match': etag} if etag else {}
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, response.getheader('ETag'), body
+
+
+def client(port, queries, deadline, latencies, statuses, seed):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    etags = {}
+    cursors = {}
+    while time.perf_counter() < deadline:
+        params = dict(rng.choice(queries))
+        key = json.dumps(params, sort_keys=True)
+        roll = rng.random()
+        if roll < 0.3 and cursors.get(key):
+            params['cursor'] = cursors[key]
+        path = '/jobs?' + urlencode(params)
+        etag = etags.get(path) if roll >= 0.7 else None
+        start = time.perf_counter()
+        status, new_etag, body = get(conn, path, etag)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            etags[path] = new_etag
+            if 'cursor' not in params:
+                cursors[key] = json.loads(body)['next_cursor']
+    conn.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=50000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--queries', type=int, default=300, help='distinct queries in the mix')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_path = os.path.join(tmp, 'corpus')
+        writer = CorpusWriter('synthetic', corpus_path)
+        writer.append(synthetic_jobs(args.jobs))
+        writer.compact()
+
+        port = free_port()
+        ready = multiprocessing.Event()
+        server = multiprocessing.Process(target=serve, args=(corpus_path, port, ready), daemon=True)
+        server.start()
+        ready.wait(120)
+
+        queries = query_pool(args.queries)
+        latencies = []
+        statuses = {}
+        deadline = time.perf_counter() + args.duration
+        threads = [threading.Thread(target=client, args=(port, queries, deadline, latencies, statuses, i))
+                   for i in range(args.clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        # New ingest: the first page of an unfiltered query must change
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        _, before, _ = get(conn, '/jobs?limit=20')
+        generation = json.loads(get(conn, '/stats')[2])['generation']
+        fresh = synthetic_jobs(100, start=args.jobs)
+        for job in fresh:
+            # Posted today and keyed ahead of every existing job from today
+            job['posted_on'] = date.today().isoformat()
+            job['link'] = job['link'].replace('/view/', '/new/')
+        writer.append(fresh)
+        waited = time.perf_counter()
+        while json.loads(get(conn, '/stats')[2])['generation'] == generation:
+            time.sleep(0.05)
+        waited = time.perf_counter() - waited
+        status, after, _ = get(conn, '/jobs?limit=20', before)
+        stats = json.loads(get(conn, '/stats')[2])
+        conn.close()
+        server.terminate()
+
+    print(f"\n{'='*60}")
+    print(f"📊 {args.jobs:,} jobs, {args.clients} clients, {args.queries} distinct queries, "
+          f"{os.cpu_count()} CPUs")
+    print(f"  Throughput: {len(latencies) / elapsed:8,.0f} requests/s  ({len(latencies):,} in {elapsed:.1f}s)")
+    print(f"  Latency:    p50 {percentile(latencies, 50) * 1000:6.2f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:6.2f} ms")
+    print(f"  Responses:  {dict(sorted(statuses.items()))}")
+    print(f"  Ingest picked up after {waited:.2f}s; first page revalidation -> {status} "
+          f"(ETag changed: {before != after})")
+    print(f"  Server: {stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Full json decode vs streaming decode with early stop on a large RemoteOK-style payload
+#
+#   python -m benchmarks.api_streaming --jobs 50000 --limit 100
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from itertools import islice
+
+import requests
+
+from api_scraping.json_stream import JsonArrayStream
+from benchmarks.fixtures import StandInServer
+
+WORDS = ('python django react senior backend engineer remote data platform team '
+         'kubernetes growth startup build ship scale product customers').split()
+
+
+def remoteok_fixture(count):
+    rng = random.Random(7)
+    payload = [{"legal": "API Terms of Service: please link back to the job on RemoteOK"}]
+    for i in range(count):
+        payload.append({
+            "id": str(900000 - i),
+            "slug": f"remote-job-{i}",
+            "date": "2025-07-25T10:00:00+00:00",
+            "company": f"Company {i % 997}",
+            "position": " ".join(rng.choices(WORDS, k=4)).title(),
+            "tags": rng.sample(WORDS, 5),
+            "description": " ".join(rng.choices(WORDS, k=300)),
+            "location": "Worldwide",
+            "url": f"https://remoteok.com/remote-jobs/{900000 - i}",
+        })
+    return json.dumps(payload).encode("utf-8")
+
+
+def full_decode(url, limit):
+    res = requests.get(url)
+    data = res.json()[1:]
+    return data[:limit]
+
+
+def stream_decode(url, limit):
+    res = requests.get(url, stream=True)
+    try:
+        return list(islice(JsonArrayStream(res.iter_content(64 * 1024)), 1, limit + 1))
+    finally:
+        res.close()
+
+
+def measure(func, url, limit):
+    tracemalloc.start()
+    start = time.perf_counter()
+    jobs = func(url, limit)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return jobs, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    body = remoteok_fixture(args.jobs)
+    print(f"📦 Fixture: {args.jobs} jobs, {len(body) / 1e6:.1f} MB")
+
+    with StandInServer(lambda path, query: (200, "application/json", body)) as server:
+        for limit in (args.limit, args.jobs):
+            full_jobs, full_time, full_peak = measure(full_decode, server.url, limit)
+            stream_jobs, stream_time, stream_peak = measure(stream_decode, server.url, limit)
+            print(f"\n📊 limit={limit}")
+            print(f"  res.json():       {full_time * 1000:8.1f} ms   peak {full_peak / 1e6:7.1f} MB")
+            print(f"  JsonArrayStream:  {stream_time * 1000:8.1f} ms   peak {stream_peak / 1e6:7.1f} MB")
+            print(f"  Same jobs: {full_jobs == stream_jobs}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Corpus lookups and start-up at scale versus loading a JSON array
+#
+# Builds a synthetic corpus (real field names, synthetic values) in a temp
+# directory, then measures point-lookup latency, hash-range scans, appends,
+# and the time for a fresh process to answer its first lookup. The JSON
+# baseline loads an outputs/-style array of --baseline-records records; at a
+# million records json.load needs more memory than this box has to spare.
+#
+#   python -m benchmarks.corpus --records 1000000
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from core.corpus import CorpusReader, CorpusWriter
+from core.search_index import key_hash
+
+WORDS = ('python developer engineer senior junior data analyst java react cloud aws remote '
+         'bangalore pune hyderabad mumbai delhi chennai fresher experience team product').split()
+
+
+def synthetic_jobs(count, start=0, seed=5):
+    rng = random.Random(seed + start)
+    for i in range(start, start + count):
+        yield {
+            'title': ' '.join(rng.choices(WORDS, k=4)).title(),
+            'link': f'https://jobs.example.com/view/{i}',
+            'company': f'Company {rng.randrange(20000)}',
+            'location': rng.choice(WORDS),
+            'salary': f'{rng.randint(3, 30)}-{rng.randint(31, 60)} LPA',
+            'description': ' '.join(rng.choices(WORDS, k=30)),
+            'posted_date': f'{rng.randint(1, 30)} days ago',
+            'source': 'Synthetic',
+            'scraped_at': '2025-07-20T10:00:00',
+        }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def time_process(code, repeat=5):
+    """Best wall time of a fresh interpreter running code"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True, cwd=os.getcwd())
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--baseline-records', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'corpus')
+        writer = CorpusWriter('synthetic', path)
+        start = time.perf_counter()
+        batch = []
+        for job in synthetic_jobs(args.records):
+            batch.append(job)
+            if len(batch) == 10000:
+                writer.append(batch)
+                batch = []
+        writer.append(batch)
+        writer.compact()
+        build_time = time.perf_counter() - start
+        data_size = os.path.getsize(os.path.join(path, 'synthetic.jsonl'))
+        index_size = os.path.getsize(os.path.join(path, 'synthetic.idx'))
+
+        reader = CorpusReader('synthetic', path)
+        rng = random.Random(1)
+        keys = [f'https://jobs.example.com/view/{rng.randrange(args.records)}' for _ in range(args.lookups)]
+        latencies = []
+        for key in keys:
+            start = time.perf_counter()
+            record = reader.get(key)
+            latencies.append(time.perf_counter() - start)
+            assert record['link'] == key
+        missing = [f'https://jobs.example.com/missing/{i}' for i in range(1000)]
+        start = time.perf_counter()
+        assert all(reader.get(key) is None for key in missing)
+        miss_time = (time.perf_counter() - start) / len(missing)
+
+        start = time.perf_counter()
+        scanned = sum(1 for _ in reader.scan(0, 2 ** 58))
+        scan_time = time.perf_counter() - start
+
+        # Incremental appends go to the tail; a refreshed reader sees them at once
+        start = time.perf_counter()
+        writer.append(synthetic_jobs(1000, start=args.records))
+        append_time = time.perf_counter() - start
+        reader.refresh()
+        assert reader.get(f'https://jobs.example.com/view/{args.records + 999}') is not None
+        # ...and so do range scans, with a re-scraped job's newest version shadowing the indexed one
+        rescraped = dict(next(synthetic_jobs(1)), title='Rescraped')
+        writer.append([rescraped])
+        reader.refresh()
+        appended = sum(1 for i in range(args.records, args.records + 1000)
+                       if key_hash(f'https://jobs.example.com/view/{i}') < 2 ** 58)
+        assert sum(1 for _ in reader.scan(0, 2 ** 58)) == scanned + appended
+        rescraped_hash = key_hash(rescraped['link'])
+        assert [job['title'] for job in reader.scan(rescraped_hash, rescraped_hash + 1)] == ['Rescraped']
+
+        # A job both the corpus and the baseline file hold
+        key = f'https://jobs.example.com/view/{min(args.records, args.baseline_records) - 1}'
+        startup = time_process(
+            f"from core.corpus import CorpusReader; CorpusReader('synthetic', {path!r}).get({key!r})")
+        interpreter = time_process("import core.corpus")
+        reader.close()
+
+        baseline_path = os.path.join(tmp, 'baseline.json')
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(list(synthetic_jobs(args.baseline_records)), f, indent=2, ensure_ascii=False)
+        baseline = time_process(
+            f"import json; jobs = json.load(open({baseline_path!r}, encoding='utf-8')); "
+            f"next(job for job in jobs if job['link'] == {key!r})", repeat=1)
+        bare_interpreter = time_process("import json")
+
+    print(f"\n{'='*60}")
+    print(f"📊 {args.records:,} records, {data_size / 2**20:.0f} MB JSONL + {index_size / 2**20:.1f} MB index "
+          f"(built in {build_time:.1f}s)")
+    print(f"  Lookup (hit):    p50 {percentile(latencies, 50) * 1e6:6.1f} µs   "
+          f"p99 {percentile(latencies, 99) * 1e6:6.1f} µs")
+    print(f"  Lookup (miss):       {miss_time * 1e6:6.1f} µs")
+    print(f"  Range scan:      {scanned:,} records (1/64 of the hash space) at "
+          f"{scanned / scan_time:,.0f} records/s")
+    print(f"  Append 1,000:        {append_time * 1000:6.1f} ms")
+    # Differences under a few ms are within process start-up noise
+    print(f"  Fresh process, first lookup: {max(startup - interpreter, 0) * 1000:5.0f} ms on top of "
+          f"{interpreter:.2f}s interpreter + imports")
+    print(f"  json.load baseline ({args.baseline_records:,} records): {baseline - bare_interpreter:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
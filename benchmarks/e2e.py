@@ -0,0 +1,236 @@
+# End-to-end scraper benchmark against a recorded fixture corpus
+#
+# Every scraper runs in a fresh process inside a scratch directory (outputs/
+# is never touched), with its transport pointed at a ReplayServer. What gets
+# measured is the whole path from request to saved output: fetch, parse,
+# skill tagging, search index, corpus and change log. In replay mode the
+# politeness delays are switched off (DOWNLOAD_DELAY, the TimesJobs token
+# bucket); the Selenium scrapers keep their fixed waits, and are skipped when
+# no browser can be started.
+#
+# Per scraper it reports pages/s and items/s over wall time, CPU seconds and
+# peak RSS of the scraper process, from the same counters core.metrics keeps.
+# With --record the scrapers run against the live sites instead, at their
+# normal pace, and every response is added to the corpus.
+#
+#   python -m benchmarks.e2e --latency 0.05 --error-rate 0.02
+#   python -m benchmarks.e2e --record --corpus benchmarks/recordings
+import argparse
+import importlib
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from benchmarks.replay import (DEFAULT_CORPUS, QUERY, FixtureCorpus, RecordingAdapter, ReplayAdapter,
+                               ReplayServer, install_adapter, record_driver, replay_driver,
+                               scrapy_settings, synthesize)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_timesjobs(mode, target, pages):
+    from core.checkpoint import CheckpointStore
+    from core.spiders.TimesJobs_jobs import TimesJobsScraper
+    scraper = TimesJobsScraper()
+    rate = 1000.0 if mode == 'replay' else 0.5
+    jobs = scraper.scrape_timesjobs_concurrent(QUERY, pages, checkpoint=CheckpointStore('timesjobs', ':memory:'),
+                                               max_workers=4, rate=rate, burst=4)
+    scraper.save_jobs(jobs, 'outputs/scrapedTimes_jobs.json')
+
+
+def run_scrapy(mode, target, spider_path, **spider_args):
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    settings = get_project_settings()
+    overrides = dict(scrapy_settings(mode, target), LOG_LEVEL='WARNING', TELNETCONSOLE_ENABLED=False)
+    if mode == 'replay':
+        overrides.update(DOWNLOAD_DELAY=0, RANDOMIZE_DOWNLOAD_DELAY=False, AUTOTHROTTLE_ENABLED=False,
+                         CONCURRENT_REQUESTS=8, CONCURRENT_REQUESTS_PER_DOMAIN=8)
+    # Above the spiders' custom_settings
+    settings.setdict(overrides, priority='cmdline')
+    module, _, name = spider_path.rpartition('.')
+    process = CrawlerProcess(settings)
+    process.crawl(getattr(importlib.import_module(module), name), **spider_args)
+    process.start()
+
+
+def run_timesjobs_spider(mode, target, pages):
+    run_scrapy(mode, target, 'core.spiders.timesjobs_spider.TimesJobsJobScraper', pages=pages)
+
+
+def run_freshersworld(mode, target, pages):
+    run_scrapy(mode, target, 'core.spiders.freshersworld_jobs.FreshersworldJobScraper')
+
+
+def run_internshala(mode, target, pages):
+    run_scrapy(mode, target, 'core.spiders.internshala_jobs.InternshalaJobScraper')
+
+
+def run_api_sources(mode, target, pages):
+    import asyncio
+    from api_scraping import main as api
+    asyncio.run(api.run_sources(limit=100))
+
+
+def run_selenium(mode, target, scraper):
+    if mode == 'replay':
+        replay_driver(scraper.driver, target)
+    else:
+        record_driver(scraper.driver, FixtureCorpus(target))
+
+
+def run_linkedin(mode, target, pages):
+    from core.checkpoint import CheckpointStore
+    from core.spiders.linkedIn_jobs import LinkedInSeleniumScraper
+    scraper = LinkedInSeleniumScraper(headless=True)
+    try:
+        run_selenium(mode, target, scraper)
+        jobs = scraper.scrape_linkedin_jobs(QUERY, 'India', pages, checkpoint=CheckpointStore('linkedin', ':memory:'))
+        scraper.save_jobs(jobs, 'outputs/linkedin_jobs.json')
+    finally:
+        scraper.close()
+
+
+def run_shine(mode, target, pages):
+    from core.checkpoint import CheckpointStore
+    from core.spiders.Shine_jobs import FastShineSeleniumScraper
+    scraper = FastShineSeleniumScraper(headless=True)
+    try:
+        run_selenium(mode, target, scraper)
+        jobs = scraper.fast_scrape_shine(QUERY, 'India', max_jobs=150, checkpoint=CheckpointStore('shine', ':memory:'))
+        scraper.save_jobs(jobs, 'outputs/shine_jobs.json')
+    finally:
+        scraper.close()
+
+
+# name -> (runner, modules imported before the clock starts)
+SCRAPERS = {
+    'timesjobs': (run_timesjobs, ['core.spiders.TimesJobs_jobs']),
+    'timesjobs_spider': (run_timesjobs_spider, ['scrapy.crawler', 'core.spiders.timesjobs_spider']),
+    'freshersworld': (run_freshersworld, ['scrapy.crawler', 'core.spiders.freshersworld_jobs']),
+    'internshala': (run_internshala, ['scrapy.crawler', 'core.spiders.internshala_jobs']),
+    'api_sources': (run_api_sources, ['api_scraping.main']),
+    'linkedin': (run_linkedin, ['core.spiders.linkedIn_jobs']),
+    'shine': (run_shine, ['core.spiders.Shine_jobs']),
+}
+
+
+def ok_status(status):
+    return status == 'loaded' or (status.isdigit() and int(status) < 400)
+
+
+def child(name, mode, target, pages, results):
+    """Run one scraper in this (fresh) process and report what it cost"""
+    sys.path.insert(0, REPO_ROOT)
+    os.environ['SCRAPY_SETTINGS_MODULE'] = 'core.settings'
+    os.chdir(tempfile.mkdtemp(prefix=f'e2e-{name}-'))
+    os.makedirs('outputs')
+    os.makedirs('jsonFiles')
+
+    runner, modules = SCRAPERS[name]
+    for module in modules:
+        importlib.import_module(module)
+    from core.http_client import get_client
+    from core.metrics import get_metrics
+    from core.tracing import write_trace
+    if mode == 'replay':
+        install_adapter(get_client().session, ReplayAdapter, target)
+    else:
+        install_adapter(get_client().session, RecordingAdapter, FixtureCorpus(target))
+
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    try:
+        runner(mode, target, pages)
+    except Exception as e:
+        results.put({'name': name, 'skipped': f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"})
+        return
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    # With SCRAPER_TRACE set; the Scrapy spiders have written theirs already
+    write_trace(name)
+
+    metrics = get_metrics()
+    requests = metrics.requests.items()
+    results.put({
+        'name': name,
+        'wall': wall,
+        'cpu': after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime,
+        # Kilobytes on Linux
+        'peak_rss': after.ru_maxrss * 1024,
+        'pages': sum(value for labels, value in requests if ok_status(labels['status'])),
+        'failed': sum(value for labels, value in requests if not ok_status(labels['status'])),
+        'items': sum(value for _, value in metrics.items.items()),
+    })
+
+
+def run(name, mode, target, pages):
+    # spawn: a clean interpreter per scraper, for Scrapy's reactor and for a fair peak RSS
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=child, args=(name, mode, target, pages, results))
+    process.start()
+    process.join()
+    if results.empty():
+        return {'name': name, 'skipped': f"exit code {process.exitcode}"}
+    return results.get()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--scrapers', nargs='+', choices=sorted(SCRAPERS), default=list(SCRAPERS))
+    parser.add_argument('--pages', type=int, default=3, help='result pages per paginated scraper')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses replaced by a 503')
+    parser.add_argument('--record', action='store_true', help='run against the live sites and record')
+    args = parser.parse_args()
+
+    corpus_path = os.path.abspath(args.corpus)
+    if args.record:
+        for name in args.scrapers:
+            result = run(name, 'record', corpus_path, args.pages)
+            if 'skipped' in result:
+                print(f"⚠️ {name}: skipped ({result['skipped']})")
+            else:
+                print(f"📼 {name}: {result['pages']} pages recorded")
+        print(f"📦 {len(FixtureCorpus(corpus_path))} responses in {args.corpus}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = FixtureCorpus(corpus_path)
+        if not len(corpus):
+            corpus = synthesize(FixtureCorpus(os.path.join(tmp, 'corpus')), pages=args.pages)
+            print(f"⚠️ No recordings in {args.corpus}; replaying a synthetic corpus ({len(corpus)} responses)")
+
+        results = []
+        with ReplayServer(corpus, args.latency, args.jitter, args.error_rate) as server:
+            for name in args.scrapers:
+                server.reset()
+                result = run(name, 'replay', server.url, args.pages)
+                result['server'] = dict(server.counts)
+                results.append(result)
+
+    print(f"\n{'='*88}")
+    print(f"📊 Replay: {args.latency * 1000:.0f} ms latency (+{args.jitter * 1000:.0f} ms jitter), "
+          f"{args.error_rate:.0%} injected errors, {os.cpu_count()} CPUs")
+    print(f"{'Scraper':<18}{'Pages':>7}{'Items':>7}{'Wall s':>8}{'Pages/s':>9}{'Items/s':>9}"
+          f"{'CPU s':>8}{'Peak RSS':>10}   Server")
+    for result in results:
+        if 'skipped' in result:
+            print(f"{result['name']:<18}  skipped: {result['skipped']}")
+            continue
+        wall = result['wall']
+        served = result['server']
+        print(f"{result['name']:<18}{result['pages']:>7}{result['items']:>7}{wall:>8.2f}"
+              f"{result['pages'] / wall:>9.1f}{result['items'] / wall:>9.1f}{result['cpu']:>8.2f}"
+              f"{result['peak_rss'] / 2**20:>7.0f} MB   {served['served']} ok, {served['errors']} injected, "
+              f"{served['misses']} unrecorded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# Synthetic pages and a local stand-in server for the offline benchmarks
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+TIMESJOBS_SAMPLE = 'outputs/scrapedTimes_jobs.json'
+
+
+def load_jobs(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_timesjobs_card(job):
+    """Render a job record back into TimesJobs result-card markup"""
+    e = lambda value: html.escape(str(value or ''))
+    return f'''
+<li class="clearfix job-bx wht-shd-bx">
+  <header class="clearfix">
+    <h2 class="heading-trun"><a href="{e(job.get('link'))}" target="_blank">{e(job.get('title'))}</a></h2>
+    <h3 class="joblist-comp-name">
+      {e(job.get('company'))}
+      <!-- company rating -->
+    </h3>
+  </header>
+  <ul class="top-jd-dtl clearfix">
+    <li><i class="srp-icons experience"></i>{e(job.get('salary'))}</li>
+    <li><i class="srp-icons location"></i><span title="{e(job.get('location'))}">{e(job.get('location'))}</span></li>
+    <li><i class="srp-icons salary"></i>&#8377; 4.00 - 6.00 Lacs p.a.</li>
+  </ul>
+  <ul class="list-job-dtl clearfix">
+    <li><label>Job Description:</label>{e(job.get('description'))}</li>
+    <li><label>KeySkills:</label><span class="srp-skills">java , sql , rest</span></li>
+  </ul>
+  <div class="sim-posted"><span class="sim-posted">{e(job.get('posted_date'))}</span></div>
+</li>'''
+
+
+def render_timesjobs_page(jobs, filler_kb=40):
+    """Render a full result page, padded with the kind of chrome real pages carry"""
+    cards = ''.join(render_timesjobs_card(job) for job in jobs)
+    filler = '<div class="nav"><a href="/x">link</a><script>var x = 1;</script></div>\n' * (filler_kb * 1024 // 70)
+    return f'''<!DOCTYPE html>
+<html><head><title>Software Developer Jobs</title>
+<script type="text/javascript">window.dataLayer = [];</script>
+<style>.job-bx {{ margin: 0 }}</style></head>
+<body>
+{filler}
+<div id="searchResultData"><ul class="new-joblist">{cards}
+</ul></div>
+{filler}
+</body></html>'''.encode('utf-8')
+
+
+class StandInServer:
+    """Serve generated responses from a local thread-per-request HTTP server
+
+    `handler(path, query)` returns (status, content_type, body) or (status,
+    content_type, body, headers). Every response is delayed by `latency`
+    seconds to stand in for a remote site. With allow_head=False, HEAD
+    requests get a 405 like on boards that only answer GET.
+    """
+
+    def __init__(self, handler, latency=0.0, host='127.0.0.1', port=0, allow_head=True):
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, send_body):
+                parts = urlsplit(self.path)
+                if outer.latency:
+                    time.sleep(outer.latency)
+                if not send_body and not outer.allow_head:
+                    status, content_type, body, headers = 405, 'text/plain', b'', {}
+                else:
+                    status, content_type, body, *extra = handler(parts.path, parse_qs(parts.query))
+                    headers = extra[0] if extra else {}
+                with outer.lock:
+                    outer.requests += 1
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Streaming clients hang up once they have what they need
+                    pass
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.latency = latency
+        self.allow_head = allow_head
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
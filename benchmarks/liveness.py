@@ -0,0 +1,126 @@
+# Liveness sweep throughput against local stand-in boards
+#
+# Each stand-in server is one "board" (its own host:port, so its own rate
+# budget). Postings are live, gone (404/410), retired by a redirect to search,
+# or moved to a new URL or a canonical slug; one board refuses HEAD. Before
+# the sweep, REDIRECT_CASES are checked against redirected_away().
+#
+#   python -m benchmarks.liveness --jobs 5000 --boards 4 --latency 0.05
+import argparse
+import os
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+import requests
+
+from benchmarks.fixtures import StandInServer
+from core.liveness import LivenessStore, LivenessSweeper, redirected_away
+
+# (posting URL, where its redirect ended, retired?)
+REDIRECT_CASES = [
+    ('https://www.linkedin.com/jobs/view/research-scientist-at-acme-4012',
+     'https://in.linkedin.com/jobs/view/research-scientist-at-acme-4012', False),
+    ('https://www.shine.com/jobs/seo-executive/acme/1234',
+     'https://www.shine.com/jobs/seo-search-engine-optimisation-executive/acme/1234', False),
+    ('https://www.timesjobs.com/job-detail/python-developer-acme-123',
+     'https://m.timesjobs.com/job-detail/python-developer-acme-123/', False),
+    ('https://www.linkedin.com/jobs/view/python-developer-4013', 'https://www.linkedin.com/jobs/search?keywords=python', True),
+    ('https://www.shine.com/jobs/python-developer/acme/1235', 'https://www.shine.com/job-search/python-jobs', True),
+    ('https://internshala.com/internship/detail/python-123', 'https://internshala.com/internships/', True),
+    ('https://example.com/careers/42', 'https://example.com/careers/expired', True),
+]
+
+
+def check_redirect_cases():
+    """The REDIRECT_CASES redirected_away() gets wrong"""
+    return [(url, final) for url, final, retired in REDIRECT_CASES if redirected_away(url, final) != retired]
+
+
+def expected_state(n):
+    """Whether posting n should end up active"""
+    return n % 20 not in (0, 1, 2, 3)
+
+
+def board_handler(path, query):
+    if not path.startswith('/job/'):
+        # Search and listing pages
+        return 200, 'text/html', b'<html>results</html>'
+    slug = path[len('/job/'):]
+    n = int(slug.split('-')[0])
+    kind = n % 20
+    if kind in (0, 1):
+        return 404, 'text/html', b'not found'
+    if kind == 2:
+        return 410, 'text/html', b'gone'
+    if kind == 3:
+        return 302, 'text/html', b'', {'Location': '/jobs/search?q=expired'}
+    if kind == 4 and not slug.endswith('-moved'):
+        return 301, 'text/html', b'', {'Location': f'/job/{n}-moved'}
+    if kind == 5 and slug == str(n):
+        # A canonical slug that happens to contain "search"
+        return 301, 'text/html', b'', {'Location': f'/job/{n}-seo-search-engine-optimisation-executive'}
+    return 200, 'text/html', b'<html>job</html>', {'ETag': f'"{n}"'}
+
+
+def synthetic_jobs(urls, count):
+    today = date.today()
+    return [{'link': f"{urls[n % len(urls)]}/job/{n}", 'title': f'Job {n}',
+             'posted_on': (today - timedelta(days=n % 60)).isoformat()} for n in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--boards', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.05, help='server latency per request (s)')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--rate', type=float, default=50.0, help='checks per second per board')
+    parser.add_argument('--baseline-sample', type=int, default=200)
+    args = parser.parse_args()
+
+    misread = check_redirect_cases()
+    for url, final in misread:
+        print(f"❌ redirected_away({url!r}, {final!r}) is wrong")
+    assert not misread, f"{len(misread)} of {len(REDIRECT_CASES)} redirect cases misread"
+
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as tmp:
+        servers = [stack.enter_context(StandInServer(board_handler, latency=args.latency, allow_head=i != 0))
+                   for i in range(args.boards)]
+        jobs = synthetic_jobs([server.url for server in servers], args.jobs)
+
+        # The old way: re-fetch every posting page, one at a time
+        session = requests.Session()
+        sample = jobs[:args.baseline_sample]
+        start = time.perf_counter()
+        for job in sample:
+            session.get(job['link'], timeout=10)
+        baseline = len(sample) / (time.perf_counter() - start)
+
+        store = LivenessStore(os.path.join(tmp, 'liveness.sqlite3'))
+        store.add_jobs(jobs)
+        sweeper = LivenessSweeper(store, workers=args.workers, rate=args.rate, burst=args.workers // 4)
+        start = time.perf_counter()
+        outcomes = sweeper.sweep()
+        elapsed = time.perf_counter() - start
+        checked = sum(outcomes.values())
+
+        states = store.states()
+        wrong = sum(1 for n, job in enumerate(jobs) if states.get(job['link']) != expected_state(n))
+        # Everything was just checked, so nothing is due until RECHECK_AFTER
+        due_again = len(store.due())
+
+    print(f"\n{'='*60}")
+    print(f"📊 {args.jobs} postings on {args.boards} boards, {args.latency * 1000:.0f}ms latency, "
+          f"{args.rate:.0f} checks/s per board")
+    print(f"  Sequential GET:  {baseline * 3600:>12,.0f} URLs/hour  (measured on {len(sample)})")
+    print(f"  Sweeper:         {checked / elapsed * 3600:>12,.0f} URLs/hour  ({elapsed:.1f}s, "
+          f"{args.workers} workers)")
+    print(f"  Outcomes: {dict(outcomes.most_common())}")
+    print(f"  Wrong states: {wrong}, due again right away: {due_again}")
+    sweeper.client.report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# Per-item logging cost: print() against core.log
+#
+# Every synthetic job card logs what a LinkedIn card did: an "extracting"
+# line, a selector debug line carrying a slice of the card text, and the
+# "extracted" line. Variants:
+#   print          f-strings printed straight to the sink, as the scrapers did
+#   logging eager  a plain StreamHandler with f-strings; the DEBUG line is off
+#                  but its message is still built
+#   core.log       a get_logger() logger over its own LogPump: lazy arguments,
+#                  per-item sampling (1 = keep every line)
+# Reported: microseconds per card spent in the scraping thread (wall clock,
+# so the pump thread holding the GIL counts against it), and the time the
+# pump needed afterwards to write what was still buffered.
+#
+#   python -m benchmarks.logging_overhead --cards 200000 --sample 10
+#   python -m benchmarks.logging_overhead --sink outputs/log-bench.txt
+import argparse
+import logging
+import os
+import random
+import time
+
+from core.log import PER_ITEM, LogPump, SampleFilter, ScraperLogger
+
+WORDS = ('Python', 'Developer', 'Senior', 'Data', 'Engineer', 'Bangalore', 'Remote', 'LPA', 'years',
+         'experience', 'Django', 'AWS', 'Pune', 'Full', 'Time', 'Hiring', 'urgently', 'team')
+
+
+def synthetic_cards(count, seed=5):
+    rng = random.Random(seed)
+    return [{
+        'title': ' '.join(rng.choices(WORDS, k=4)),
+        'company': f'Company {rng.randrange(5000)}',
+        'text': ' '.join(rng.choices(WORDS, k=rng.randint(60, 160))),
+    } for _ in range(count)]
+
+
+def run_print(cards, sink):
+    total = len(cards)
+    for i, card in enumerate(cards):
+        print(f"🔍 Extracting job {i + 1}/{total}...", file=sink)
+        print(f"✅ Extracted: {card['title']} at {card['company']}", file=sink)
+
+
+def run_eager(cards, logger):
+    total = len(cards)
+    for i, card in enumerate(cards):
+        logger.info(f"🔍 Extracting job {i + 1}/{total}...")
+        logger.debug(f"Job element text sample: {card['text'][:200]}...")
+        logger.info(f"✅ Extracted: {card['title']} at {card['company']}")
+
+
+def run_lazy(cards, logger):
+    total = len(cards)
+    for i, card in enumerate(cards):
+        logger.info("🔍 Extracting job %s/%s...", i + 1, total, extra=PER_ITEM)
+        logger.debug("Job element text sample: %.200s...", card['text'], extra=PER_ITEM)
+        logger.info("✅ Extracted: %s at %s", card['title'], card['company'], extra=PER_ITEM)
+
+
+def run_disabled_debug(cards, logger, lazy):
+    """Only the DEBUG line, with DEBUG off"""
+    if lazy:
+        for card in cards:
+            logger.debug("Job element text sample: %.200s...", card['text'], extra=PER_ITEM)
+    else:
+        for card in cards:
+            logger.debug(f"Job element text sample: {card['text'][:200]}...")
+
+
+def plain_logger(name, sink):
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def pumped_logger(name, sink, every):
+    """A logger wired like setup_logging() wires 'scrapers'"""
+    pump = LogPump().start()
+    sampler = SampleFilter(every)
+    return ScraperLogger(plain_logger(name, sink), sampler, pump), pump, sampler
+
+
+def bench_pumped(cards, sink, every, name):
+    logger, pump, sampler = pumped_logger(name, sink, every)
+    start = time.perf_counter()
+    run_lazy(cards, logger)
+    calling = time.perf_counter() - start
+    pump.flush()
+    drain = time.perf_counter() - start - calling
+    pump.stop()
+    return calling, drain, sampler.dropped
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cards', type=int, default=100000)
+    parser.add_argument('--sample', type=int, default=10, help='keep 1 in N per-item lines')
+    parser.add_argument('--sink', default=os.devnull, help='where the lines go (a file, or a tty)')
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards)
+    # Line buffered, like a console
+    with open(args.sink, 'w', buffering=1, encoding='utf-8') as sink:
+        print_time = timed(run_print, cards, sink)
+        eager_time = timed(run_eager, cards, plain_logger('bench.eager', sink))
+        full_time, full_drain, _ = bench_pumped(cards, sink, 1, 'bench.pumped')
+        sampled_time, sampled_drain, dropped = bench_pumped(cards, sink, args.sample, 'bench.sampled')
+        eager_debug = timed(run_disabled_debug, cards, logging.getLogger('bench.eager'), False)
+        lazy_debug = timed(run_disabled_debug, cards, logging.getLogger('bench.eager'), True)
+
+    per_card = 1e6 / args.cards
+    print(f"📊 {args.cards} cards, 3 log calls each (1 at DEBUG, off), sink {args.sink}")
+    print(f"{'Variant':<26}{'µs/card':>9}{'Drain s':>9}{'Speedup':>9}")
+    print(f"{'print':<26}{print_time * per_card:>9.2f}{'-':>9}{1:>8.1f}x")
+    print(f"{'logging, eager f-strings':<26}{eager_time * per_card:>9.2f}{'-':>9}{print_time / eager_time:>8.1f}x")
+    print(f"{'core.log, sample 1':<26}{full_time * per_card:>9.2f}{full_drain:>9.2f}"
+          f"{print_time / full_time:>8.1f}x")
+    print(f"{f'core.log, sample {args.sample}':<26}{sampled_time * per_card:>9.2f}{sampled_drain:>9.2f}"
+          f"{print_time / sampled_time:>8.1f}x")
+    print(f"  {dropped} of {args.cards * 2} INFO lines sampled out")
+    print(f"  DEBUG off, f-string: {eager_debug * per_card:.2f} µs/line, lazy: {lazy_debug * per_card:.2f} µs/line")
+
+
+if __name__ == '__main__':
+    main()
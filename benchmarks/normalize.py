@@ -0,0 +1,86 @@
+# Batch salary / experience normalization throughput
+#
+#   python -m benchmarks.normalize --rows 2000000
+import argparse
+import random
+import time
+
+from core.normalize import normalize_batch, parse_experience, parse_salary
+
+SALARY_FORMATS = (
+    '₹ {a:,} /month', '₹ {a:,} - {b:,} /month', '{a} Yearly', '{a} - {b} Monthly',
+    '{l}-{h} LPA', '{l} LPA', '{l} - {h} Lakhs', 'CTC {l}L - {h}L', 'Unpaid', 'Not disclosed',
+    'N/A', '$ {a:,} - {b:,}', '0 - {h} Years',
+)
+EXPERIENCE_FORMATS = (
+    '{l} to {h} Years', '{l} - {h} Years', '{l} to {h} Yrs', '{h} Years', 'Fresher',
+    'Fresher to {h} years', '{h}+ years', 'Not specified', None,
+)
+
+
+def synthetic_rows(count, distinct, seed=5):
+    """`count` rows drawn from `distinct` generated strings, like a real corpus"""
+    rng = random.Random(seed)
+
+    def fill(fmt):
+        if fmt is None:
+            return None
+        low = rng.randint(0, 12)
+        a = rng.randrange(3000, 60000, 500)
+        return fmt.format(a=a, b=a + rng.randrange(1000, 30000, 500), l=low, h=low + rng.randint(1, 6))
+
+    salaries = [fill(rng.choice(SALARY_FORMATS)) for _ in range(distinct)]
+    experiences = [fill(rng.choice(EXPERIENCE_FORMATS)) for _ in range(distinct)]
+    picks = [rng.randrange(distinct) for _ in range(count)]
+    return [salaries[i] for i in picks], [experiences[i] for i in picks]
+
+
+def row_at_a_time(salaries, experiences):
+    """What each consumer does today: parse every row on its own"""
+    units = {0: 1, 1: 1e3, 2: 1e5, 3: 1e7, 4: 1e6}
+    per_year = {0: 2080, 1: 260, 2: 52, 3: 12, 4: 1}
+    rates = {0: 1.0, 1: 83.0, 2: 90.0, 3: 105.0}
+    out = []
+    for salary, experience in zip(salaries, experiences):
+        parsed = parse_salary.__wrapped__(salary)
+        if parsed:
+            low, high, unit, period, currency = parsed
+            factor = units[unit] * per_year[period] * rates[currency]
+            parsed = (low * factor, high * factor)
+        out.append((parsed, parse_experience.__wrapped__(experience)))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--distinct', type=int, default=20000)
+    args = parser.parse_args()
+
+    salaries, experiences = synthetic_rows(args.rows, args.distinct)
+    print(f"📦 {args.rows} rows, {args.distinct} distinct strings per column")
+
+    sample = min(args.rows, 200000)
+    start = time.perf_counter()
+    row_at_a_time(salaries[:sample], experiences[:sample])
+    naive = (time.perf_counter() - start) / sample
+
+    parse_salary.cache_clear()
+    parse_experience.cache_clear()
+    start = time.perf_counter()
+    result = normalize_batch(salaries, experiences)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    normalize_batch(salaries, experiences)
+    warm = time.perf_counter() - start
+
+    print(f"  Row at a time:        {1 / naive:>12,.0f} rows/s  (measured on {sample} rows)")
+    print(f"  normalize_batch:      {args.rows / cold:>12,.0f} rows/s  ({cold:.2f}s, cold cache)")
+    print(f"  normalize_batch:      {args.rows / warm:>12,.0f} rows/s  ({warm:.2f}s, warm cache)")
+    parsed = (result['salary_min'] == result['salary_min']).mean()
+    print(f"  Salaries parsed: {parsed:.0%}, experience parsed: "
+          f"{(result['experience_min'] == result['experience_min']).mean():.0%}")
+
+
+if __name__ == '__main__':
+    main()
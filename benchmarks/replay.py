@@ -0,0 +1,489 @@
+# Record live responses into a fixture corpus and replay them from a local server
+#
+# A corpus is a directory with manifest.jsonl (one line per recorded response:
+# URL, status, the headers worth keeping, body file) and bodies/, where each
+# body is stored once under its SHA-1. Recording and replay hook the
+# transports rather than the scrapers, so the scraper code runs unchanged:
+#
+#   requests   RecordingAdapter / ReplayAdapter on the shared session
+#   Scrapy     RecordingDownloadHandler / ReplayDownloadHandler (DOWNLOAD_HANDLERS)
+#   Selenium   record_driver() / replay_driver() around driver.get
+#
+# On replay every request goes to a ReplayServer as
+# http://127.0.0.1:<port>/<host><path>?<query>; the server can add latency and
+# inject errors. Responses come back under their original URL, so relative
+# links and job keys are the same as on the live site.
+#
+# Without network access, synthesize() builds a corpus in each site's markup
+# from the records in outputs/, covering the same URLs the scrapers request.
+#
+#   python -m benchmarks.replay synthesize --corpus benchmarks/recordings
+#   python -m benchmarks.replay serve --corpus benchmarks/recordings --latency 0.2 --error-rate 0.05
+#   python -m benchmarks.replay stats --corpus benchmarks/recordings
+import argparse
+import hashlib
+import html
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from benchmarks.fixtures import StandInServer, load_jobs, render_timesjobs_page
+
+DEFAULT_CORPUS = 'benchmarks/recordings'
+# Headers replayed with a body; the rest describe the original connection
+KEPT_HEADERS = ('content-type', 'content-encoding', 'etag', 'last-modified', 'location')
+
+
+def canonical_query(query):
+    return urlencode(sorted(parse_qsl(query)))
+
+
+def split_url(url):
+    parts = urlsplit(url)
+    return parts.netloc.lower(), parts.path or '/', canonical_query(parts.query)
+
+
+def replay_url(base_url, url):
+    """Where a request for url goes on the replay server at base_url"""
+    if url.startswith(base_url):
+        return url
+    parts = urlsplit(url)
+    return f"{base_url}/{parts.netloc.lower()}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else '')
+
+
+class FixtureCorpus:
+    def __init__(self, path=DEFAULT_CORPUS):
+        self.path = path
+        self.manifest_path = os.path.join(path, 'manifest.jsonl')
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.by_path = {}
+        self.hosts = set()
+        self._bodies = {}
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self, entry):
+        # A URL recorded twice replays its latest response
+        host, path, query = split_url(entry['url'])
+        self.entries[(host, path, query)] = entry
+        self.by_path.setdefault((host, path), {})[query] = entry
+        self.hosts.add(host)
+
+    def add(self, url, status, headers, body):
+        """Record one response; headers is any name -> value mapping"""
+        digest = hashlib.sha1(body).hexdigest()
+        kept = {name.lower(): value for name, value in headers.items() if name.lower() in KEPT_HEADERS}
+        entry = {'url': url, 'status': status, 'headers': kept, 'body': digest,
+                 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        body_path = os.path.join(self.path, 'bodies', digest)
+        with self.lock:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            if not os.path.exists(body_path):
+                with open(body_path, 'wb') as f:
+                    f.write(body)
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._index(entry)
+        return entry
+
+    def lookup(self, host, path, query):
+        """The entry for a request; an exact query match first, then any query on that path"""
+        entry = self.entries.get((host, path, query))
+        if entry is None:
+            # Cache busters and session parameters change on every visit
+            candidates = self.by_path.get((host, path))
+            if candidates:
+                entry = candidates[min(candidates)]
+        return entry
+
+    def body(self, entry):
+        digest = entry['body']
+        body = self._bodies.get(digest)
+        if body is None:
+            with open(os.path.join(self.path, 'bodies', digest), 'rb') as f:
+                body = self._bodies[digest] = f.read()
+        return body
+
+
+class ReplayServer(StandInServer):
+    """Serve a fixture corpus with optional latency and injected errors
+
+    Each response waits latency plus up to jitter seconds. A share of
+    error_rate requests get error_status (with Retry-After: 0) instead of
+    their recorded response; unknown URLs get a 404.
+    """
+
+    def __init__(self, corpus, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=1,
+                 host='127.0.0.1', port=0):
+        self.corpus = corpus
+        self.delay = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.counts = {'served': 0, 'errors': 0, 'misses': 0}
+        super().__init__(self.respond, host=host, port=port)
+
+    def _count(self, outcome):
+        with self.rng_lock:
+            self.counts[outcome] += 1
+
+    def respond(self, path, query):
+        with self.rng_lock:
+            delay = self.delay + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate and self.rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self._count('errors')
+            return self.error_status, 'text/plain', b'injected error', {'Retry-After': '0'}
+
+        host, _, rest = path.lstrip('/').partition('/')
+        query = urlencode(sorted((name, value) for name, values in query.items() for value in values))
+        entry = self.corpus.lookup(host, '/' + rest, query) if host in self.corpus.hosts else None
+        if entry is None:
+            # A browser following a relative link drops the host prefix
+            for known in sorted(self.corpus.hosts):
+                entry = self.corpus.lookup(known, path, query)
+                if entry:
+                    break
+        if entry is None:
+            self._count('misses')
+            return 404, 'text/plain', b'not recorded'
+        self._count('served')
+        headers = {name.title(): value for name, value in entry['headers'].items() if name != 'content-type'}
+        return (entry['status'], entry['headers'].get('content-type', 'application/octet-stream'),
+                self.corpus.body(entry), headers)
+
+    def reset(self):
+        with self.rng_lock:
+            self.counts = dict.fromkeys(self.counts, 0)
+
+
+# --- requests -------------------------------------------------------------
+
+class ReplayAdapter(HTTPAdapter):
+    """Send every request to the replay server, keeping the original URL on the response"""
+
+    def __init__(self, base_url, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        original = request.url
+        request.url = replay_url(self.base_url, original)
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            request.url = original
+        response.url = original
+        return response
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Pass requests through and add every response to a corpus"""
+
+    def __init__(self, corpus, **kwargs):
+        self.corpus = corpus
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading the body here leaves it in memory; a streaming caller
+        # iterates over the copy instead of the socket
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() != 'content-encoding'}
+        self.corpus.add(request.url, response.status_code, headers, response.content)
+        return response
+
+
+def install_adapter(session, adapter_cls, target):
+    """Swap a session's adapters for adapter_cls(target), keeping retries and pool sizes"""
+    current = session.get_adapter('https://')
+    adapter = adapter_cls(target, pool_connections=current._pool_connections,
+                          pool_maxsize=current._pool_maxsize, max_retries=current.max_retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+# --- Scrapy ---------------------------------------------------------------
+
+try:
+    from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+except ImportError:
+    HTTP11DownloadHandler = None
+
+if HTTP11DownloadHandler is not None:
+    class ReplayDownloadHandler(HTTP11DownloadHandler):
+        """Download handler for REPLAY_URL; set it for both http and https"""
+
+        def __init__(self, settings, crawler):
+            super().__init__(settings, crawler)
+            self.base_url = settings.get('REPLAY_URL')
+
+        def download_request(self, request, spider):
+            replayed = request.replace(url=replay_url(self.base_url, request.url))
+
+            def restore(response):
+                if 'download_latency' in replayed.meta:
+                    request.meta['download_latency'] = replayed.meta['download_latency']
+                return response.replace(url=request.url, request=request)
+            return super().download_request(replayed, spider).addCallback(restore)
+
+    class RecordingDownloadHandler(HTTP11DownloadHandler):
+        """Download handler adding every response to the corpus at RECORD_PATH"""
+
+        def __init__(self, settings, crawler):
+            super().__init__(settings, crawler)
+            self.corpus = FixtureCorpus(settings.get('RECORD_PATH', DEFAULT_CORPUS))
+
+        def download_request(self, request, spider):
+            def record(response):
+                # Still encoded; Content-Encoding is kept so replay decodes it the same way
+                self.corpus.add(request.url, response.status, response.headers.to_unicode_dict(),
+                                response.body)
+                return response
+            return super().download_request(request, spider).addCallback(record)
+
+
+def scrapy_settings(mode, target):
+    """Settings routing a crawl through the replay server or the recorder"""
+    handler = 'ReplayDownloadHandler' if mode == 'replay' else 'RecordingDownloadHandler'
+    handlers = {scheme: f'benchmarks.replay.{handler}' for scheme in ('http', 'https')}
+    key = 'REPLAY_URL' if mode == 'replay' else 'RECORD_PATH'
+    return {'DOWNLOAD_HANDLERS': handlers, key: target}
+
+
+# --- Selenium -------------------------------------------------------------
+
+def replay_driver(driver, base_url):
+    get = driver.get
+    driver.get = lambda url: get(replay_url(base_url, url))
+
+
+def record_driver(driver, corpus):
+    """Record what the browser rendered after each driver.get"""
+    get = driver.get
+
+    def recording_get(url):
+        get(url)
+        corpus.add(url, 200, {'Content-Type': 'text/html; charset=utf-8'},
+                   driver.page_source.encode('utf-8'))
+    driver.get = recording_get
+
+
+# --- Synthetic corpus -----------------------------------------------------
+
+QUERY = 'software developer'
+SAMPLES = {
+    'timesjobs': 'outputs/scrapedTimes_jobs.json',
+    'freshersworld': 'outputs/freshersworld_jobs.json',
+    'internshala': 'outputs/internshala_jobs.json',
+    'linkedin': 'outputs/linkedin_jobs.json',
+    'shine': 'outputs/shine_jobs.json',
+}
+FRESHERSWORLD_KEYWORDS = (
+    "web dev", "python developer", "java developer", "data analyst", "mechanical engineer",
+    "civil engineer", "ui ux designer", "digital marketing", "network engineer", "sales executive",
+    "marketing", "software developer", "content marketing", "social media marketing")
+INTERNSHALA_QUERIES = ('digital marketing', 'marketing', 'social media marketing', 'content marketing',
+                       'seo marketing')
+HTML = 'text/html; charset=utf-8'
+
+
+def e(value):
+    return html.escape(str(value or ''))
+
+
+def page_of(sample, page, per_page):
+    """per_page records for a page, each with its own link"""
+    jobs = []
+    for i in range(per_page):
+        job = dict(sample[(page * per_page + i) % len(sample)])
+        job['serial'] = f'{page}-{i}'
+        jobs.append(job)
+    return jobs
+
+
+def wrap_page(title, body):
+    return f'''<!DOCTYPE html>
+<html><head><title>{e(title)}</title>
+<script type="text/javascript">window.dataLayer = [];</script></head>
+<body>
+<div class="header"><a href="/">Home</a><a href="/login">Login</a></div>
+{body}
+<div class="footer"><a href="/about">About</a><a href="/privacy">Privacy</a></div>
+</body></html>'''.encode('utf-8')
+
+
+def render_freshersworld_page(jobs):
+    cards = ''.join(f'''
+<div class="job-container" data-job-id="{e(job['serial'])}">
+  <h3 class="latest-jobs-title"><a href="/jobs/{e(job['serial'])}">{e(job.get('job_title'))}</a></h3>
+  <span class="company-name">{e(job.get('company_name'))}</span>
+  <span class="job-location">{e(job.get('location'))}</span>
+  <span class="salary">{e(job.get('salary_range'))}</span>
+  <span class="experience">{e(job.get('experience_required'))}</span>
+  <p class="desc">{e((job.get('job_description') or '')[:300])}</p>
+  <span class="posted">Posted: {e(job.get('posted_date'))}</span>
+</div>''' for job in jobs)
+    return wrap_page('Fresher Jobs', f'<div class="latest-jobs-container">{cards}</div>')
+
+
+def render_internshala_page(jobs, internships):
+    cls = 'individual_internship' if internships else 'job_container'
+    cards = ''.join(f'''
+<div class="{cls}" data-job-id="{e(job['serial'])}">
+  <h3 class="job_heading"><a href="/job/detail/{e(job['serial'])}">{e(job.get('job_title'))}</a></h3>
+  <p class="company_name">{e(job.get('company_name'))}</p>
+  <div class="locations"><span>{e(job.get('location'))}</span></div>
+  <span class="stipend">{e(job.get('salary_range'))}</span>
+  <span class="duration">{e(job.get('duration'))}</span>
+  <span class="status">{e(job.get('posted_date'))}</span>
+</div>''' for job in jobs)
+    return wrap_page('Internshala', f'<div id="internship_list_container">{cards}</div>')
+
+
+def render_linkedin_page(jobs):
+    today = date.today()
+    cards = ''.join(f'''
+<li data-occludable-job-id="{e(job['serial'])}">
+  <div class="base-card base-search-card job-search-card">
+    <a class="base-card__full-link" href="https://in.linkedin.com/jobs/view/{e(job['serial'])}">{e(job.get('title'))}</a>
+    <h3 class="base-search-card__title"><a href="https://in.linkedin.com/jobs/view/{e(job['serial'])}">{e(job.get('title'))}</a></h3>
+    <h4 class="base-search-card__subtitle"><a href="/company/x">{e(job.get('company'))}</a></h4>
+    <span class="job-search-card__location">{e(job.get('location'))}</span>
+    <time class="job-search-card__listdate" datetime="{(today - timedelta(days=i % 20)).isoformat()}">{e(job.get('posted_date'))}</time>
+  </div>
+</li>''' for i, job in enumerate(jobs))
+    return wrap_page('LinkedIn Jobs', f'<ul class="jobs-search__results-list">{cards}</ul>')
+
+
+def render_shine_page(jobs):
+    cards = ''.join(f'''
+<div class="jobCard_jobCard__x" data-id="{e(job['serial'])}">
+  <h2><a href="/jobs/{e(job['serial'])}">{e(job.get('title'))}</a></h2>
+  <div>{e(job.get('company'))}</div>
+  <div>{e(job.get('experience_required'))}</div>
+  <div>{e(job.get('location'))}</div>
+  <div>{e(job.get('posted_date'))}</div>
+</div>''' for job in jobs)
+    return wrap_page('Shine Jobs', f'<div class="search-results">{cards}</div>')
+
+
+def arbeitnow_fixture(pages, per_page, base_url='https://www.arbeitnow.com/api/job-board-api'):
+    """Arbeitnow API pages, each linking to the next one"""
+    now = int(time.time())
+    bodies = []
+    for page in range(1, pages + 1):
+        jobs = [{
+            'slug': f'job-{page}-{i}', 'company_name': f'Company {i % 97}',
+            'title': f'Python Engineer {page}-{i}', 'description': '<p>Build things</p>',
+            'remote': i % 2 == 0, 'url': f'https://www.arbeitnow.com/jobs/job-{page}-{i}',
+            'tags': ['python', 'remote'] if i % 2 == 0 else ['python'], 'job_types': ['full time'],
+            'location': 'Berlin', 'created_at': now - (page * per_page + i) * 600,
+        } for i in range(per_page)]
+        links = {'next': f'{base_url}?page={page + 1}' if page < pages else None}
+        bodies.append(json.dumps({'data': jobs, 'links': links, 'meta': {'current_page': page}}).encode('utf-8'))
+    return bodies
+
+
+def synthesize(corpus, pages=3, per_page=25):
+    """Fill a corpus with every URL the scrapers request, rendered from outputs/ samples"""
+    # Imported here: they pull in the API scraper and its feed parser
+    from benchmarks.api_streaming import remoteok_fixture
+    from benchmarks.rss_parse import rss_fixture
+
+    samples = {name: load_jobs(path) for name, path in SAMPLES.items()}
+
+    for page in range(1, pages + 1):
+        params = {'searchType': 'personalizedSearch', 'from': 'submit', 'txtKeywords': QUERY,
+                  'txtLocation': 'India', 'cboWorkExp1': '0', 'sequence': str(page)}
+        jobs = page_of(samples['timesjobs'], page, per_page)
+        for job in jobs:
+            job['link'] = f"{job.get('link')}-{job['serial']}"
+        corpus.add(f"https://www.timesjobs.com/candidate/job-search.html?{urlencode(params)}", 200,
+                   {'Content-Type': HTML}, render_timesjobs_page(jobs))
+
+    urls = [f"https://www.freshersworld.com/jobs/jobsearch/{kw.replace(' ', '-')}" for kw in FRESHERSWORLD_KEYWORDS]
+    for n, url in enumerate(urls + ['https://www.freshersworld.com/jobs']):
+        corpus.add(url, 200, {'Content-Type': HTML},
+                   render_freshersworld_page(page_of(samples['freshersworld'], n, 20)))
+
+    n = 0
+    for query in INTERNSHALA_QUERIES:
+        slug = query.replace(' ', '-')
+        for kind, internships in (('jobs', False), ('internships', True)):
+            corpus.add(f'https://internshala.com/{kind}/{slug}-{kind}', 200, {'Content-Type': HTML},
+                       render_internshala_page(page_of(samples['internshala'], n, 20), internships))
+            n += 1
+
+    corpus.add(f"https://www.linkedin.com/jobs/search/?keywords={quote(QUERY)}&location=India", 200,
+               {'Content-Type': HTML}, render_linkedin_page(page_of(samples['linkedin'], 0, per_page)))
+    corpus.add(f"https://www.shine.com/job-search/{QUERY.replace(' ', '-')}-jobs", 200,
+               {'Content-Type': HTML}, render_shine_page(page_of(samples['shine'], 0, 60)))
+
+    corpus.add('https://remoteok.io/api', 200, {'Content-Type': 'application/json'}, remoteok_fixture(500))
+    for page, body in enumerate(arbeitnow_fixture(pages, 50), start=1):
+        url = 'https://www.arbeitnow.com/api/job-board-api' + (f'?page={page}' if page > 1 else '')
+        corpus.add(url, 200, {'Content-Type': 'application/json'}, body)
+    feed = rss_fixture(300)
+    for url in ('https://weworkremotely.com/categories/remote-programming-jobs.rss',
+                'https://www.python.org/jobs/feed/rss/', 'https://www.remotepython.com/latest/jobs/feed/'):
+        corpus.add(url, 200, {'Content-Type': 'application/rss+xml; charset=utf-8'}, feed)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture corpus tools")
+    parser.add_argument('command', choices=('serve', 'synthesize', 'stats'))
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    corpus = FixtureCorpus(args.corpus)
+    if args.command == 'synthesize':
+        synthesize(corpus)
+        print(f"📦 {len(corpus)} responses in {args.corpus}")
+    elif args.command == 'stats':
+        by_host = {}
+        for (host, _, _), entry in corpus.entries.items():
+            count, size = by_host.get(host, (0, 0))
+            by_host[host] = (count + 1, size + os.path.getsize(os.path.join(args.corpus, 'bodies', entry['body'])))
+        for host, (count, size) in sorted(by_host.items()):
+            print(f"  {host:<32}{count:>5} responses {size / 1024:>9.0f} KB")
+    else:
+        with ReplayServer(corpus, args.latency, args.jitter, args.error_rate, args.error_status,
+                          port=args.port) as server:
+            print(f"🔁 Replaying {len(corpus)} responses on {server.url}/<host><path>")
+            try:
+                while True:
+                    time.sleep(60)
+            except KeyboardInterrupt:
+                pass
+            print(f"  {server.counts}")
+
+
+if __name__ == '__main__':
+    main()
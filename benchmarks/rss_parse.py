@@ -0,0 +1,85 @@
+# feedparser vs the streaming lxml parser on a generated multi-MB RSS feed
+#
+#   python -m benchmarks.rss_parse --items 5000
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+import feedparser
+
+from api_scraping.rss import iter_entries
+
+WORDS = ('python django senior backend engineer remote data platform team growth '
+         'startup ship scale product customers flask api cloud').split()
+
+
+def rss_fixture(count):
+    rng = random.Random(11)
+    now = datetime(2025, 7, 25, 12, tzinfo=timezone.utc)
+    items = []
+    for i in range(count):
+        posted = format_datetime(now - timedelta(hours=i), usegmt=True)
+        description = "<p>" + " ".join(rng.choices(WORDS, k=150)) + "</p><ul><li>Python</li></ul>"
+        items.append(
+            f"<item><title>{escape(' '.join(rng.choices(WORDS, k=4)).title())}</title>"
+            f"<link>https://jobs.example.com/{i}/</link>"
+            f"<guid isPermaLink=\"false\">job-{i}</guid>"
+            f"<dc:creator>Company {i % 313}</dc:creator>"
+            f"<pubDate>{posted}</pubDate>"
+            f"<description>{escape(description)}</description></item>"
+        )
+    return ('<?xml version="1.0" encoding="utf-8"?>'
+            '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+            '<title>Jobs</title><link>https://jobs.example.com/</link>'
+            + "".join(items) + '</channel></rss>').encode("utf-8")
+
+
+def chunked(body, size=64 * 1024):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def measure(func):
+    # Timed without tracemalloc, which slows both parsers down several times
+    start = time.perf_counter()
+    entries = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return entries, elapsed, peak
+
+
+FIELDS = ("id", "title", "link", "author", "published_parsed")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=5000)
+    args = parser.parse_args()
+
+    body = rss_fixture(args.items)
+    mb = len(body) / 1e6
+    print(f"📦 Fixture: {args.items} items, {mb:.1f} MB")
+
+    fp, fp_time, fp_peak = measure(lambda: feedparser.parse(body).entries)
+    lx, lx_time, lx_peak = measure(lambda: list(iter_entries(chunked(body))))
+
+    print(f"  feedparser:   {fp_time:7.2f} s  {mb / fp_time:6.1f} MB/s   peak {fp_peak / 1e6:6.1f} MB")
+    print(f"  iter_entries: {lx_time:7.2f} s  {mb / lx_time:6.1f} MB/s   peak {lx_peak / 1e6:6.1f} MB")
+    print(f"  Speedup: {fp_time / lx_time:.1f}x")
+
+    mismatches = sum(
+        1 for a, b in zip(fp, lx)
+        if any(a.get(field) != b.get(field) for field in FIELDS)
+    )
+    print(f"  Entries: {len(fp)} vs {len(lx)}, field mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Build the search index over a generated corpus and time queries against it
+#
+#   python -m benchmarks.search_index --docs 1000000
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from core.search_index import SearchIndex
+
+TITLES = ('python developer, data analyst, java engineer, frontend developer, react developer, '
+          'devops engineer, marketing executive, sales manager, hr recruiter, business analyst, '
+          'android developer, qa tester, content writer, graphic designer, accountant').split(', ')
+SOURCES = ('linkedin.com', 'shine.com', 'timesjobs.com', 'internshala.com', 'freshersworld.com',
+           'remoteok.io', 'arbeitnow.com')
+JOB_TYPES = ('full time', 'part time', 'internship', 'contract', None)
+CITIES = ('Bengaluru', 'Hyderabad', 'Pune', 'Chennai', 'Mumbai', 'Delhi', 'Noida', 'Remote')
+SKILLS = ('python sql excel aws docker kubernetes react angular java spring django flask '
+          'pandas spark tableau powerbi selenium git linux node typescript figma seo').split()
+
+QUERIES = [
+    ('python developer', {}),
+    ('data analyst sql', {}),
+    ('react', {'source': 'linkedin.com'}),
+    ('devops kubernetes', {'job_type': 'full time'}),
+    ('marketing', {'posted_after': '2025-07-01'}),
+    ('java spring engineer', {'source': 'shine.com', 'posted_after': '2025-06-01'}),
+    ('developer', {}),
+    ('', {'source': 'remoteok.io'}),
+]
+
+
+def synthetic_jobs(count, seed=3):
+    rng = random.Random(seed)
+    filler = [f"w{i}" for i in range(20000)]
+    today = date(2025, 7, 25)
+    for i in range(count):
+        words = rng.choices(SKILLS, k=6) + [filler[int(rng.paretovariate(1.2)) % len(filler)] for _ in range(25)]
+        yield {
+            'title': rng.choice(TITLES).title(),
+            'company': f"Company {rng.randrange(50000)}",
+            'location': rng.choice(CITIES),
+            'description': ' '.join(words),
+            'job_type': rng.choice(JOB_TYPES),
+            'source': rng.choice(SOURCES),
+            'posted-date': (today - timedelta(days=rng.randrange(120))).isoformat(),
+            'link': f"https://jobs.example.com/{i}",
+        }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        index = SearchIndex(path)
+        start = time.perf_counter()
+        batch = []
+        for job in synthetic_jobs(args.docs):
+            batch.append(job)
+            if len(batch) == 10000:
+                index.add(batch)
+                batch = []
+        index.add(batch)
+        index.commit()
+        build = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+        postings = sum(os.path.getsize(os.path.join(s.path, 'postings.bin')) for s in index.segments)
+        print(f"🏗️  Indexed {len(index)} jobs in {build:.1f}s ({len(index) / build:.0f} docs/s), "
+              f"{len(index.segments)} segments, {size / 1e6:.0f} MB on disk ({postings / 1e6:.0f} MB postings)")
+
+        # Reopen so queries run against the files, as a separate reader would
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        print(f"📂 Opened in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        print(f"\n{'Query':<28}{'Filters':<46}{'p50 ms':>8}{'p95 ms':>8}{'Hits':>6}")
+        for query, filters in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                hits = index.search(query, limit=20, **filters)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{query or '(none)':<28}{str(filters)[:45]:<46}"
+                  f"{percentile(timings, 50):>8.1f}{percentile(timings, 95):>8.1f}{len(hits):>6}")
+
+
+if __name__ == '__main__':
+    main()
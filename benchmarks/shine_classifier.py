@@ -0,0 +1,259 @@
+# Shine line heuristics: per-table keyword scans vs the one-pass automaton
+#
+# Runs the previous implementation (kept below as LegacyLineHeuristics) and
+# the current FastShineSeleniumScraper helpers over the same generated cards,
+# checks every extracted field is identical, and times both.
+#
+#   python -m benchmarks.shine_classifier --cards 20000
+import argparse
+import random
+import re
+import time
+
+from core.spiders import Shine_jobs
+from core.spiders.Shine_jobs import FastShineSeleniumScraper, classify_line
+
+
+class LegacyLineHeuristics:
+    """The keyword scans FastShineSeleniumScraper used before the automaton"""
+
+    def extract_proper_title(self, lines, element):
+        try:
+            title_attrs = ['title', 'data-title', 'aria-label']
+            for attr in title_attrs:
+                attr_value = element.get_attribute(attr)
+                if attr_value and len(attr_value) > 5 and self.is_valid_title(attr_value):
+                    return attr_value.strip()
+        except:
+            pass
+        job_keywords = ['developer', 'engineer', 'analyst', 'manager', 'specialist', 'associate',
+                       'consultant', 'executive', 'lead', 'senior', 'junior', 'intern', 'trainee']
+        for line in lines[:3]:
+            line_lower = line.lower()
+            if (any(keyword in line_lower for keyword in job_keywords) and
+                len(line) > 5 and len(line) < 100 and
+                not any(skip in line_lower for skip in ['company', 'location', 'salary', 'experience', 'ago', 'posted', 'apply', 'years', 'lpa'])):
+                return line.strip()
+        if lines and len(lines[0]) > 5 and len(lines[0]) < 100:
+            return lines[0].strip()
+        return None
+
+    def extract_proper_company(self, lines, element):
+        try:
+            for attr in ['data-company', 'data-employer']:
+                attr_value = element.get_attribute(attr)
+                if attr_value and len(attr_value) > 2:
+                    return attr_value.strip()
+        except:
+            pass
+        company_indicators = ['ltd', 'pvt', 'inc', 'corp', 'technologies', 'solutions', 'systems',
+                             'services', 'consultancy', 'consulting', 'software', 'infotech']
+        for line in lines[1:5]:
+            line_lower = line.lower()
+            if (len(line) > 2 and len(line) < 80 and
+                not any(skip in line_lower for skip in ['years', 'experience', 'salary', 'lpa', 'ago', 'posted', 'apply', 'bangalore', 'mumbai', 'delhi', 'hyderabad', 'chennai', 'pune']) and
+                (any(indicator in line_lower for indicator in company_indicators) or
+                 (len(line.split()) <= 4 and not line_lower.isdigit()))):
+                return line.strip()
+        return 'Not specified'
+
+    def extract_proper_location(self, lines):
+        indian_cities = ['bangalore', 'mumbai', 'delhi', 'hyderabad', 'chennai', 'pune', 'kolkata',
+                        'gurgaon', 'noida', 'ahmedabad', 'surat', 'jaipur', 'lucknow', 'kanpur',
+                        'nagpur', 'indore', 'thane', 'bhopal', 'visakhapatnam', 'pimpri', 'patna',
+                        'vadodara', 'ludhiana', 'agra', 'nashik', 'kochi', 'coimbatore', 'kozhikode']
+        for line in lines:
+            line_lower = line.lower()
+            if any(city in line_lower for city in indian_cities):
+                return line.strip()
+        return 'Not specified'
+
+    def extract_proper_experience(self, lines):
+        for line in lines:
+            line_lower = line.lower()
+            if (any(exp_word in line_lower for exp_word in ['year', 'experience', 'fresher', 'exp', 'yrs']) and
+                len(line) < 50 and
+                any(char.isdigit() for char in line)):
+                return line.strip()
+        for line in lines:
+            if 'fresher' in line.lower():
+                return 'Fresher'
+        return 'Not specified'
+
+    def extract_proper_salary(self, lines):
+        for line in lines:
+            line_lower = line.lower()
+            if (any(sal_word in line_lower for sal_word in ['lpa', 'salary', 'ctc', '₹', 'rs', 'lakhs', 'k']) and
+                len(line) < 50 and
+                any(char.isdigit() for char in line)):
+                return line.strip()
+        return 'Not disclosed'
+
+    def extract_proper_posted_date(self, lines):
+        for line in lines:
+            line_lower = line.lower()
+            if any(date_word in line_lower for date_word in ['ago', 'posted', 'days', 'hours', 'today', 'yesterday']):
+                return line.strip()
+        return 'Recently posted'
+
+    def is_valid_title(self, title):
+        title_lower = title.lower()
+        invalid_words = ['company', 'location', 'salary', 'experience', 'apply', 'view', 'details']
+        return not any(word in title_lower for word in invalid_words)
+
+    def validate_job_data(self, job_data):
+        title = job_data.get('title', '')
+        if not title or title == 'Not specified' or len(title) < 5:
+            return False
+        title_lower = title.lower()
+        invalid_titles = ['location', 'salary', 'experience', 'company', 'apply', 'view']
+        if any(invalid in title_lower for invalid in invalid_titles):
+            return False
+        return True
+
+    def determine_job_type(self, title, description):
+        text = f"{title} {description}".lower()
+        if any(term in text for term in ['intern', 'internship', 'trainee']):
+            return 'Internship'
+        elif any(term in text for term in ['contract', 'contractor', 'freelance']):
+            return 'Contract'
+        elif any(term in text for term in ['part time', 'part-time']):
+            return 'Part Time'
+        else:
+            return 'Full Time'
+
+
+class Card:
+    """Stands in for a Selenium WebElement: text plus a few attributes"""
+
+    def __init__(self, text, attributes):
+        self.text = text
+        self.attributes = attributes
+
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+
+
+TITLES = ('Senior Python Developer', 'Data Analyst', 'Sales Executive', 'HR Intern', 'Trainee Engineer',
+          'Accountant', 'Part-Time Content Writer', 'Contract QA Lead', 'Business Development Associate',
+          'Software Developer', '0 to 1 Yr', 'View Details', 'Apply Now')
+COMPANIES = ('ARTECH INFOSYSTEMS PRIVATE LIMITED', 'Tata Consultancy Services', 'Acme Pvt Ltd', 'Infosys',
+             'Wipro Technologies', 'Zoho Corp', 'Freshworks Inc', 'Company Confidential', 'Hyderabad Metro',
+             'Globex Software Solutions', '12345')
+CITIES = ('Bangalore', 'Mumbai, Pune', 'Delhi NCR', 'Hyderabad', 'Chennai', 'Noida', 'Kochi', 'Remote',
+          'Work from home', 'Gurgaon / Gurugram', 'Visakhapatnam')
+EXPERIENCE = ('3 to 8 Yrs', '0 to 1 Yr', 'Fresher', '5+ years', 'Experience: 2-4 years', 'Exp 1-3', '10 Yrs')
+SALARY = ('₹ 5-8 LPA', '3-5 Lakhs', 'Salary: 25k/month', 'CTC 12 LPA', 'Rs. 30,000', 'Not disclosed', '₹ ٣ LPA')
+POSTED = ('posted 3 days ago', 'Posted today', '2 hours ago', 'Yesterday', 'posted 3 weeks ago', 'Few days ago')
+EXTRA = ('python java +3', 'INTERVIEW ASSURED IN 15 MINS', 'Apply', 'Hot job', 'Work from office',
+         'Freelance', 'Immediate joiner', 'years of experience in sales', 'mbas welcome', 'Skills: sql, excel')
+
+
+def synthetic_cards(count, seed=9):
+    rng = random.Random(seed)
+    fields = (TITLES, COMPANIES, CITIES, EXPERIENCE, SALARY, POSTED, EXTRA, EXTRA)
+    cards = []
+    for _ in range(count):
+        parts = [rng.choice(field) for field in fields if rng.random() < 0.85]
+        # Vary the numbers and names so lines aren't drawn from a tiny pool
+        parts = [re.sub(r'\d+', lambda m: str(rng.randint(0, 30)), part) for part in parts]
+        if rng.random() < 0.5:
+            parts.insert(2, f"{rng.choice(COMPANIES).split()[0]} {rng.randrange(10000)} Pvt Ltd")
+        if rng.random() < 0.3:
+            rng.shuffle(parts)
+        attributes = {}
+        if rng.random() < 0.1:
+            attributes['title'] = rng.choice(TITLES)
+        if rng.random() < 0.1:
+            attributes['data-company'] = rng.choice(COMPANIES)
+        cards.append(Card('\n'.join(parts), attributes))
+    return cards
+
+
+def legacy_fields(heuristics, card):
+    lines = [line.strip() for line in card.text.split('\n') if line.strip()]
+    title = heuristics.extract_proper_title(lines, card)
+    if not title:
+        # FastShineSeleniumScraper skips a card without a title
+        return None
+    job = {
+        'title': title,
+        'company': heuristics.extract_proper_company(lines, card),
+        'location': heuristics.extract_proper_location(lines),
+        'experience_required': heuristics.extract_proper_experience(lines),
+        'salary': heuristics.extract_proper_salary(lines),
+        'posted_date': heuristics.extract_proper_posted_date(lines),
+    }
+    job['job_type'] = heuristics.determine_job_type(job['title'], card.text)
+    job['valid'] = heuristics.validate_job_data(job)
+    return job
+
+
+def automaton_fields(scraper, card):
+    lines = [line.strip() for line in card.text.split('\n') if line.strip()]
+    # Through the module, so the uncached pass below can swap it out
+    masks = [Shine_jobs.classify_line(line) for line in lines]
+    title = scraper.extract_proper_title(lines, masks, card)
+    if not title:
+        return None
+    job = {
+        'title': title,
+        'company': scraper.extract_proper_company(lines, masks, card),
+        'location': scraper.extract_proper_location(lines, masks),
+        'experience_required': scraper.extract_proper_experience(lines, masks),
+        'salary': scraper.extract_proper_salary(lines, masks),
+        'posted_date': scraper.extract_proper_posted_date(lines, masks),
+    }
+    job['job_type'] = scraper.determine_job_type(job['title'], card.text, masks)
+    job['valid'] = scraper.validate_job_data(job)
+    return job
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cards', type=int, default=20000)
+    args = parser.parse_args()
+
+    cards = synthetic_cards(args.cards)
+    legacy = LegacyLineHeuristics()
+    # The helpers don't touch the browser, so skip starting one
+    scraper = FastShineSeleniumScraper.__new__(FastShineSeleniumScraper)
+
+    start = time.perf_counter()
+    expected = [legacy_fields(legacy, card) for card in cards]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [automaton_fields(scraper, card) for card in cards]
+    automaton_time = time.perf_counter() - start
+    cache = classify_line.cache_info()
+    hit_rate = cache.hits / max(cache.hits + cache.misses, 1)
+
+    # Same again with every line scanned, i.e. only the automaton's share
+    Shine_jobs.classify_line = classify_line.__wrapped__
+    try:
+        start = time.perf_counter()
+        uncached = [automaton_fields(scraper, card) for card in cards]
+        uncached_time = time.perf_counter() - start
+    finally:
+        Shine_jobs.classify_line = classify_line
+    # 0 unless something still calls the cached function directly
+    uncached_hits = classify_line.cache_info().hits - cache.hits
+
+    mismatches = [(card.text, a, b) for card, a, b, c in zip(cards, expected, actual, uncached) if not a == b == c]
+    print(f"📦 {len(cards)} generated cards")
+    print(f"  Keyword scans: {legacy_time * 1e6 / len(cards):7.1f} µs/card")
+    print(f"  Automaton:     {automaton_time * 1e6 / len(cards):7.1f} µs/card  "
+          f"(line cache hit rate {hit_rate:.0%})")
+    print(f"  No line cache: {uncached_time * 1e6 / len(cards):7.1f} µs/card  "
+          f"({uncached_hits} cache hits during the pass)")
+    print(f"  Speedup: {legacy_time / automaton_time:.1f}x")
+    print(f"  Parity: {len(cards) - len(mismatches)}/{len(cards)} cards identical")
+    for text, a, b in mismatches[:5]:
+        print(f"  ❌ {text!r}\n     before: {a}\n     after:  {b}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
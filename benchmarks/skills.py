@@ -0,0 +1,99 @@
+# Skill tagging throughput on the scraped outputs, scaled up synthetically
+#
+# Synthetic records take a real title and splice together description text
+# from two real records, so the vocabulary matches the corpus.
+#
+#   python -m benchmarks.skills --jobs 200000
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import time
+
+from core.skills import CORPUS_GLOBS, get_tagger, job_texts, load_taxonomy, make_pool, tag_jobs
+
+
+def load_corpus(patterns=CORPUS_GLOBS):
+    texts = []
+    for pattern in patterns:
+        for filename in sorted(glob.glob(pattern)):
+            with open(filename, encoding='utf-8') as f:
+                jobs = json.load(f)
+            texts.extend(job_texts(job) for job in jobs if isinstance(job, dict))
+    return [(title or '', description or '') for title, description in texts]
+
+
+def synthetic_jobs(corpus, count, seed=11):
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        title, first = rng.choice(corpus)
+        _, second = rng.choice(corpus)
+        cut = rng.randint(0, len(second))
+        jobs.append({'jobid': f'synthetic-{i}', 'title': title, 'description': f"{first} {second[cut:]}"})
+    return jobs
+
+
+def regex_per_skill(taxonomy):
+    """The free-text scan downstream matching did: one pattern per skill"""
+    patterns = []
+    for skill, (_, aliases) in taxonomy.items():
+        names = sorted((re.escape(alias.lower()) for alias in aliases), key=len, reverse=True)
+        patterns.append((skill, re.compile(r'(?<![\w+#.])(?:' + '|'.join(names) + r')(?![\w+#])')))
+
+    def tag(title, description):
+        text = f"{title} {description}".lower()
+        return [skill for skill, pattern in patterns if pattern.search(text)]
+    return tag
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=200000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--baseline-sample', type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if not corpus:
+        raise SystemExit("No records in outputs/ or jsonFiles/ to scale up")
+    jobs = synthetic_jobs(corpus, args.jobs)
+    chars = sum(len(job['title']) + len(job['description']) for job in jobs)
+    print(f"📦 {len(corpus)} real records scaled to {len(jobs)} ({chars / len(jobs):.0f} chars each)")
+
+    start = time.perf_counter()
+    taxonomy = load_taxonomy()
+    tagger = get_tagger()
+    print(f"📚 {len(tagger)} skills, {tagger.names} names, compiled in {time.perf_counter() - start:.2f}s")
+
+    sample = jobs[:args.baseline_sample]
+    naive = regex_per_skill(taxonomy)
+    start = time.perf_counter()
+    for job in sample:
+        naive(job['title'], job['description'])
+    naive_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tag_jobs(jobs)
+    single = time.perf_counter() - start
+    tags = [len(job['tags']) for job in jobs]
+
+    for job in jobs:
+        job.pop('tags')
+    start = time.perf_counter()
+    with make_pool(args.processes) as pool:
+        tag_jobs(jobs, pool)
+    pooled = time.perf_counter() - start
+
+    print(f"  Regex per skill:      {naive_rate:>10,.0f} jobs/s  (measured on {len(sample)} jobs)")
+    print(f"  Trie, one process:    {len(jobs) / single:>10,.0f} jobs/s  ({single:.2f}s)")
+    print(f"  Trie, {args.processes} processes:    {len(jobs) / pooled:>10,.0f} jobs/s  ({pooled:.2f}s, "
+          f"{os.cpu_count()} CPUs, including pool start-up)")
+    print(f"  Jobs with tags: {sum(1 for n in tags if n) / len(tags):.0%}, "
+          f"{sum(tags) / len(tags):.1f} tags per job")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Sequential vs concurrent TimesJobs page fetching against a local stand-in server
+#
+#   python -m benchmarks.timesjobs_concurrent --pages 30 --latency 0.5
+import argparse
+import time
+
+from benchmarks.fixtures import StandInServer, load_jobs, render_timesjobs_page, TIMESJOBS_SAMPLE
+from core.spiders.TimesJobs_jobs import TimesJobsScraper
+
+
+def make_handler(sample, per_page=25):
+    def handler(path, query):
+        page = int(query.get('sequence', ['1'])[0])
+        jobs = []
+        for i in range(per_page):
+            job = dict(sample[(page * per_page + i) % len(sample)])
+            job['link'] = f"{job.get('link')}-p{page}-{i}"
+            jobs.append(job)
+        return 200, 'text/html; charset=utf-8', render_timesjobs_page(jobs)
+    return handler
+
+
+def strip_volatile(jobs):
+    return [{k: v for k, v in job.items() if k != 'scraped_at'} for job in jobs]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.5, help='server latency per page (s)')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=4.0, help='token-bucket pages per second')
+    args = parser.parse_args()
+
+    sample = load_jobs(TIMESJOBS_SAMPLE)
+    with StandInServer(make_handler(sample), latency=args.latency) as server:
+        scraper = TimesJobsScraper(base_url=server.url)
+
+        start = time.perf_counter()
+        sequential = scraper.scrape_timesjobs(pages=args.pages)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = scraper.scrape_timesjobs_concurrent(
+            pages=args.pages, max_workers=args.workers, rate=args.rate, burst=args.workers)
+        concurrent_time = time.perf_counter() - start
+
+    print(f"\n{'='*50}")
+    print(f"📊 {args.pages} pages, {args.latency:.2f}s server latency")
+    print(f"  Sequential: {sequential_time:6.2f}s  ({len(sequential)} jobs)")
+    print(f"  Concurrent: {concurrent_time:6.2f}s  ({len(concurrent)} jobs, "
+          f"{args.workers} workers, {args.rate} pages/s)")
+    print(f"  Speedup:    {sequential_time / concurrent_time:6.1f}x")
+    print(f"  Same output, same order: {strip_volatile(sequential) == strip_volatile(concurrent)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Parse throughput of the BeautifulSoup and lxml TimesJobs parsers
+#
+#   python -m benchmarks.timesjobs_parse                 # synthetic pages from outputs/
+#   python -m benchmarks.timesjobs_parse saved_pages/    # directory of saved *.html pages
+import argparse
+import glob
+import os
+import time
+
+from benchmarks.fixtures import load_jobs, render_timesjobs_page, TIMESJOBS_SAMPLE
+from core.spiders.TimesJobs_jobs import TimesJobsScraper
+
+
+def synthetic_pages(count, per_page=25):
+    sample = load_jobs(TIMESJOBS_SAMPLE)
+    pages = []
+    for page in range(count):
+        jobs = [sample[(page * per_page + i) % len(sample)] for i in range(per_page)]
+        pages.append(render_timesjobs_page(jobs))
+    return pages
+
+
+def strip_volatile(jobs):
+    return [{k: v for k, v in job.items() if k != 'scraped_at'} for job in jobs or []]
+
+
+def bench(scraper, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for content in pages:
+            scraper.parse_page(content)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages_dir', nargs='?')
+    parser.add_argument('--pages', type=int, default=20, help='synthetic pages to generate')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages_dir, '*.html'))):
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+    else:
+        pages = synthetic_pages(args.pages)
+
+    bs4_scraper = TimesJobsScraper(parser='bs4')
+    lxml_scraper = TimesJobsScraper(parser='lxml')
+
+    mismatches = sum(
+        strip_volatile(bs4_scraper.parse_page(content)) != strip_volatile(lxml_scraper.parse_page(content))
+        for content in pages)
+
+    total_mb = sum(len(content) for content in pages) * args.rounds / 1e6
+    bs4_time = bench(bs4_scraper, pages, args.rounds)
+    lxml_time = bench(lxml_scraper, pages, args.rounds)
+    parsed = len(pages) * args.rounds
+
+    print(f"📊 {len(pages)} pages x {args.rounds} rounds ({total_mb:.1f} MB)")
+    print(f"  bs4/html.parser: {parsed / bs4_time:8.1f} pages/s  {total_mb / bs4_time:6.1f} MB/s")
+    print(f"  lxml iterparse:  {parsed / lxml_time:8.1f} pages/s  {total_mb / lxml_time:6.1f} MB/s")
+    print(f"  Speedup:         {bs4_time / lxml_time:8.1f}x")
+    print(f"  Pages with different output: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
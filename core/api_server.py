@@ -0,0 +1,318 @@
+# Read-only HTTP API over the normalized job corpus
+#
+#   GET /jobs?source=&location=&job_type=&posted_after=YYYY-MM-DD&limit=&cursor=
+#   GET /job?key=<job key, usually its link>
+#   GET /stats
+#
+# Jobs come newest first (by posted date, then key), and pages are keyset
+# paginated: every page carries a `next_cursor` holding the sort position of
+# its last job, and the next page starts right after it, so a page stays
+# correct while jobs are being added ahead of it.
+#
+# The whole corpus is held in memory as canonical records, with one list of
+# positions per source and per job type so an equality filter only walks its
+# own jobs. Rendered pages go into an LRU cache keyed by the query; every
+# response carries an ETag over its body and a matching If-None-Match gets a
+# 304. A watcher thread reloads the corpus when the scrapers append to it,
+# which starts a new cache generation.
+#
+#   python -m core.api_server --port 8080
+import argparse
+import base64
+import glob
+import hashlib
+import json
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from core.corpus import CORPUS_GLOBS, CORPUS_PATH, Corpus, corpus_stamp
+from core.normalize import normalize_jobs
+from core.records import canonical_job
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+CACHE_SIZE = 4096
+# Seconds between checks for new ingest
+RELOAD_INTERVAL = 2.0
+
+
+def normalize_job_type(value):
+    return re.sub(r'[\s_-]+', ' ', value).lower()
+
+
+def encode_cursor(position):
+    raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    ordinal, key = json.loads(base64.urlsafe_b64decode(padded))
+    return int(ordinal), str(key)
+
+
+class JobTable:
+    """Canonical records in page order, with position lists for the equality filters"""
+
+    def __init__(self, jobs):
+        records = {}
+        for job in jobs:
+            record = canonical_job(job)
+            records[record['key']] = record
+        records = list(records.values())
+        normalize_jobs(records)
+
+        def sort_key(record):
+            # Newest first; undated jobs go last
+            posted = record['posted_date']
+            return (-date.fromisoformat(posted).toordinal() if posted else 0, record['key'])
+        records.sort(key=sort_key)
+        self.records = records
+        self.positions = [sort_key(record) for record in records]
+        self.by_source = {}
+        self.by_job_type = {}
+        for i, record in enumerate(records):
+            if record['source']:
+                self.by_source.setdefault(record['source'], []).append(i)
+            if record['job_type']:
+                self.by_job_type.setdefault(record['job_type'], []).append(i)
+        self.by_key = {record['key']: record for record in records}
+
+    def __len__(self):
+        return len(self.records)
+
+    def page(self, source=None, location=None, job_type=None, posted_after=None,
+             include_inactive=False, limit=DEFAULT_LIMIT, cursor=None):
+        """(records, next cursor or None) for one page of a query"""
+        start = bisect_right(self.positions, cursor) if cursor else 0
+        candidates = None
+        if source:
+            candidates = self.by_source.get(source.lower(), [])
+        if job_type:
+            typed = self.by_job_type.get(normalize_job_type(job_type), [])
+            if candidates is None or len(typed) < len(candidates):
+                candidates = typed
+        if candidates is None:
+            indexes = range(start, len(self.records))
+        else:
+            indexes = candidates[bisect_right(candidates, start - 1):]
+
+        source = source.lower() if source else None
+        job_type = normalize_job_type(job_type) if job_type else None
+        location = location.lower() if location else None
+        page = []
+        last = None
+        for i in indexes:
+            record = self.records[i]
+            if source and record['source'] != source:
+                continue
+            if job_type and record['job_type'] != job_type:
+                continue
+            if location and location not in (record['location'] or '').lower():
+                continue
+            if posted_after:
+                # Sorted newest first: past the date, nothing else can match
+                if not record['posted_date'] or record['posted_date'] < posted_after:
+                    break
+            if not include_inactive and record['active'] is False:
+                continue
+            page.append(record)
+            last = i
+            if len(page) == limit:
+                break
+        more = len(page) == limit and last is not None and last + 1 < len(self.records)
+        return page, encode_cursor(self.positions[last]) if more else None
+
+
+class JobService:
+    """The current table plus the page cache; swaps both when the corpus changes"""
+
+    def __init__(self, path=CORPUS_PATH, patterns=CORPUS_GLOBS, cache_size=CACHE_SIZE):
+        self.path = path
+        self.patterns = patterns
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stamp = None
+        self.generation = 0
+        self.load()
+
+    def _load_jobs(self):
+        corpus = Corpus(self.path)
+        if corpus.readers:
+            return list(corpus.records()), corpus_stamp(self.path)
+        # No corpus built yet: serve the JSON output files
+        jobs = []
+        for pattern in self.patterns:
+            for filename in sorted(glob.glob(pattern)):
+                try:
+                    with open(filename, encoding='utf-8') as f:
+                        loaded = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                jobs.extend(job for job in loaded if isinstance(job, dict))
+        return jobs, None
+
+    def load(self):
+        start = time.perf_counter()
+        jobs, stamp = self._load_jobs()
+        table = JobTable(jobs)
+        with self.lock:
+            self.table = table
+            self.stamp = stamp
+            self.generation += 1
+            self.cache = OrderedDict()
+        print(f"📚 Serving {len(table)} jobs (generation {self.generation}, "
+              f"loaded in {time.perf_counter() - start:.2f}s)")
+
+    def reload_if_changed(self):
+        """Reload after new ingest. Returns True if the corpus changed"""
+        stamp = corpus_stamp(self.path)
+        if stamp == self.stamp or not stamp:
+            return False
+        self.load()
+        return True
+
+    def watch(self, interval=RELOAD_INTERVAL):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    print(f"⚠️ Reload failed, still serving generation {self.generation}: {e}")
+        threading.Thread(target=loop, daemon=True).start()
+
+    def query(self, params):
+        """(body, etag) of a /jobs page, from the cache when possible"""
+        key = tuple(sorted(params.items()))
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            table = self.table
+
+        limit = min(max(int(params.get('limit') or DEFAULT_LIMIT), 1), MAX_LIMIT)
+        cursor = decode_cursor(params['cursor']) if params.get('cursor') else None
+        posted_after = params.get('posted_after')
+        if posted_after:
+            posted_after = date.fromisoformat(posted_after).isoformat()
+        jobs, next_cursor = table.page(
+            source=params.get('source'), location=params.get('location'),
+            job_type=params.get('job_type'), posted_after=posted_after,
+            include_inactive=params.get('include_inactive') in ('1', 'true'),
+            limit=limit, cursor=cursor)
+        body = json.dumps({'jobs': jobs, 'count': len(jobs), 'next_cursor': next_cursor},
+                          ensure_ascii=False).encode('utf-8')
+        result = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+
+        with self.lock:
+            # A reload while we rendered started a new cache; don't put a stale page in it
+            if table is self.table:
+                self.cache[key] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return result
+
+    def stats(self):
+        with self.lock:
+            return {'jobs': len(self.table), 'generation': self.generation,
+                    'cache_entries': len(self.cache), 'cache_hits': self.hits,
+                    'cache_misses': self.misses}
+
+
+QUERY_PARAMS = frozenset(['source', 'location', 'job_type', 'posted_after', 'include_inactive',
+                          'limit', 'cursor'])
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; with Nagle on, keep-alive
+        # clients wait out a delayed ACK on every response
+        disable_nagle_algorithm = True
+
+        def _send(self, status, body=b'', etag=None):
+            self.send_response(status)
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            if status != 304:
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def _error(self, status, message):
+            self._send(status, json.dumps({'error': message}).encode('utf-8'))
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            params = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+            if parts.path == '/jobs':
+                unknown = set(params) - QUERY_PARAMS
+                if unknown:
+                    return self._error(400, f"unknown parameter {sorted(unknown)[0]!r}")
+                try:
+                    body, etag = service.query(params)
+                except (ValueError, TypeError) as e:
+                    return self._error(400, f"bad query: {e}")
+            elif parts.path == '/job':
+                record = service.table.by_key.get(params.get('key', ''))
+                if record is None:
+                    return self._error(404, "no such job")
+                body = json.dumps(record, ensure_ascii=False).encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            elif parts.path == '/stats':
+                return self._send(200, json.dumps(service.stats()).encode('utf-8'))
+            else:
+                return self._error(404, "not found")
+
+            if etag in (self.headers.get('If-None-Match') or ''):
+                return self._send(304, etag=etag)
+            self._send(200, body, etag)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(service, host='127.0.0.1', port=8080):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the job corpus over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    service = JobService(args.corpus)
+    service.watch()
+    server = make_server(service, args.host, args.port)
+    print(f"🌐 Listening on http://{args.host}:{server.server_address[1]}/jobs")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
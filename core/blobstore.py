@@ -0,0 +1,163 @@
+# Content-addressed store for full job descriptions
+#
+# Records only carry a short preview of the description (what the scrapers
+# used to cut it down to) plus `description_hash`, the SHA-1 of the full
+# text. The text itself is stored once, zlib-compressed, under
+# outputs/blobs/<first two hex digits>/<rest of the hash>, so the same
+# boilerplate description scraped under ten keywords and thirty runs costs
+# one file. full_description() loads it back when something needs it.
+#
+# The scrapers' parsers keep the full text on the record; it is moved into
+# the store when the records are saved (store_descriptions(), or
+# DescriptionStorePipeline for the Scrapy spiders), so parsing a page never
+# touches the disk.
+#
+#   python -m core.blobstore --stats
+#   python -m core.blobstore --show 3f2a...
+import argparse
+import hashlib
+import os
+import threading
+import zlib
+from functools import lru_cache
+
+from core.log import get_logger
+from core.records import MISSING
+
+logger = get_logger('blobstore')
+
+DEFAULT_BLOB_PATH = 'outputs/blobs'
+PREVIEW_CHARS = 300
+COMPRESSION_LEVEL = 6
+# Decompressed descriptions kept in memory per store
+CACHE_SIZE = 1024
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class BlobStore:
+    def __init__(self, path=DEFAULT_BLOB_PATH):
+        self.path = path
+        self.get = lru_cache(maxsize=CACHE_SIZE)(self._read)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.path, digest[:2], digest[2:])
+
+    def put(self, text):
+        """Store a text unless it's already there. Returns its hash"""
+        digest = text_hash(text)
+        blob_path = self._blob_path(digest)
+        if os.path.exists(blob_path):
+            return digest
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL))
+        # Two writers of the same blob write the same bytes; either one wins
+        os.replace(tmp_path, blob_path)
+        return digest
+
+    def _read(self, digest):
+        try:
+            with open(self._blob_path(digest), 'rb') as f:
+                return zlib.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, digest):
+        return os.path.exists(self._blob_path(digest))
+
+    def stats(self):
+        """(blob count, compressed bytes, original bytes) for everything stored"""
+        count = stored = original = 0
+        for directory, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    data = f.read()
+                count += 1
+                stored += len(data)
+                original += len(zlib.decompress(data))
+        return count, stored, original
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blobstore(path=DEFAULT_BLOB_PATH):
+    """Return the process-wide blob store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore(path)
+        return _store
+
+
+def preview(text, limit=PREVIEW_CHARS):
+    return text[:limit] + '...' if len(text) > limit else text
+
+
+def store_description(text, preview_chars=PREVIEW_CHARS):
+    """Keep the full description in the blob store. Returns (preview, hash)
+
+    The hash is None for an empty or placeholder ("N/A") text, or when the
+    store can't be written; the scrape carries on with the preview either way.
+    """
+    text = (text or '').strip()
+    if text.lower() in MISSING:
+        return text, None
+    try:
+        digest = get_blobstore().put(text)
+    except OSError as e:
+        logger.warning("⚠️ Could not store description: %s", e)
+        digest = None
+    return preview(text, preview_chars), digest
+
+
+def store_descriptions(jobs, preview_chars=PREVIEW_CHARS, field='description'):
+    """Replace each record's full description with a preview and its description_hash"""
+    for job in jobs:
+        # Already stored (a record restored from an earlier save)
+        if job.get('description_hash') or job.get(field) is None:
+            continue
+        job[field], job['description_hash'] = store_description(job[field], preview_chars)
+    return jobs
+
+
+def full_description(job, store=None):
+    """The full description of a record, loaded on first use
+
+    Falls back to whatever description the record itself carries when it
+    has no hash or the blob is missing.
+    """
+    digest = job.get('description_hash')
+    if digest:
+        text = (store or get_blobstore()).get(digest)
+        if text is not None:
+            return text
+    return job.get('description') or job.get('job_description')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the description blob store")
+    parser.add_argument('--stats', action='store_true')
+    parser.add_argument('--show', metavar='HASH', help="print a stored description")
+    args = parser.parse_args()
+
+    store = get_blobstore()
+    if args.show:
+        text = store.get(args.show)
+        print(text if text is not None else f"❌ No blob {args.show}")
+    if args.stats or not args.show:
+        count, stored, original = store.stats()
+        ratio = original / stored if stored else 0
+        print(f"📦 {count} descriptions, {original / 1024:.0f} KB of text in {stored / 1024:.0f} KB "
+              f"({ratio:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+# Change data capture between scrape runs
+#
+# Every run rewrites (or appends to) a source's output file, so consumers
+# can't tell what actually changed without diffing everything. capture()
+# compares a run against the content hash stored for each job (keyed by
+# job_key()) and appends insert / update / delete events to one ordered log,
+# outputs/changes.jsonl. Every event carries a sequence number; a consumer
+# remembers the last one it processed and reads on from there with
+# read_changes().
+#
+# The hash leaves out fields that change on every run without the job
+# changing: scrape timestamps, the tags and isActive that later stages fill
+# in, where the crawl found the job (page_url, search_term), the tracking
+# query string of its link, and the relative posted text ("2 days ago"
+# yesterday is "3 days ago" today), which is hashed as the date it resolves to.
+#
+# Deletes only come from complete runs. The API sources fetch just what is
+# newer than their high-water mark, so their runs are partial and can only
+# insert or update; an empty run is treated as partial too, since it almost
+# always means the site blocked us rather than that every job expired.
+#
+#   python -m core.cdc --report
+#   python -m core.cdc --since 1200
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from core.dates import resolve_posted
+from core.records import FIELD_ALIASES, LINK_FIELDS, first_value, job_key, strip_tracking
+
+DEFAULT_CDC_PATH = 'outputs/cdc.sqlite3'
+DEFAULT_CHANGELOG_PATH = 'outputs/changes.jsonl'
+
+# Seconds a capture waits for one running in another process
+CAPTURE_TIMEOUT = 120
+
+VOLATILE_FIELDS = frozenset(FIELD_ALIASES['scraped'] + FIELD_ALIASES['posted'] +
+                            ('tags', 'isActive', 'page_url', 'search_term'))
+
+
+def content_hash(job):
+    """Hash of a record's content, ignoring the fields that change on every run"""
+    stable = {name: value for name, value in job.items() if name not in VOLATILE_FIELDS}
+    for name in LINK_FIELDS:
+        if isinstance(stable.get(name), str):
+            stable[name] = strip_tracking(stable[name])
+    posted = resolve_posted(first_value(job, FIELD_ALIASES['posted']),
+                            first_value(job, FIELD_ALIASES['scraped']))
+    stable['posted'] = posted.isoformat() if posted else None
+    raw = json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class RunStats:
+    def __init__(self, source, run_id, total, inserts, updates, deletes, complete):
+        self.source = source
+        self.run_id = run_id
+        self.total = total
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+        self.complete = complete
+
+    @property
+    def changes(self):
+        return self.inserts + self.updates + self.deletes
+
+    @property
+    def unchanged(self):
+        return self.total - self.inserts - self.updates
+
+    def __str__(self):
+        ratio = self.changes / self.total if self.total else 0
+        return (f"{self.source}: +{self.inserts} ~{self.updates} -{self.deletes} "
+                f"={self.unchanged} ({self.changes} changes for {self.total} jobs, {ratio:.0%})")
+
+
+class ChangeCapture:
+    def __init__(self, path=DEFAULT_CDC_PATH, log_path=DEFAULT_CHANGELOG_PATH):
+        self.path = path
+        self.log_path = log_path
+        for filename in (path, log_path):
+            if filename != ':memory:' and os.path.dirname(filename):
+                os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self.lock = threading.Lock()
+        # Captures in other processes wait for this one's write transaction
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=CAPTURE_TIMEOUT)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                last_seq INTEGER NOT NULL,
+                PRIMARY KEY (source, key)
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                finished_at REAL NOT NULL,
+                complete INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                inserts INTEGER NOT NULL,
+                updates INTEGER NOT NULL,
+                deletes INTEGER NOT NULL,
+                first_seq INTEGER,
+                last_seq INTEGER
+            );
+        """)
+        self.conn.commit()
+        self.seq = self._last_seq()
+
+    def _last_seq(self):
+        """The last sequence number handed out, by any process"""
+        row = self.conn.execute('SELECT MAX(last_seq) FROM runs').fetchone()
+        # The log can be ahead of the database after a crash; never reuse a number
+        return max(row[0] or 0, self._last_logged_seq())
+
+    def _last_logged_seq(self):
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(f.tell() - 65536, 0))
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        for line in reversed(lines):
+            try:
+                return json.loads(line)['seq']
+            except (ValueError, KeyError):
+                continue
+        return 0
+
+    def capture(self, source, jobs, complete=True):
+        """Diff a run's jobs against the stored state and log the changes. Returns RunStats"""
+        # Within a run the last copy of a job wins, in first-seen order
+        current = {}
+        for job in jobs:
+            job = dict(job)
+            current[job_key(job)] = job
+        complete = complete and bool(current)
+
+        with self.lock:
+            # The write lock is taken up front and held until the state commits,
+            # so captures in other processes (api_scraping next to run_all) get
+            # the sequence numbers after this one's, never the same ones
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                stored = dict(self.conn.execute(
+                    'SELECT key, hash FROM records WHERE source = ?', (source,)))
+                cursor = self.conn.execute(
+                    'INSERT INTO runs (source, finished_at, complete, total, inserts, updates, deletes) '
+                    'VALUES (?, ?, ?, ?, 0, 0, 0)', (source, time.time(), int(complete), len(current)))
+                run_id = cursor.lastrowid
+                # Re-read under the lock: another process may have logged since
+                self.seq = self._last_seq()
+                first_seq = self.seq + 1
+                now = datetime.now().isoformat(timespec='seconds')
+
+                events = []
+                rows = []
+                counts = {'insert': 0, 'update': 0, 'delete': 0}
+                for key, job in current.items():
+                    digest = content_hash(job)
+                    previous = stored.pop(key, None)
+                    if previous == digest:
+                        continue
+                    op = 'insert' if previous is None else 'update'
+                    self.seq += 1
+                    counts[op] += 1
+                    events.append({'seq': self.seq, 'op': op, 'source': source, 'key': key,
+                                   'run': run_id, 'at': now, 'hash': digest, 'record': job})
+                    rows.append((source, key, digest, self.seq))
+                deleted = sorted(stored) if complete else []
+                for key in deleted:
+                    self.seq += 1
+                    counts['delete'] += 1
+                    events.append({'seq': self.seq, 'op': 'delete', 'source': source, 'key': key,
+                                   'run': run_id, 'at': now, 'hash': None, 'record': None})
+
+                # The log is written before the state commits; after a crash in
+                # between, the same changes are logged again under new numbers
+                # (at-least-once)
+                if events:
+                    with open(self.log_path, 'a', encoding='utf-8') as f:
+                        for event in events:
+                            f.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+                        f.flush()
+                        os.fsync(f.fileno())
+                self.conn.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)', rows)
+                self.conn.executemany('DELETE FROM records WHERE source = ? AND key = ?',
+                                      [(source, key) for key in deleted])
+                self.conn.execute(
+                    'UPDATE runs SET inserts = ?, updates = ?, deletes = ?, first_seq = ?, last_seq = ? '
+                    'WHERE run_id = ?',
+                    (counts['insert'], counts['update'], counts['delete'],
+                     first_seq if events else None, self.seq if events else None, run_id))
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        return RunStats(source, run_id, len(current), counts['insert'], counts['update'],
+                        counts['delete'], complete)
+
+    def runs(self, source=None, limit=20):
+        """Delta sizes of the latest runs, newest first"""
+        query = 'SELECT source, run_id, total, inserts, updates, deletes, complete FROM runs'
+        params = ()
+        if source:
+            query += ' WHERE source = ?'
+            params = (source,)
+        query += ' ORDER BY run_id DESC LIMIT ?'
+        return [RunStats(*row) for row in self.conn.execute(query, params + (limit,))]
+
+    def report(self):
+        """Print the latest run and average delta size per source"""
+        rows = self.conn.execute("""
+            SELECT source, COUNT(*), SUM(total), SUM(inserts), SUM(updates), SUM(deletes), MAX(run_id)
+            FROM runs GROUP BY source ORDER BY source
+        """).fetchall()
+        if not rows:
+            return
+        print(f"\n{'='*70}")
+        print("🔁 CHANGE CAPTURE SUMMARY")
+        print(f"{'='*70}")
+        print(f"{'Source':<24}{'Runs':>6}{'Inserts':>9}{'Updates':>9}{'Deletes':>9}{'Avg delta':>11}")
+        for source, runs, total, inserts, updates, deletes, _ in rows:
+            delta = (inserts + updates + deletes) / total if total else 0
+            print(f"{source[:23]:<24}{runs:>6}{inserts:>9}{updates:>9}{deletes:>9}{delta:>11.0%}")
+        print(f"Last sequence number: {self.seq}")
+
+
+def read_changes(since=0, log_path=DEFAULT_CHANGELOG_PATH, source=None):
+    """Yield logged events with a sequence number above `since`, in order"""
+    try:
+        f = open(log_path, encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            event = json.loads(line)
+            if event['seq'] > since and (source is None or event['source'] == source):
+                yield event
+
+
+_capture = None
+_capture_lock = threading.Lock()
+
+
+def get_capture(path=DEFAULT_CDC_PATH, log_path=DEFAULT_CHANGELOG_PATH):
+    """Return the process-wide change capture"""
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = ChangeCapture(path, log_path)
+        return _capture
+
+
+def capture_changes(source, jobs, complete=True):
+    """Log the changes in a finished run; never fails the scrape"""
+    try:
+        stats = get_capture().capture(source, jobs, complete)
+        print(f"🔁 {stats}")
+        return stats
+    except Exception as e:
+        print(f"⚠️ Could not capture changes: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the change log between scrape runs")
+    parser.add_argument('--report', action='store_true', help="delta sizes per source")
+    parser.add_argument('--since', type=int, help="print events after this sequence number")
+    parser.add_argument('--source')
+    args = parser.parse_args()
+
+    if args.since is not None:
+        for event in read_changes(args.since, source=args.source):
+            record = event['record'] or {}
+            print(f"{event['seq']:>8}  {event['op']:<7} {event['source']:<16} "
+                  f"{record.get('title') or record.get('job_title') or ''} {event['key']}")
+    if args.report or args.since is None:
+        get_capture().report()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# Checkpoint store for the long-running Selenium and requests-based scrapers
+#
+# Every finished (query, location, page) unit is recorded together with the
+# jobs it produced, in a single SQLite transaction. If Chrome crashes or the
+# process is killed, the next run skips the finished units and picks up the
+# jobs that were already emitted.
+import json
+import os
+import sqlite3
+import time
+
+from core.records import job_key
+
+DEFAULT_CHECKPOINT_PATH = 'outputs/checkpoints.sqlite3'
+
+
+class CheckpointStore:
+    def __init__(self, source, path=DEFAULT_CHECKPOINT_PATH):
+        self.source = source
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS units (
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                location TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                job_count INTEGER NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (source, query, location, page)
+            );
+            CREATE TABLE IF NOT EXISTS jobs (
+                source TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (source, job_id)
+            );
+        """)
+        self.conn.commit()
+        self._seen = {row[0] for row in self.conn.execute(
+            'SELECT job_id FROM jobs WHERE source = ?', (source,))}
+
+    def is_done(self, query, location, page):
+        """Check whether a unit was completed by an earlier run"""
+        row = self.conn.execute(
+            'SELECT 1 FROM units WHERE source = ? AND query = ? AND location = ? AND page = ?',
+            (self.source, query, location, page)).fetchone()
+        return row is not None
+
+    def seen(self, job):
+        """Check whether a job was already emitted"""
+        return job_key(job) in self._seen
+
+    def add_jobs(self, jobs):
+        """Record emitted jobs, skipping ones that are already stored. Returns the new ones"""
+        new_jobs = []
+        rows = []
+        for job in jobs:
+            key = job_key(job)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            new_jobs.append(job)
+            rows.append((self.source, key, json.dumps(job, ensure_ascii=False)))
+        if rows:
+            self.conn.executemany('INSERT OR IGNORE INTO jobs VALUES (?, ?, ?)', rows)
+        return new_jobs
+
+    def mark_done(self, query, location, page, jobs=()):
+        """Record a finished unit and its jobs atomically. Returns the jobs not seen before"""
+        with self.conn:
+            new_jobs = self.add_jobs(jobs)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?, ?)',
+                (self.source, query, location, page, len(new_jobs), time.time()))
+        return new_jobs
+
+    def flush(self):
+        """Commit jobs recorded with add_jobs outside of mark_done"""
+        self.conn.commit()
+
+    def load_jobs(self):
+        """Return every job emitted so far, in emission order"""
+        rows = self.conn.execute(
+            'SELECT payload FROM jobs WHERE source = ? ORDER BY rowid', (self.source,))
+        return [json.loads(row[0]) for row in rows]
+
+    def completed_units(self):
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM units WHERE source = ?', (self.source,)).fetchone()[0]
+
+    def clear(self):
+        """Forget this source's progress once its results are safely saved"""
+        with self.conn:
+            self.conn.execute('DELETE FROM units WHERE source = ?', (self.source,))
+            self.conn.execute('DELETE FROM jobs WHERE source = ?', (self.source,))
+        self._seen.clear()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,403 @@
+# Random-access job corpus: JSONL records plus a sorted hash -> offset index
+#
+# Each source gets three files under outputs/corpus/:
+#
+#   <source>.jsonl   one record per line, only ever appended to
+#   <source>.idx     header, then N sorted uint64 key hashes, then the N
+#                    matching uint64 byte offsets into the .jsonl
+#   <source>.tail    (hash, offset) pairs for records appended since the
+#                    .idx was last written
+#
+# CorpusReader memory-maps the .jsonl and the .idx, so opening a corpus costs
+# the same at a thousand records as at ten million, and a lookup is a binary
+# search over the mapped hashes plus one json.loads of the line it points to.
+# Scans over a range of key hashes (e.g. to split the corpus between workers)
+# walk the index in order, with the tail's entries for the range merged in.
+# The .tail is small and read into a dict on open.
+#
+# CorpusWriter appends records and their tail entries; once the tail passes
+# TAIL_LIMIT entries it is merged into a new .idx, which replaces the old one
+# atomically. A job appended again (re-scraped) shadows its older line: the
+# newest offset wins.
+#
+#   python -m core.corpus --build
+#   python -m core.corpus --get https://www.shine.com/jobs/...
+import argparse
+import glob
+import json
+import mmap
+import os
+import threading
+
+import numpy as np
+
+from core.records import job_key
+from core.search_index import key_hash
+
+CORPUS_PATH = 'outputs/corpus'
+CORPUS_GLOBS = ('outputs/*.json', 'jsonFiles/*.json')
+
+INDEX_MAGIC = b'JOBIDX1\0'
+HEADER_SIZE = 16
+TAIL_ENTRY = np.dtype([('hash', '<u8'), ('offset', '<u8')])
+# Tail entries kept before they are merged into the sorted index
+TAIL_LIMIT = 50000
+
+
+def _paths(path, source):
+    base = os.path.join(path, source)
+    return base + '.jsonl', base + '.idx', base + '.tail'
+
+
+def _map(filename):
+    """Read-only mapping of a file, or None when it is missing or empty"""
+    try:
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+def _read_index(filename):
+    """(mapping, hashes, offsets) of an index file; the arrays are views of the mapping"""
+    mapped = _map(filename)
+    if mapped is None:
+        empty = np.zeros(0, np.uint64)
+        return None, empty, empty
+    if mapped[:8] != INDEX_MAGIC:
+        raise ValueError(f"{filename} is not a corpus index")
+    count = int.from_bytes(mapped[8:16], 'little')
+    hashes = np.frombuffer(mapped, '<u8', count, HEADER_SIZE)
+    offsets = np.frombuffer(mapped, '<u8', count, HEADER_SIZE + 8 * count)
+    return mapped, hashes, offsets
+
+
+def _read_tail(filename):
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        data = b''
+    # A torn last entry (crash mid-append) is dropped
+    return np.frombuffer(data[:len(data) - len(data) % TAIL_ENTRY.itemsize], TAIL_ENTRY)
+
+
+def merge_index(hashes, offsets, tail):
+    """Sorted (hashes, offsets) with the tail merged in, keeping the newest offset per hash"""
+    all_hashes = np.concatenate([hashes, tail['hash']])
+    all_offsets = np.concatenate([offsets, tail['offset']])
+    # Sort by hash, then offset; the last entry of each hash run is the newest
+    order = np.lexsort((all_offsets, all_hashes))
+    all_hashes = all_hashes[order]
+    all_offsets = all_offsets[order]
+    keep = np.ones(len(all_hashes), bool)
+    keep[:-1] = all_hashes[1:] != all_hashes[:-1]
+    return all_hashes[keep], all_offsets[keep]
+
+
+def _hash_range(hashes, lo, hi):
+    """Slice bounds of the sorted hashes with lo <= hash < hi"""
+    start = int(np.searchsorted(hashes, np.uint64(lo), 'left'))
+    stop = len(hashes) if hi >= 2 ** 64 else int(np.searchsorted(hashes, np.uint64(hi), 'left'))
+    return start, stop
+
+
+def write_index(filename, hashes, offsets):
+    tmp_path = filename + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(len(hashes).to_bytes(8, 'little'))
+        f.write(np.ascontiguousarray(hashes, '<u8').tobytes())
+        f.write(np.ascontiguousarray(offsets, '<u8').tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filename)
+
+
+class CorpusWriter:
+    """Appends one source's records and keeps its index current"""
+
+    def __init__(self, source, path=CORPUS_PATH):
+        os.makedirs(path, exist_ok=True)
+        self.source = source
+        self.data_path, self.index_path, self.tail_path = _paths(path, source)
+        self.lock = threading.RLock()
+        self._recover()
+
+    def _recover(self):
+        """Index complete lines a crash left behind and drop a torn last line"""
+        _, hashes, offsets = _read_index(self.index_path)
+        tail = _read_tail(self.tail_path)
+        indexed = [int(offsets.max()) if len(offsets) else -1,
+                   int(tail['offset'].max()) if len(tail) else -1]
+        last = max(indexed)
+        if not os.path.exists(self.data_path):
+            open(self.data_path, 'wb').close()
+        with open(self.data_path, 'rb+') as f:
+            start = 0
+            if last >= 0:
+                f.seek(last)
+                f.readline()
+                start = f.tell()
+            f.seek(start)
+            entries = []
+            offset = start
+            for line in f:
+                if not line.endswith(b'\n'):
+                    f.truncate(offset)
+                    break
+                entries.append((key_hash(job_key(json.loads(line))), offset))
+                offset += len(line)
+        # Rewrite the tail whole so a torn entry can't shift the ones appended after it
+        with open(self.tail_path, 'wb') as f:
+            f.write(tail.tobytes())
+            f.write(np.array(entries, TAIL_ENTRY).tobytes())
+        self.tail_entries = len(tail) + len(entries)
+
+    def append(self, jobs):
+        """Append records and index them. Returns how many were written"""
+        lines = []
+        hashes = []
+        for job in jobs:
+            job = dict(job)
+            lines.append(json.dumps(job, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+            hashes.append(key_hash(job_key(job)))
+        if not lines:
+            return 0
+        with self.lock:
+            with open(self.data_path, 'ab') as f:
+                offset = f.tell()
+                f.write(b''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            entries = np.zeros(len(lines), TAIL_ENTRY)
+            entries['hash'] = hashes
+            entries['offset'] = np.cumsum([0] + [len(line) for line in lines[:-1]]) + offset
+            with open(self.tail_path, 'ab') as f:
+                f.write(entries.tobytes())
+            self.tail_entries += len(entries)
+            if self.tail_entries >= TAIL_LIMIT:
+                self.compact()
+        return len(lines)
+
+    def compact(self):
+        """Merge the tail into a new sorted index"""
+        with self.lock:
+            mapped, hashes, offsets = _read_index(self.index_path)
+            merged = merge_index(hashes, offsets, _read_tail(self.tail_path))
+            del hashes, offsets
+            if mapped is not None:
+                mapped.close()
+            write_index(self.index_path, *merged)
+            open(self.tail_path, 'wb').close()
+            self.tail_entries = 0
+            return len(merged[0])
+
+
+class CorpusReader:
+    """Point lookups and hash-range scans over one source's corpus, without loading it"""
+
+    def __init__(self, source, path=CORPUS_PATH):
+        self.source = source
+        self.data_path, self.index_path, self.tail_path = _paths(path, source)
+        self._open()
+
+    def _open(self):
+        self.data = _map(self.data_path)
+        self.index_map, self.hashes, self.offsets = _read_index(self.index_path)
+        tail = _read_tail(self.tail_path)
+        # Entries for lines appended after the data was mapped wait for refresh()
+        mapped_size = len(self.data) if self.data is not None else 0
+        self.tail = {}
+        for entry_hash, offset in tail.tolist():
+            if offset < mapped_size:
+                self.tail.setdefault(entry_hash, []).append(offset)
+        # The newest tail entry per hash, sorted like the index, for scan()
+        newest = np.array([(entry_hash, max(offsets)) for entry_hash, offsets in self.tail.items()], TAIL_ENTRY)
+        self.tail_sorted = np.sort(newest, order='hash')
+        self.stamp = self._stamp()
+
+    def _stamp(self):
+        stamp = []
+        for filename in (self.data_path, self.index_path, self.tail_path):
+            try:
+                stat = os.stat(filename)
+                stamp.append((stat.st_ino, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return stamp
+
+    def refresh(self):
+        """Pick up records appended since the reader was opened. Returns True if anything changed"""
+        if self._stamp() == self.stamp:
+            return False
+        self._open()
+        return True
+
+    def __len__(self):
+        """Indexed entries (a re-scraped job counts once per version until the next compaction)"""
+        return len(self.hashes) + sum(len(offsets) for offsets in self.tail.values())
+
+    def _record(self, offset):
+        end = self.data.find(b'\n', offset)
+        return json.loads(self.data[offset:end])
+
+    def _offsets(self, entry_hash):
+        """Offsets stored for a hash, newest first"""
+        found = list(reversed(self.tail.get(entry_hash, ())))
+        # A plain int above 2**63 would make numpy compare as float
+        target = np.uint64(entry_hash)
+        lo = int(np.searchsorted(self.hashes, target, 'left'))
+        hi = lo
+        while hi < len(self.hashes) and self.hashes[hi] == target:
+            hi += 1
+        found.extend(int(offset) for offset in self.offsets[lo:hi])
+        return found
+
+    def get(self, key):
+        """The newest record stored under a job key, or None"""
+        if self.data is None:
+            return None
+        for offset in self._offsets(key_hash(key)):
+            record = self._record(offset)
+            # 64-bit hashes can collide; the record itself has the real key
+            if job_key(record) == key:
+                return record
+        return None
+
+    def scan(self, lo=0, hi=2 ** 64):
+        """Yield the newest version of the records with lo <= key hash < hi, in hash order"""
+        if self.data is None:
+            return
+        start, stop = _hash_range(self.hashes, lo, hi)
+        hashes, offsets = self.hashes[start:stop], self.offsets[start:stop]
+        tail_start, tail_stop = _hash_range(self.tail_sorted['hash'], lo, hi)
+        if tail_stop > tail_start:
+            # Tail offsets are later in the file, so they shadow the index's
+            hashes, offsets = merge_index(hashes, offsets, self.tail_sorted[tail_start:tail_stop])
+        for offset in offsets.tolist():
+            yield self._record(offset)
+
+    def records(self):
+        """Yield the newest version of every record: the index, then the tail"""
+        if self.data is None:
+            return
+        tail = self.tail
+        for entry_hash, offset in zip(self.hashes.tolist(), self.offsets.tolist()):
+            if entry_hash not in tail:
+                yield self._record(offset)
+        for offsets in tail.values():
+            yield self._record(max(offsets))
+
+    def close(self):
+        # The index arrays are views of the mapping and must go first
+        self.hashes = self.offsets = None
+        for mapped in (self.data, self.index_map):
+            if mapped is not None:
+                mapped.close()
+
+
+class Corpus:
+    """Readers over every source in the corpus directory"""
+
+    def __init__(self, path=CORPUS_PATH):
+        self.path = path
+        self.readers = {}
+        self.refresh()
+
+    def refresh(self):
+        for filename in sorted(glob.glob(os.path.join(self.path, '*.jsonl'))):
+            source = os.path.basename(filename)[:-len('.jsonl')]
+            if source in self.readers:
+                self.readers[source].refresh()
+            else:
+                self.readers[source] = CorpusReader(source, self.path)
+
+    def get(self, key):
+        for reader in self.readers.values():
+            record = reader.get(key)
+            if record is not None:
+                return record
+        return None
+
+    def __len__(self):
+        return sum(len(reader) for reader in self.readers.values())
+
+    def records(self):
+        for reader in self.readers.values():
+            yield from reader.records()
+
+
+def corpus_stamp(path=CORPUS_PATH):
+    """Changes whenever a source is added, appended to or compacted"""
+    stamp = []
+    for filename in sorted(glob.glob(os.path.join(path, '*'))):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            continue
+        stamp.append((filename, stat.st_ino, stat.st_size))
+    return stamp
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(source, path=CORPUS_PATH):
+    """Return the process-wide writer for a source"""
+    with _writers_lock:
+        if (source, path) not in _writers:
+            _writers[(source, path)] = CorpusWriter(source, path)
+        return _writers[(source, path)]
+
+
+def append_to_corpus(source, jobs):
+    """Append freshly scraped jobs to the source's corpus; never fails the scrape"""
+    try:
+        return get_writer(source).append(jobs)
+    except Exception as e:
+        print(f"⚠️ Could not append to corpus: {e}")
+        return 0
+
+
+def build(path=CORPUS_PATH, patterns=CORPUS_GLOBS):
+    """Load every JSON output file into the corpus, one source per file"""
+    for pattern in patterns:
+        for filename in sorted(glob.glob(pattern)):
+            try:
+                with open(filename, encoding='utf-8') as f:
+                    jobs = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {filename}: {e}")
+                continue
+            source = os.path.splitext(os.path.basename(filename))[0]
+            writer = CorpusWriter(source, path)
+            writer.append(job for job in jobs if isinstance(job, dict))
+            print(f"📥 {filename}: {writer.compact()} jobs indexed as {source}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random-access reader for the job corpus")
+    parser.add_argument('--build', action='store_true', help="append outputs/ and jsonFiles/ to the corpus")
+    parser.add_argument('--compact', action='store_true', help="merge every tail into its index")
+    parser.add_argument('--get', metavar='KEY', help="print the record stored under a job key (usually its link)")
+    args = parser.parse_args()
+
+    if args.build:
+        build()
+    if args.compact:
+        for filename in sorted(glob.glob(os.path.join(CORPUS_PATH, '*.jsonl'))):
+            source = os.path.basename(filename)[:-len('.jsonl')]
+            print(f"🗜️ {source}: {CorpusWriter(source).compact()} jobs indexed")
+    corpus = Corpus()
+    print(f"📚 {len(corpus)} records in {len(corpus.readers)} sources")
+    if args.get:
+        record = corpus.get(args.get)
+        print(json.dumps(record, indent=2, ensure_ascii=False) if record else f"❌ No job {args.get}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# Posting-date resolution
+#
+# Job boards print when a job was posted relative to the moment the page was
+# fetched: "15 days ago", "Posted 2 weeks ago", "today", "Few hours ago",
+# "30+ days ago", or now and then an actual date ("20-07-2025", "Jul 20,
+# 2025", or an API's "2025-07-20T10:00:00Z"). resolve_posted() turns any of those into a date, counting back from
+# the record's scrape time. Each distinct string is parsed once; the same
+# handful ("Posted today", "1 day ago", ...) repeats on every results page.
+#
+# The cutoff helpers let paginating scrapers stop as soon as a results page
+# holds nothing posted after the oldest date they still want.
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Also the date part of a timestamp, where a T follows it
+_ISO_DATE = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})(?!\d)')
+# Indian sites write day first
+_NUMERIC_DATE = re.compile(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b')
+_MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+_MONTH = r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+_DAY_MONTH = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+' + _MONTH + r',?(?:\s+(\d{4}))?')
+_MONTH_DAY = re.compile(r'\b' + _MONTH + r'\s+(\d{1,2})(?:st|nd|rd|th)?\b,?(?:\s+(\d{4}))?')
+
+_AGE = re.compile(r'\b(\d+|an?|one|few|a few|couple of|several)\+?\s*'
+                  r'(minute|min|hour|hr|day|week|wk|month|mo|year|yr)s?\b')
+_AGE_UNITS = {
+    'minute': timedelta(minutes=1), 'min': timedelta(minutes=1),
+    'hour': timedelta(hours=1), 'hr': timedelta(hours=1),
+    'day': timedelta(days=1), 'week': timedelta(days=7), 'wk': timedelta(days=7),
+    'month': timedelta(days=30), 'mo': timedelta(days=30),
+    'year': timedelta(days=365), 'yr': timedelta(days=365),
+}
+_AGE_COUNTS = {'a': 1, 'an': 1, 'one': 1, 'few': 3, 'a few': 3, 'couple of': 2, 'several': 5}
+# Not "recent"/"recently": "Recently posted" and "Recent" are what the scrapers
+# write when a card shows no date, so they stay unresolved (None)
+_TODAY = re.compile(r'\b(?:today|just now|just posted|moments? ago|seconds? ago)\b')
+_YESTERDAY = re.compile(r'\byesterday\b')
+
+
+def _calendar_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_posted(text):
+    """Parse a posted-date string into ('on', date), ('ago', timedelta) or ('on_day', (month, day))
+
+    ('on_day', ...) is a calendar date without a year. Returns None when the
+    string says nothing about when the job was posted.
+    """
+    if not text or not isinstance(text, str):
+        return None
+    text = text.lower()
+
+    match = _ISO_DATE.search(text)
+    if match:
+        found = _calendar_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        if found:
+            return 'on', found
+    match = _NUMERIC_DATE.search(text)
+    if match:
+        day, month, year = (int(group) for group in match.groups())
+        found = _calendar_date(year + 2000 if year < 100 else year, month, day)
+        if found:
+            return 'on', found
+    for pattern, day_group, month_group in ((_DAY_MONTH, 1, 2), (_MONTH_DAY, 2, 1)):
+        match = pattern.search(text)
+        if match:
+            day = int(match.group(day_group))
+            month = _MONTHS.index(match.group(month_group)) + 1
+            if match.group(3):
+                found = _calendar_date(int(match.group(3)), month, day)
+                if found:
+                    return 'on', found
+            elif 1 <= day <= 31:
+                return 'on_day', (month, day)
+
+    match = _AGE.search(text)
+    if match:
+        count = match.group(1)
+        count = int(count) if count.isdigit() else _AGE_COUNTS[count]
+        return 'ago', count * _AGE_UNITS[match.group(2)]
+    if _YESTERDAY.search(text):
+        return 'ago', timedelta(days=1)
+    if _TODAY.search(text):
+        return 'ago', timedelta(0)
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def scrape_time(scraped=None):
+    """The moment a record was scraped, from a datetime, date or ISO timestamp; now if unknown"""
+    if isinstance(scraped, datetime):
+        return scraped
+    if isinstance(scraped, date):
+        return datetime.combine(scraped, datetime.min.time())
+    if isinstance(scraped, str):
+        parsed = _parse_timestamp(scraped.strip())
+        if parsed:
+            return parsed
+    return datetime.now()
+
+
+def resolve_posted(posted, scraped=None):
+    """Date a job was posted, from the text the site printed and when it was scraped"""
+    parsed = parse_posted(posted)
+    if parsed is None:
+        return None
+    kind, value = parsed
+    if kind == 'on':
+        return value
+    reference = scrape_time(scraped)
+    if kind == 'ago':
+        return (reference - value).date()
+    # A day without a year is the latest such day on or before the scrape date
+    month, day = value
+    for year in (reference.year, reference.year - 1):
+        found = _calendar_date(year, month, day)
+        if found and found <= reference.date():
+            return found
+    return None
+
+
+def cutoff_date(max_age_days, now=None):
+    """Oldest posting date still wanted, or None when max_age_days is None"""
+    if max_age_days is None:
+        return None
+    return scrape_time(now).date() - timedelta(days=int(max_age_days))
+
+
+def page_is_stale(posted_dates, cutoff):
+    """True when the newest posting on a results page is older than the cutoff
+
+    `posted_dates` are dates or ISO strings. Postings whose date couldn't be
+    resolved (None) are ignored; a page with no resolvable dates is never stale.
+    """
+    if cutoff is None:
+        return False
+    dates = [date.fromisoformat(posted[:10]) if isinstance(posted, str) else posted
+             for posted in posted_dates if posted]
+    return bool(dates) and max(dates) < cutoff
@@ -0,0 +1,142 @@
+# Shared HTTP client for everything that doesn't run inside Scrapy
+#
+# One requests.Session per process: keep-alive connection pools per host,
+# retries with jittered exponential backoff, gzip/deflate (and brotli when the
+# brotli package is installed) and per-request timing, so every run can report
+# how well connections were reused and where latency went. Every request is
+# also recorded in core.metrics, labelled by host.
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from core.metrics import record_response
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class HttpClient:
+    def __init__(self, retries=3, backoff_factor=0.5, backoff_jitter=0.5,
+                 pool_connections=20, pool_maxsize=10, timeout=10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.stats = defaultdict(HostStats)
+        self.lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the shared session and record its timing"""
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            with self.lock:
+                stats = self.stats[host]
+                stats.requests += 1
+                stats.errors += 1
+            record_response(host, type(e).__name__, None, time.perf_counter() - start)
+            raise
+
+        # With stream=True this is time to headers, otherwise it includes the body
+        elapsed = time.perf_counter() - start
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+        size = None if kwargs.get('stream') else len(response.content)
+        with self.lock:
+            stats = self.stats[host]
+            stats.requests += 1
+            stats.retries += len(retries)
+            stats.latencies.append(elapsed)
+            if size is not None:
+                stats.bytes += size
+            if response.status_code >= 400:
+                stats.errors += 1
+        record_response(host, response.status_code, size, elapsed)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def connection_stats(self):
+        """Return {host: (requests sent, connections opened)} from the urllib3 pools"""
+        result = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+                sent, opened = result.get(host, (0, 0))
+                result[host] = (sent + pool.num_requests, opened + pool.num_connections)
+        return result
+
+    def report(self):
+        """Print per-host connection reuse and latency for this run"""
+        if not self.stats:
+            return
+        connections = self.connection_stats()
+        print(f"\n{'='*70}")
+        print("🌐 HTTP CLIENT SUMMARY")
+        print(f"{'='*70}")
+        print(f"{'Host':<32}{'Reqs':>6}{'Conns':>7}{'Reused':>8}{'p50 ms':>9}{'p95 ms':>9}{'KB':>9}")
+        for host, stats in sorted(self.stats.items()):
+            sent, opened = connections.get(host, (0, 0))
+            reused = f"{100 * (sent - opened) / sent:.0f}%" if sent else '-'
+            print(f"{host[:31]:<32}{stats.requests:>6}{opened:>7}{reused:>8}"
+                  f"{stats.percentile(50) * 1000:>9.0f}{stats.percentile(95) * 1000:>9.0f}"
+                  f"{stats.bytes / 1024:>9.0f}")
+            if stats.retries or stats.errors:
+                print(f"  ↳ {stats.retries} retries, {stats.errors} failed responses")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide shared client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
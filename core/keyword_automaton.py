@@ -0,0 +1,85 @@
+# Multi-pattern keyword matching in one pass (Aho-Corasick)
+#
+# The text-heuristic scrapers decide what a line is ("looks like a salary",
+# "mentions a city", ...) by checking it against several keyword lists. A
+# KeywordAutomaton compiles all of those lists into one automaton; scan()
+# walks a string once and returns a bitset with one bit per category that
+# has at least one keyword occurring in it, with the same substring semantics
+# as `any(keyword in text for keyword in keywords)`.
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over named keyword categories
+
+    `categories` maps a category name to its keywords. Matching is case
+    sensitive; lower-case both the keywords and the scanned text for the
+    usual case-insensitive checks.
+    """
+
+    def __init__(self, categories):
+        self.names = list(categories)
+        self.bits = {name: 1 << i for i, name in enumerate(self.names)}
+        self.max_length = max((len(k) for keywords in categories.values() for k in keywords), default=0)
+
+        goto = [{}]
+        out = [0]
+        for name, keywords in categories.items():
+            bit = self.bits[name]
+            for keyword in keywords:
+                if not keyword:
+                    raise ValueError(f"Empty keyword in category {name!r}")
+                state = 0
+                for char in keyword:
+                    nxt = goto[state].get(char)
+                    if nxt is None:
+                        nxt = goto[state][char] = len(goto)
+                        goto.append({})
+                        out.append(0)
+                    state = nxt
+                out[state] |= bit
+
+        # Breadth-first: fail links, inherited outputs, and for every state the
+        # transitions that differ from the root's, so scanning never has to
+        # walk a fail chain
+        root = goto[0]
+        fail = [0] * len(goto)
+        delta = [{} for _ in goto]
+        queue = deque(root.values())
+        while queue:
+            state = queue.popleft()
+            out[state] |= out[fail[state]]
+            if fail[state]:
+                delta[state].update(delta[fail[state]])
+            delta[state].update(goto[state])
+            for char, child in goto[state].items():
+                if state:
+                    fail[child] = delta[fail[state]].get(char) or root.get(char, 0)
+                queue.append(child)
+
+        self.root = root
+        self.delta = delta
+        self.out = out
+
+    def bit(self, *names):
+        """Bitmask for one or more categories"""
+        mask = 0
+        for name in names:
+            mask |= self.bits[name]
+        return mask
+
+    def scan(self, text):
+        """Bitset of the categories with a keyword occurring in text"""
+        root_get = self.root.get
+        delta = self.delta
+        out = self.out
+        state = 0
+        mask = 0
+        for char in text:
+            state = delta[state].get(char) or root_get(char, 0)
+            mask |= out[state]
+        return mask
+
+    def categories(self, mask):
+        """Names of the categories set in a bitset"""
+        return [name for name in self.names if mask & self.bits[name]]
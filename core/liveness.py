@@ -0,0 +1,348 @@
+# Liveness sweeps over stored job postings
+#
+# Postings expire on the boards long before anyone re-scrapes them. The
+# sweeper keeps a SQLite table of every posting URL in the corpus and checks
+# the ones most likely to have changed: never-checked URLs first, then the
+# longest unchecked, weighted towards older postings (a two-month-old job is
+# far more likely to be gone than yesterday's).
+#
+# A check is a HEAD request carrying the ETag / Last-Modified we saw last
+# time; boards that refuse HEAD get a conditional GET whose body is never
+# read. 404 and 410 mark a posting inactive, and so does a redirect to the
+# board's search or listing pages, which is how most of them retire a job.
+# Network errors, 429s and 5xx leave the state alone and the URL goes back in
+# the queue. An inactive posting is active again as soon as a scrape newer
+# than its last check lists it, and is re-checked every RECHECK_INACTIVE_AFTER
+# in case the verdict was a transient 404 or a misread redirect.
+#
+# Checks run on a thread pool, but a dispatcher hands out work per host from
+# token buckets, so a slow or strict board never ties up the workers another
+# board could be using.
+#
+#   python -m core.liveness --limit 20000 --write-back
+import argparse
+import glob
+import heapq
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from urllib.parse import urlsplit
+
+import requests
+
+from core.http_client import HttpClient
+from core.ratelimit import DomainRateLimiter
+from core.dates import scrape_time
+from core.records import FIELD_ALIASES, canonical_job, first_value
+
+DEFAULT_LIVENESS_PATH = 'outputs/liveness.sqlite3'
+CORPUS_GLOBS = ('outputs/*.json', 'jsonFiles/*.json')
+
+# Per-host budget (checks per second, burst) unless overridden
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 4
+DEFAULT_WORKERS = 32
+
+# Don't look at a posting again sooner than this
+RECHECK_AFTER = 6 * 3600
+RECHECK_INACTIVE_AFTER = 7 * 86400
+# Priority = days since the last check x (1 + posting age / AGE_SCALE_DAYS)
+AGE_SCALE_DAYS = 14
+NEVER_CHECKED_DAYS = 365
+UNKNOWN_AGE_DAYS = 30
+
+GONE_STATUSES = (404, 410)
+HEAD_REFUSED_STATUSES = (403, 405, 501)
+# Where boards send an expired posting: the home page, a bare listing page, or a
+# search/expired page. Whole path segments only, so a slug that merely contains
+# "search" (research-scientist, seo-search-engine-...) is not mistaken for one.
+_RETIRED_PATH = re.compile(r'^/(?:jobs?|internships?|careers?)?/?$'
+                           r'|(?:^|/)(?:jobs?-)?(?:search|expired|no-?longer|closed)(?:/|$)', re.I)
+
+# Check results are written in transactions of this many
+COMMIT_EVERY = 500
+
+
+def redirected_away(url, final_url):
+    """True when a redirect ended on a search/listing page instead of the posting
+
+    A redirect to another host with the same path (www. -> in.) or to a
+    canonical slug is the posting moving, not retiring.
+    """
+    final_path = urlsplit(final_url).path
+    if final_path.rstrip('/') == urlsplit(url).path.rstrip('/'):
+        return False
+    return bool(_RETIRED_PATH.search(final_path))
+
+
+def classify(url, response):
+    """(active, reason) for a check response; active is None when the check was inconclusive"""
+    status = response.status_code
+    if status in GONE_STATUSES:
+        return False, 'gone'
+    if response.history and redirected_away(url, response.url):
+        return False, 'redirected'
+    if 200 <= status < 300 or status == 304:
+        return True, 'live'
+    return None, f'http {status}'
+
+
+def priority(posted_date, last_checked, now, today):
+    """How urgently a posting needs checking; higher goes first"""
+    since_check = (now - last_checked) / 86400 if last_checked else NEVER_CHECKED_DAYS
+    try:
+        age = max((today - date.fromisoformat(posted_date)).days, 0)
+    except (TypeError, ValueError):
+        age = UNKNOWN_AGE_DAYS
+    return since_check * (1 + age / AGE_SCALE_DAYS)
+
+
+class LivenessStore:
+    def __init__(self, path=DEFAULT_LIVENESS_PATH):
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS postings (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                posted_date TEXT,
+                active INTEGER NOT NULL DEFAULT 1,
+                reason TEXT,
+                status INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                last_checked REAL,
+                failures INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS postings_active ON postings (active, last_checked);
+        """)
+        self.conn.commit()
+
+    def add_jobs(self, jobs):
+        """Register the URLs of job records; known postings keep their check history
+
+        A record scraped after its posting's last check shows the board still
+        lists it, so that posting is active again.
+        """
+        rows = []
+        for job in jobs:
+            record = canonical_job(job)
+            if record['link'] and record['link'].startswith(('http://', 'https://')):
+                scraped = first_value(job, FIELD_ALIASES['scraped'])
+                rows.append({'key': record['key'], 'url': record['link'], 'posted': record['posted_date'],
+                             'seen': scrape_time(scraped).timestamp() if scraped else None})
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO postings (key, url, posted_date) VALUES (:key, :url, :posted)
+                ON CONFLICT (key) DO UPDATE SET
+                    url = excluded.url,
+                    posted_date = COALESCE(excluded.posted_date, posted_date),
+                    active = CASE WHEN :seen > last_checked THEN 1 ELSE active END,
+                    failures = CASE WHEN :seen > last_checked THEN 0 ELSE failures END
+            """, rows)
+        return len(rows)
+
+    def add_files(self, patterns=CORPUS_GLOBS):
+        total = 0
+        for pattern in patterns:
+            for filename in sorted(glob.glob(pattern)):
+                try:
+                    with open(filename, encoding='utf-8') as f:
+                        jobs = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Skipping {filename}: {e}")
+                    continue
+                if isinstance(jobs, list):
+                    total += self.add_jobs(job for job in jobs if isinstance(job, dict))
+        return total
+
+    def due(self, limit=None, now=None):
+        """Postings not checked within RECHECK_AFTER (RECHECK_INACTIVE_AFTER when inactive), most urgent first"""
+        now = now or time.time()
+        today = date.fromtimestamp(now)
+        rows = self.conn.execute("""
+            SELECT key, url, posted_date, last_checked, etag, last_modified FROM postings
+            WHERE last_checked IS NULL
+               OR (active = 1 AND last_checked <= ?)
+               OR (active = 0 AND last_checked <= ?)
+        """, (now - RECHECK_AFTER, now - RECHECK_INACTIVE_AFTER)).fetchall()
+        ranked = ((priority(row[2], row[3], now, today), row) for row in rows)
+        if limit is not None:
+            ranked = heapq.nlargest(limit, ranked, key=lambda item: item[0])
+        else:
+            ranked = sorted(ranked, key=lambda item: item[0], reverse=True)
+        return [row for _, row in ranked]
+
+    def record(self, results, now=None):
+        """Store check results: (key, active, reason, status, etag, last_modified)"""
+        now = now or time.time()
+        with self.conn:
+            for key, active, reason, status, etag, last_modified in results:
+                if active is None:
+                    self.conn.execute(
+                        'UPDATE postings SET reason = ?, status = ?, last_checked = ?, '
+                        'failures = failures + 1 WHERE key = ?', (reason, status, now, key))
+                else:
+                    self.conn.execute(
+                        'UPDATE postings SET active = ?, reason = ?, status = ?, '
+                        'etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), '
+                        'last_checked = ?, failures = 0 WHERE key = ?',
+                        (int(active), reason, status, etag, last_modified, now, key))
+
+    def states(self):
+        """{key: active} for every posting that has been checked"""
+        return {key: bool(active) for key, active in self.conn.execute(
+            'SELECT key, active FROM postings WHERE last_checked IS NOT NULL')}
+
+    def summary(self):
+        return dict(self.conn.execute(
+            "SELECT CASE WHEN last_checked IS NULL THEN 'unchecked' "
+            "WHEN active THEN 'active' ELSE 'inactive' END, COUNT(*) FROM postings GROUP BY 1"))
+
+
+class LivenessSweeper:
+    """Check due postings concurrently within per-host rate budgets
+
+    `overrides` maps a host to its own (rate, burst), e.g. a stricter budget
+    for LinkedIn.
+    """
+
+    def __init__(self, store, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 overrides=None, timeout=10):
+        self.store = store
+        self.workers = workers
+        self.limiter = DomainRateLimiter(rate, burst, overrides)
+        # One retry at most: an inconclusive check is simply retried next sweep
+        self.client = HttpClient(retries=1, backoff_factor=0.2, pool_connections=64,
+                                 pool_maxsize=workers, timeout=timeout)
+
+    def check(self, url, etag=None, last_modified=None):
+        """Check one URL. Returns (active, reason, status, etag, last_modified)"""
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            response = self.client.head(url, headers=headers, allow_redirects=True)
+            if response.status_code in HEAD_REFUSED_STATUSES:
+                response = self.client.get(url, headers=headers, allow_redirects=True, stream=True)
+                response.close()
+        except requests.RequestException as e:
+            return None, type(e).__name__, None, None, None
+        active, reason = classify(url, response)
+        return (active, reason, response.status_code,
+                response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+    def _check_row(self, row):
+        key, url, _, _, etag, last_modified = row
+        return (key,) + self.check(url, etag, last_modified)
+
+    def sweep(self, limit=None, now=None):
+        """Check up to `limit` due postings. Returns a Counter of outcomes"""
+        rows = self.store.due(limit, now)
+        # Per-host queues, each still in priority order
+        queues = defaultdict(deque)
+        for row in rows:
+            queues[urlsplit(row[1]).netloc].append(row)
+
+        outcomes = Counter()
+        results = []
+        pending = set()
+        max_pending = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while queues or pending:
+                submitted = False
+                for host in list(queues):
+                    if len(pending) >= max_pending:
+                        break
+                    if not self.limiter.try_acquire(host):
+                        continue
+                    pending.add(executor.submit(self._check_row, queues[host].popleft()))
+                    submitted = True
+                    if not queues[host]:
+                        del queues[host]
+
+                if not pending:
+                    # Every host is out of budget; wait for the next token
+                    time.sleep(0.01)
+                    continue
+                done, pending = wait(pending, timeout=0 if submitted else 0.01,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    outcomes[result[2]] += 1
+                    results.append(result)
+                if len(results) >= COMMIT_EVERY:
+                    self.store.record(results)
+                    results = []
+        self.store.record(results)
+        return outcomes
+
+
+def write_back(store, patterns=CORPUS_GLOBS):
+    """Set isActive on every checked record in the JSON output files"""
+    states = store.states()
+    changed = 0
+    for pattern in patterns:
+        for filename in sorted(glob.glob(pattern)):
+            try:
+                with open(filename, encoding='utf-8') as f:
+                    jobs = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(jobs, list):
+                continue
+            updated = 0
+            for job in jobs:
+                if not isinstance(job, dict):
+                    continue
+                active = states.get(canonical_job(job)['key'])
+                if active is not None and job.get('isActive') != active:
+                    job['isActive'] = active
+                    updated += 1
+            if updated:
+                tmp_path = filename + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(jobs, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, filename)
+                print(f"📝 {filename}: {updated} jobs updated")
+                changed += updated
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check stored job URLs and mark expired postings inactive")
+    parser.add_argument('--db', default=DEFAULT_LIVENESS_PATH)
+    parser.add_argument('--limit', type=int, help="check at most this many postings")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help="checks per second per host")
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST)
+    parser.add_argument('--write-back', action='store_true', help="set isActive in outputs/ and jsonFiles/")
+    args = parser.parse_args()
+
+    store = LivenessStore(args.db)
+    print(f"📥 {store.add_files()} posting URLs in the corpus")
+    sweeper = LivenessSweeper(store, workers=args.workers, rate=args.rate, burst=args.burst)
+    start = time.perf_counter()
+    outcomes = sweeper.sweep(args.limit)
+    elapsed = time.perf_counter() - start
+    checked = sum(outcomes.values())
+    print(f"🔎 Checked {checked} postings in {elapsed:.1f}s: "
+          + ', '.join(f"{reason} {count}" for reason, count in outcomes.most_common()))
+    print(f"📊 {store.summary()}")
+    sweeper.client.report()
+    if args.write_back:
+        print(f"✅ isActive updated on {write_back(store)} records")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+# Leveled, non-blocking logging for the scrapers
+#
+# get_logger(source) returns a ScraperLogger for 'scrapers.<source>'. A call
+# on it does as little as possible in the scraping thread: a level check, the
+# per-item sampler, and appending (level, message, args) to a buffer. A pump
+# thread drains the buffer in batches and does the rest: builds the
+# LogRecords, %-formats the messages and writes the console. No caller lookup
+# (findCaller) is done; records carry no file or line number. Nothing starts
+# at import: the pump and the console handler are set up by the first call on
+# any logger, or by setup_logging().
+#
+# Per-item messages (one per job card or selector attempt) are logged with
+# extra=PER_ITEM and sampled: of each message template, 1 in
+# SCRAPER_LOG_SAMPLE is kept, and the rest are dropped before anything else
+# happens. Warnings and errors are never sampled out. The Scrapy spiders log through
+# Scrapy's own handlers; sample_logger() puts the same sampler on their
+# loggers and on Scrapy's per-item "Scraped from" line, as a filter.
+#
+#   SCRAPER_LOG_LEVEL   DEBUG, INFO (default), WARNING, ...
+#   SCRAPER_LOG_SAMPLE  keep 1 in N per-item messages of each template (default 10, 1 keeps all)
+#   SCRAPER_LOG_FORMAT  text (default: the message alone) or json (one object per line)
+#
+#   SCRAPER_LOG_LEVEL=DEBUG SCRAPER_LOG_SAMPLE=1 python -m core.spiders.linkedIn_jobs
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from logging import DEBUG, ERROR, INFO, WARNING
+
+ROOT_LOGGER = 'scrapers'
+DEFAULT_SAMPLE = 10
+PER_ITEM = {'per_item': True}
+# The pump wakes this often, or as soon as this many entries are waiting
+PUMP_INTERVAL = 0.05
+PUMP_BATCH = 512
+
+# Attributes every LogRecord has; anything else on a record came in through extra=
+STANDARD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_pump = None
+_sampler = None
+_setup_lock = threading.Lock()
+
+
+def sample_every():
+    try:
+        return max(int(os.environ.get('SCRAPER_LOG_SAMPLE', DEFAULT_SAMPLE)), 1)
+    except ValueError:
+        return DEFAULT_SAMPLE
+
+
+class SampleFilter(logging.Filter):
+    """Keeps 1 in `every` per-item records of each message template, and everything else"""
+
+    def __init__(self, every=DEFAULT_SAMPLE, templates=()):
+        super().__init__()
+        self.every = every
+        # Messages counted as per-item without the flag (Scrapy's own)
+        self.templates = frozenset(templates)
+        self.counts = {}
+        self.dropped = 0
+
+    def keep(self, name, msg, level):
+        if self.every <= 1 or level >= WARNING:
+            return True
+        # Lazy formatting keeps the template stable, so it identifies the message
+        key = (name, msg)
+        seen = self.counts.get(key, 0)
+        self.counts[key] = seen + 1
+        if seen % self.every:
+            self.dropped += 1
+            return False
+        return True
+
+    def filter(self, record):
+        if not (getattr(record, 'per_item', False) or record.msg in self.templates):
+            return True
+        return self.keep(record.name, record.msg, record.levelno)
+
+
+class LogPump:
+    """Turns buffered log calls into records on its own thread, in batches"""
+
+    def __init__(self, interval=PUMP_INTERVAL):
+        self.interval = interval
+        # deque.append is atomic, so callers never take a lock
+        self.pending = deque()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name='log-pump', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.drain()
+            if self.stopping:
+                self.drain()
+                return
+
+    def drain(self):
+        pending = self.pending
+        while pending:
+            entry = pending.popleft()
+            if isinstance(entry, threading.Event):
+                # flush() marker: everything before it has been handled
+                entry.set()
+                continue
+            logger, level, msg, args, extra, created, exc_text = entry
+            record = logger.makeRecord(logger.name, level, '(unknown file)', 0, msg, args or None, None,
+                                       extra=extra)
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+            record.exc_text = exc_text
+            logger.handle(record)
+
+    def flush(self):
+        """Wait until everything put so far has been written"""
+        if not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.pending.append(done)
+        self.wake.set()
+        done.wait()
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+
+
+class ScraperLogger:
+    """The logging.Logger calls the scrapers make, deferred to a LogPump
+
+    Creating one has no side effects, so modules can make theirs at import
+    time: the first call starts logging (setup_logging()) and reads the
+    effective level. After that each call checks the level before anything
+    else, so a disabled DEBUG line costs one compare.
+    """
+
+    __slots__ = ('logger', 'name', 'level', 'sampler', 'pending', 'pump')
+
+    def __init__(self, logger, sampler=None, pump=None):
+        self.logger = logger
+        self.name = logger.name
+        # NOTSET until bound: every call goes through _log once
+        self.level = logging.NOTSET
+        self.sampler = None
+        self.pump = None
+        self.pending = None
+        if pump is not None:
+            self._bind(sampler, pump)
+
+    def _bind(self, sampler=None, pump=None):
+        if pump is None:
+            setup_logging()
+            sampler, pump = _sampler, _pump
+        self.level = self.logger.getEffectiveLevel()
+        self.sampler = sampler
+        self.pump = pump
+        self.pending = pump.pending
+
+    def _log(self, level, msg, args, extra, exc_info):
+        if self.pump is None:
+            self._bind()
+            if level < self.level:
+                return
+        if extra is not None and extra.get('per_item') and not self.sampler.keep(self.name, msg, level):
+            return
+        # A traceback has to be rendered now, while its frames exist
+        exc_text = traceback.format_exc().rstrip('\n') if exc_info else None
+        pending = self.pending
+        pending.append((self.logger, level, msg, args, extra, time.time(), exc_text))
+        # Wake the pump once, as the batch fills; Event.set() takes a lock
+        if len(pending) == PUMP_BATCH:
+            self.pump.wake.set()
+
+    def isEnabledFor(self, level):
+        if self.pump is None:
+            self._bind()
+        return level >= self.level
+
+    def log(self, level, msg, *args, extra=None, exc_info=False):
+        if level >= self.level:
+            self._log(level, msg, args, extra, exc_info)
+
+    def debug(self, msg, *args, extra=None, exc_info=False):
+        if self.level <= DEBUG:
+            self._log(DEBUG, msg, args, extra, exc_info)
+
+    def info(self, msg, *args, extra=None, exc_info=False):
+        if self.level <= INFO:
+            self._log(INFO, msg, args, extra, exc_info)
+
+    def warning(self, msg, *args, extra=None, exc_info=False):
+        if self.level <= WARNING:
+            self._log(WARNING, msg, args, extra, exc_info)
+
+    def error(self, msg, *args, extra=None, exc_info=False):
+        if self.level <= ERROR:
+            self._log(ERROR, msg, args, extra, exc_info)
+
+    def exception(self, msg, *args, extra=None):
+        if self.level <= ERROR:
+            self._log(ERROR, msg, args, extra, True)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in STANDARD_ATTRS)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def console_handler(fmt='text', stream=None):
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter('%(message)s'))
+    return handler
+
+
+def setup_logging(level=None, sample=None, fmt=None, stream=None):
+    """Give the 'scrapers' loggers their console and start the pump, once per process
+
+    Arguments override SCRAPER_LOG_LEVEL / SCRAPER_LOG_SAMPLE / SCRAPER_LOG_FORMAT.
+    """
+    global _pump, _sampler
+    with _setup_lock:
+        root = logging.getLogger(ROOT_LOGGER)
+        if _pump is not None:
+            return root
+        level = level or os.environ.get('SCRAPER_LOG_LEVEL', 'INFO')
+        root.addHandler(console_handler(fmt or os.environ.get('SCRAPER_LOG_FORMAT', 'text'), stream))
+        root.setLevel(level.upper() if isinstance(level, str) else level)
+        # Scrapy's root handler would print everything a second time
+        root.propagate = False
+        _sampler = SampleFilter(sample or sample_every())
+        _pump = LogPump().start()
+        atexit.register(stop_logging)
+        return root
+
+
+def get_logger(source):
+    """The logger for 'scrapers.<source>'; logging starts with its first call"""
+    return ScraperLogger(logging.getLogger(f"{ROOT_LOGGER}.{source}"))
+
+
+def sample_logger(logger, *templates, every=None):
+    """Put a per-item sampler on a logger that is not under 'scrapers' (the Scrapy spiders')"""
+    if isinstance(logger, str):
+        logger = logging.getLogger(logger)
+    if not any(isinstance(f, SampleFilter) for f in logger.filters):
+        logger.addFilter(SampleFilter(every or sample_every(), templates))
+    return logger
+
+
+def flush_logs():
+    """Wait until everything logged so far has been written"""
+    if _pump is not None:
+        _pump.flush()
+
+
+def stop_logging():
+    global _pump
+    pump = _pump
+    if pump is None:
+        return
+    pump.stop()
+    _pump = None
+    if _sampler.dropped:
+        logging.getLogger(ROOT_LOGGER).info(
+            "🔇 %d per-item log lines sampled out (SCRAPER_LOG_SAMPLE=%d)", _sampler.dropped, _sampler.every)
@@ -0,0 +1,361 @@
+# Per-source scrape metrics: counters and latency histograms
+#
+# Every scraper records into one process-wide registry. The Scrapy spiders go
+# through CoreDownloaderMiddleware / CoreSpiderMiddleware, the Selenium and
+# requests based scrapers through the shared HTTP client and a few calls in
+# their own loops. Series are labelled by source: the spider or scraper name,
+# or the host for requests sent through core.http_client.
+#
+#   scrape_requests_total           requests / page loads, by status
+#   scrape_response_bytes_total     response body bytes
+#   scrape_response_seconds         request latency
+#   scrape_parse_seconds            time spent in each parse callback
+#   scrape_items_total              items produced
+#   scrape_duplicates_total         items already produced earlier in the run
+#   scrape_selector_matches_total   which selector of a fallback list matched
+#                                   (selector="" when none of them did)
+#
+# The registry is served in Prometheus text format on /metrics (METRICS_PORT
+# in the Scrapy settings or the environment) and written out as a JSON report
+# under outputs/metrics/ at the end of every run.
+#
+#   python -m core.metrics outputs/metrics/linkedin-20250720-101500.json
+import argparse
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPORT_DIR = 'outputs/metrics'
+# Upper bounds in seconds; page loads and parse callbacks both land in this range
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def items(self):
+        """[(labels dict, value)] for every series recorded so far"""
+        with self.lock:
+            series = [(key, self._copy(value)) for key, value in self.series.items()]
+        return [(dict(zip(self.labelnames, key)), value) for key, value in sorted(series)]
+
+    def _copy(self, value):
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def samples(self):
+        for labels, value in self.items():
+            yield self.name, labels, value
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram; each series is [count per bucket..., +Inf count, sum]"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _copy(self, value):
+        return list(value)
+
+    def quantile(self, series, q):
+        """Estimate a quantile by interpolating inside its bucket, like histogram_quantile()"""
+        counts = series[:-1]
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self, series):
+        count = sum(series[:-1])
+        return {'count': count, 'sum': round(series[-1], 6),
+                'mean': round(series[-1] / count, 6) if count else 0.0,
+                'p50': round(self.quantile(series, 0.5), 6),
+                'p95': round(self.quantile(series, 0.95), 6)}
+
+    def samples(self):
+        for labels, series in self.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                yield self.name + '_bucket', {**labels, 'le': format_value(bound)}, cumulative
+            yield self.name + '_count', labels, cumulative
+            yield self.name + '_sum', labels, series[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.started = datetime.now()
+        self.requests = self.counter('scrape_requests_total', "Requests sent", ('source', 'status'))
+        self.response_bytes = self.counter('scrape_response_bytes_total', "Response body bytes", ('source',))
+        self.response_seconds = self.histogram('scrape_response_seconds', "Request latency", ('source',))
+        self.parse_seconds = self.histogram('scrape_parse_seconds', "Time spent in a parse callback",
+                                            ('source', 'callback'))
+        self.items = self.counter('scrape_items_total', "Items produced", ('source',))
+        self.duplicates = self.counter('scrape_duplicates_total', "Items already produced in this run",
+                                       ('source',))
+        self.selector_matches = self.counter('scrape_selector_matches_total',
+                                             "Matches per selector of a fallback list",
+                                             ('source', 'field', 'selector'))
+
+    def counter(self, name, help, labelnames):
+        return self.metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames, buckets=LATENCY_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        """The registry in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def report(self, only=None):
+        """Everything recorded so far (for the sources in `only`, if given), grouped by source"""
+        sources = {}
+
+        def entry(source):
+            return sources.setdefault(source, {
+                'requests': {}, 'response_bytes': 0, 'response_seconds': None,
+                'parse_seconds': {}, 'items': 0, 'duplicates': 0, 'selectors': {}})
+
+        def selected(metric):
+            return [(labels, value) for labels, value in metric.items() if only is None or labels['source'] in only]
+
+        for labels, value in selected(self.requests):
+            entry(labels['source'])['requests'][labels['status']] = value
+        for labels, value in selected(self.response_bytes):
+            entry(labels['source'])['response_bytes'] = value
+        for labels, series in selected(self.response_seconds):
+            entry(labels['source'])['response_seconds'] = self.response_seconds.summary(series)
+        for labels, series in selected(self.parse_seconds):
+            entry(labels['source'])['parse_seconds'][labels['callback']] = self.parse_seconds.summary(series)
+        for labels, value in selected(self.items):
+            entry(labels['source'])['items'] = value
+        for labels, value in selected(self.duplicates):
+            entry(labels['source'])['duplicates'] = value
+        for labels, value in selected(self.selector_matches):
+            fields = entry(labels['source'])['selectors']
+            fields.setdefault(labels['field'], {})[labels['selector'] or '(none)'] = value
+        return {'started_at': self.started.isoformat(timespec='seconds'),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'sources': sources}
+
+    def clear(self):
+        for metric in self.metrics.values():
+            metric.clear()
+        self.started = datetime.now()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+_server = None
+
+
+def get_metrics():
+    """Return the process-wide registry"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = MetricsRegistry()
+        return _metrics
+
+
+def record_response(source, status, size, seconds):
+    """One request or page load; size is None when the body wasn't read"""
+    metrics = get_metrics()
+    metrics.requests.inc(source=source, status=status)
+    metrics.response_seconds.observe(seconds, source=source)
+    if size:
+        metrics.response_bytes.inc(size, source=source)
+
+
+def record_items(source, count=1, duplicates=0):
+    metrics = get_metrics()
+    if count:
+        metrics.items.inc(count, source=source)
+    if duplicates:
+        metrics.duplicates.inc(duplicates, source=source)
+
+
+def record_selector(source, field, selector):
+    """Count which selector of a fallback list matched; None when none did"""
+    get_metrics().selector_matches.inc(source=source, field=field, selector=selector or '')
+
+
+def timed(source, callback=None):
+    """Decorator recording each call of a parse function in scrape_parse_seconds"""
+    def decorator(func):
+        name = callback or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().parse_seconds.time(source=source, callback=name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port=None, host='0.0.0.0'):
+    """Serve /metrics from a background thread, once per process
+
+    The port defaults to $METRICS_PORT; without either nothing is started.
+    Returns the server, or None.
+    """
+    global _server
+    port = port or os.environ.get('METRICS_PORT')
+    if not port:
+        return None
+    with _metrics_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not serve metrics on port {port}: {e}")
+            return None
+        _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics on http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def write_report(name, sources=None, directory=DEFAULT_REPORT_DIR):
+    """Write the end-of-run JSON report (of `sources`, if given). Never fails the scrape; returns the path or None"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(get_metrics().report(sources), f, indent=2, ensure_ascii=False)
+        print(f"📏 Metrics report saved to {path}")
+        return path
+    except Exception as e:
+        print(f"⚠️ Could not write metrics report: {e}")
+        return None
+
+
+def print_report(report):
+    for source, stats in sorted(report['sources'].items()):
+        requests = sum(stats['requests'].values())
+        print(f"\n📊 {source}")
+        if requests:
+            latency = stats['response_seconds'] or {}
+            statuses = ', '.join(f"{status}: {count}" for status, count in sorted(stats['requests'].items()))
+            print(f"  Requests: {requests} ({statuses}), {stats['response_bytes'] / 1024:.0f} KB, "
+                  f"p50 {latency.get('p50', 0) * 1000:.0f} ms, p95 {latency.get('p95', 0) * 1000:.0f} ms")
+        for callback, parse in sorted(stats['parse_seconds'].items()):
+            print(f"  Parse {callback}: {parse['count']} calls, {parse['sum']:.2f}s total, "
+                  f"p95 {parse['p95'] * 1000:.1f} ms")
+        if stats['items'] or stats['duplicates']:
+            print(f"  Items: {stats['items']} ({stats['duplicates']} duplicates)")
+        for field, selectors in sorted(stats['selectors'].items()):
+            ranked = sorted(selectors.items(), key=lambda pair: -pair[1])
+            print(f"  Selector {field}: " + ', '.join(f"{selector} × {count}" for selector, count in ranked))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize end-of-run metrics reports")
+    parser.add_argument('reports', nargs='+', help="JSON reports written by write_report()")
+    args = parser.parse_args()
+
+    for path in args.reports:
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        print(f"\n{'='*60}")
+        print(f"📏 {path} ({report['started_at']} → {report['finished_at']})")
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
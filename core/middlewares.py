@@ -2,99 +2,203 @@
 #
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
+#
+# Both middlewares feed core.metrics: the downloader middleware times every
+# download, the spider middleware times the parse callbacks and counts what
+# they produce. The spider middleware also serves /metrics (METRICS_PORT) and
+# writes the JSON report when a spider closes.
+#
+# With tracing on (core.tracing) every request is a trace: a page span opened
+# in the downloader middleware and carried in request.meta, a fetch span per
+# download attempt, and an extract span over the callback that closes it.
+#
+# Per-item log lines (the spiders' extra={'per_item': True} ones and Scrapy's
+# "Scraped from" line) are sampled through core.log when a spider opens.
 
-from scrapy import signals
+import time
 
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+from scrapy import Request, signals
+from scrapy.exceptions import IgnoreRequest
+from scrapy.logformatter import SCRAPEDMSG
 
+from core.log import sample_logger
+from core.metrics import get_metrics, record_items, record_response, serve_metrics, write_report
+from core.records import job_key
+from core.tracing import NO_SPAN, start_span, write_trace
+
+# request.meta keys worth putting on a page span
+TRACE_META = ('search_term', 'page', 'listing_url')
+# request.meta keys this module sets per request, which follow-up requests must not inherit
+REQUEST_META_PREFIXES = ('trace_', 'metrics_')
+
+
+def follow_meta(meta, **updates):
+    """meta for a follow-up request (the next page), without this request's span and timer"""
+    kept = {key: value for key, value in meta.items() if not key.startswith(REQUEST_META_PREFIXES)}
+    kept.update(updates)
+    return kept
 
-class CoreSpiderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the spider middleware does not modify the
-    # passed objects.
 
+def callback_name(response):
+    request = getattr(response, 'request', None)
+    callback = getattr(request, 'callback', None)
+    return getattr(callback, '__name__', 'parse')
+
+
+class CoreSpiderMiddleware:
     @classmethod
     def from_crawler(cls, crawler):
-        # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(crawler.settings.get('METRICS_PORT'))
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(s.engine_stopped, signal=signals.engine_stopped)
         return s
 
-    def process_spider_input(self, response, spider):
-        # Called for each response that goes through the spider
-        # middleware and into the spider.
-
-        # Should return None or raise an exception.
-        return None
+    def __init__(self, metrics_port=None):
+        self.metrics_port = metrics_port
+        self.spider_names = set()
+        # Job keys produced so far, per spider
+        self.seen = {}
+
+    def count(self, output, spider):
+        if isinstance(output, Request):
+            return
+        seen = self.seen.setdefault(spider.name, set())
+        try:
+            key = job_key(output)
+        except Exception:
+            key = None
+        if key is not None and key in seen:
+            record_items(spider.name, 0, duplicates=1)
+        else:
+            seen.add(key)
+            record_items(spider.name)
 
     def process_spider_output(self, response, result, spider):
-        # Called with the results returned from the Spider, after
-        # it has processed the response.
-
-        # Must return an iterable of Request, or item objects.
-        for i in result:
-            yield i
-
-    def process_spider_exception(self, response, exception, spider):
-        # Called when a spider or process_spider_input() method
-        # (from other spider middleware) raises an exception.
-
-        # Should return either None or an iterable of Request or item objects.
-        pass
+        # Only the time spent inside the callback counts, not what the engine
+        # does with each output between two of them
+        parse_seconds = get_metrics().parse_seconds
+        callback = callback_name(response)
+        page, extract = self.start_extract(response, callback)
+        elapsed = 0.0
+        result = iter(result)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    output = next(result)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                self.count(output, spider)
+                yield output
+        finally:
+            parse_seconds.observe(elapsed, source=spider.name, callback=callback)
+            extract.finish()
+            page.finish()
+
+    async def process_spider_output_async(self, response, result, spider):
+        parse_seconds = get_metrics().parse_seconds
+        callback = callback_name(response)
+        page, extract = self.start_extract(response, callback)
+        elapsed = 0.0
+        result = result.__aiter__()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    output = await result.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                self.count(output, spider)
+                yield output
+        finally:
+            parse_seconds.observe(elapsed, source=spider.name, callback=callback)
+            extract.finish()
+            page.finish()
+
+    def start_extract(self, response, callback):
+        meta = getattr(response, 'meta', None) or {}
+        page = meta.get('trace_page', NO_SPAN)
+        return page, start_span('extract', parent=page, callback=callback)
 
     async def process_start(self, start):
-        # Called with an async iterator over the spider start() method or the
-        # maching method of an earlier spider middleware.
         async for item_or_request in start:
             yield item_or_request
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+        self.spider_names.add(spider.name)
+        sample_logger(spider.logger.logger)
+        sample_logger('scrapy.core.scraper', SCRAPEDMSG)
+        serve_metrics(self.metrics_port)
+
+    def spider_closed(self, spider, reason):
+        self.seen.pop(spider.name, None)
+        # The registry is process-wide; run_all's other spiders write their own reports
+        write_report(spider.name, sources={spider.name})
+
+    def engine_stopped(self):
+        # After every spider_closed handler, so the change log's span is in
+        for name in sorted(self.spider_names):
+            write_trace(name, sources={name})
 
 
 class CoreDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    # Sits next to the downloader (see DOWNLOADER_MIDDLEWARES), so it sees every
+    # attempt before RetryMiddleware, and bodies as they came off the wire
 
     @classmethod
     def from_crawler(cls, crawler):
-        # This method is used by Scrapy to create your spiders.
         s = cls()
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
         return s
 
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+        request.meta['metrics_start'] = time.perf_counter()
+        # Retries are copies of the request, meta included: they stay in the same trace
+        page = request.meta.get('trace_page')
+        # A finished page span came in on meta copied from an earlier page: start this page's own
+        if page is None or getattr(page, 'end', None) is not None:
+            attrs = {key: request.meta[key] for key in TRACE_META if key in request.meta}
+            page = request.meta['trace_page'] = start_span('page', source=spider.name, url=request.url, **attrs)
+        request.meta['trace_fetch'] = start_span('fetch', parent=page, url=request.url)
         return None
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
-
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
+        # download_latency is set by the download handler: time to the response headers
+        latency = request.meta.get('download_latency')
+        if latency is None:
+            latency = time.perf_counter() - request.meta.get('metrics_start', time.perf_counter())
+        record_response(spider.name, response.status, len(response.body), latency)
+        request.meta.get('trace_fetch', NO_SPAN).set(status=response.status, bytes=len(response.body)).finish()
         return response
 
     def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
-
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
+        if 'metrics_start' not in request.meta:
+            # Dropped by an earlier middleware (StalePageMiddleware) before it was sent
+            return None
+        start = request.meta['metrics_start']
+        record_response(spider.name, type(exception).__name__, None, time.perf_counter() - start)
+        request.meta.get('trace_fetch', NO_SPAN).set(error=type(exception).__name__).finish()
+        return None
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class StalePageMiddleware:
+    """Drops queued result pages past the first one a spider found older than its cutoff
+
+    For spiders that schedule every page up front and set `stale_page`.
+    """
+
+    def process_request(self, request, spider):
+        stale_page = getattr(spider, 'stale_page', None)
+        page = request.meta.get('page')
+        if stale_page is not None and page is not None and page > stale_page:
+            raise IgnoreRequest(f"page {page} is past stale page {stale_page}")
+        return None
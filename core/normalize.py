@@ -0,0 +1,211 @@
+# Salary and experience normalization
+#
+# Every scraper reports pay and experience as the site prints it: "₹ 10,000
+# /month", "3-5 LPA", "500000 Yearly", "1 to 2 Years", "Fresher", ... This
+# module turns a batch of those strings into numbers:
+#
+#   salary_min / salary_max       annual amount in INR
+#   salary_period                 the period the site quoted (hour ... year)
+#   experience_min / experience_max   years
+#
+# Each distinct string is parsed once (and cached across batches) into its raw
+# amount, unit, period and currency; the conversion to annual INR is then done
+# for the whole batch at once with numpy.
+import re
+from functools import lru_cache
+
+import numpy as np
+
+UNITS = ('', 'k', 'lakh', 'crore', 'million')
+UNIT_MULTIPLIERS = np.array([1, 1e3, 1e5, 1e7, 1e6])
+
+PERIODS = ('hour', 'day', 'week', 'month', 'year')
+PERIODS_PER_YEAR = np.array([2080, 260, 52, 12, 1])
+
+# Rough conversion rates for the few non-INR salaries the API sources carry
+CURRENCIES = ('INR', 'USD', 'EUR', 'GBP')
+INR_RATES = np.array([1.0, 83.0, 90.0, 105.0])
+
+_AMOUNT = re.compile(
+    r'(\d[\d,]*(?:\.\d+)?)\s*(?:(lpa)|(lakhs?|lacs?|crores?|cr|mn|k|l|m)(?![a-z]))?', re.I)
+_UNIT_NAMES = {'lpa': 'lakh', 'lakh': 'lakh', 'lakhs': 'lakh', 'lac': 'lakh', 'lacs': 'lakh', 'l': 'lakh',
+               'crore': 'crore', 'crores': 'crore', 'cr': 'crore', 'k': 'k', 'm': 'million', 'mn': 'million'}
+_PERIOD_PATTERNS = (
+    ('hour', re.compile(r'/\s*h(?:ou)?r|per hour|hourly|an hour')),
+    ('day', re.compile(r'/\s*day|per day|daily|a day')),
+    ('week', re.compile(r'/\s*w(?:ee)?k|per week|weekly|a week')),
+    ('month', re.compile(r'/\s*m(?:on)?th|/\s*mo\b|per month|monthly|a month|p\.\s*m\.|\bpm\b|stipend')),
+    ('year', re.compile(r'lpa|/\s*y(?:ea)?r|per year|per annum|p\.\s*a\.|\bpa\b|annum|annual|yearly|a year|ctc|lakh|lac|crore')),
+)
+_CURRENCY_PATTERNS = (
+    ('USD', re.compile(r'\$|usd')),
+    ('EUR', re.compile(r'€|eur')),
+    ('GBP', re.compile(r'£|gbp')),
+    ('INR', re.compile(r'₹|\brs\b|inr|rupee')),
+)
+_NOT_A_SALARY = re.compile(r'\bago\b|posted|\d\s*(?:years?|yrs?)\b')
+_UNPAID = re.compile(r'\bunpaid\b')
+
+_NUMBER = r'(\d+(?:\.\d+)?)'
+_YEARS = r'(years?|yrs?|yr|months?)'
+_EXPERIENCE_RANGE = re.compile(_NUMBER + r'\s*(?:years?|yrs?|yr)?\s*(?:-|–|to)\s*' + _NUMBER + r'\s*' + _YEARS)
+_EXPERIENCE_FROM_FRESHER = re.compile(r'fresher\s*(?:-|–|to)\s*' + _NUMBER + r'\s*' + _YEARS)
+_EXPERIENCE_SINGLE = re.compile(_NUMBER + r'\s*(\+)?\s*' + _YEARS + r'\b')
+
+
+@lru_cache(maxsize=65536)
+def parse_salary(text):
+    """Raw (min, max, unit index, period index, currency index) for a salary string, or None
+
+    Amounts are as written (before unit, period and currency conversion).
+    Strings that are really experience or a posted date ("0 - 3 Years",
+    "posted 3 weeks ago") are rejected.
+    """
+    if not text:
+        return None
+    text = text.lower()
+    if _UNPAID.search(text):
+        return 0.0, 0.0, 0, PERIODS.index('month'), 0
+    if _NOT_A_SALARY.search(text):
+        return None
+
+    amounts = []
+    units = []
+    for match in _AMOUNT.finditer(text):
+        amounts.append(float(match.group(1).replace(',', '')))
+        unit = match.group(2) or match.group(3)
+        units.append(_UNIT_NAMES[unit.lower()] if unit else '')
+        if len(amounts) == 2:
+            break
+    if not amounts:
+        return None
+    # "3-5 LPA": the unit written after the range applies to both ends
+    unit = units[-1] or units[0]
+    low, high = amounts[0], amounts[-1]
+
+    currency = next((name for name, pattern in _CURRENCY_PATTERNS if pattern.search(text)), None)
+    scale = UNIT_MULTIPLIERS[UNITS.index(unit)]
+    if currency is None and high * scale < 1000:
+        return None
+
+    period = next((name for name, pattern in _PERIOD_PATTERNS if pattern.search(text)), None)
+    if period is None:
+        if currency in (None, 'INR'):
+            # Indian listings without a period: lakhs are per year, smaller sums per month
+            period = 'year' if high * scale >= 100000 else 'month'
+        else:
+            # USD/EUR/GBP postings quote annual pay
+            period = 'year'
+    return low, high, UNITS.index(unit), PERIODS.index(period), CURRENCIES.index(currency or 'INR')
+
+
+@lru_cache(maxsize=65536)
+def parse_experience(text):
+    """(min years, max years) for an experience string, or None. max is None for "5+ years" """
+    if not text:
+        return None
+    years = parse_years(text)
+    if years is None and 'fresher' in text.lower():
+        return 0.0, 0.0
+    return years
+
+
+@lru_cache(maxsize=65536)
+def parse_years(text):
+    """parse_experience() for strings that state years ("0 - 3 Years", "Fresher to 2 years", "5+ yrs")
+
+    A bare "fresher" is not enough: free text mentions freshers without
+    saying how much experience the job wants.
+    """
+    if not text:
+        return None
+    text = text.lower()
+
+    match = _EXPERIENCE_RANGE.search(text)
+    if match:
+        scale = 1 / 12 if match.group(3).startswith('month') else 1
+        return float(match.group(1)) * scale, float(match.group(2)) * scale
+    match = _EXPERIENCE_FROM_FRESHER.search(text)
+    if match:
+        scale = 1 / 12 if match.group(2).startswith('month') else 1
+        return 0.0, float(match.group(1)) * scale
+    match = _EXPERIENCE_SINGLE.search(text)
+    if match:
+        years = float(match.group(1)) * (1 / 12 if match.group(3).startswith('month') else 1)
+        return years, None if match.group(2) else years
+    return None
+
+
+def _factorize(values):
+    """Integer code per value and the list of distinct values"""
+    codes = {}
+    index = np.fromiter((codes.setdefault(value, len(codes)) for value in values), np.int64, len(values))
+    return index, list(codes)
+
+
+def normalize_batch(salaries, experiences=None):
+    """Normalize parallel sequences of salary and experience strings
+
+    Returns a dict of numpy arrays, NaN where a value couldn't be parsed:
+    salary_min, salary_max (annual INR), salary_period (index into PERIODS,
+    -1 if unknown), experience_min, experience_max (years).
+
+    A salary string that turns out to be an experience range (scrapers
+    sometimes put one in the other's field) is used as the experience when
+    the record's own experience text states no years (TimesJobs puts the
+    description there).
+    """
+    n = len(salaries)
+    experiences = experiences if experiences is not None else [None] * n
+
+    codes, distinct = _factorize(salaries)
+    raw = np.full((len(distinct), 5), np.nan)
+    for i, text in enumerate(distinct):
+        parsed = parse_salary(text)
+        if parsed is not None:
+            raw[i] = parsed
+    parsed_ok = ~np.isnan(raw[:, 0])
+    unit = np.where(parsed_ok, raw[:, 2], 0).astype(np.int64)
+    period = np.where(parsed_ok, raw[:, 3], 0).astype(np.int64)
+    currency = np.where(parsed_ok, raw[:, 4], 0).astype(np.int64)
+    factor = UNIT_MULTIPLIERS[unit] * PERIODS_PER_YEAR[period] * INR_RATES[currency]
+
+    result = {
+        'salary_min': (raw[:, 0] * factor)[codes],
+        'salary_max': (raw[:, 1] * factor)[codes],
+        'salary_period': np.where(parsed_ok, period, -1)[codes],
+    }
+
+    # Fall back to the salary text for experience only where the salary didn't parse
+    salary_ok = parsed_ok.tolist()
+    salary_years = [not salary_ok[i] and parse_years(text) is not None for i, text in enumerate(distinct)]
+    exp_texts = [salary if salary_years[code] and parse_years(exp) is None else exp
+                 for exp, salary, code in zip(experiences, salaries, codes.tolist())]
+    exp_codes, exp_distinct = _factorize(exp_texts)
+    years = np.full((len(exp_distinct), 2), np.nan)
+    for i, text in enumerate(exp_distinct):
+        parsed = parse_experience(text)
+        if parsed is not None:
+            years[i] = [np.nan if v is None else v for v in parsed]
+    result['experience_min'] = years[:, 0][exp_codes]
+    result['experience_max'] = years[:, 1][exp_codes]
+    return result
+
+
+def normalize_jobs(jobs):
+    """Add normalized salary / experience fields to canonical job records in place"""
+    if not jobs:
+        return jobs
+    columns = normalize_batch([job.get('salary') for job in jobs], [job.get('experience') for job in jobs])
+    salary_min = columns['salary_min'].round().tolist()
+    salary_max = columns['salary_max'].round().tolist()
+    periods = columns['salary_period'].tolist()
+    exp_min = columns['experience_min'].round(2).tolist()
+    exp_max = columns['experience_max'].round(2).tolist()
+    for i, job in enumerate(jobs):
+        job['salary_min'] = None if salary_min[i] != salary_min[i] else int(salary_min[i])
+        job['salary_max'] = None if salary_max[i] != salary_max[i] else int(salary_max[i])
+        job['salary_period'] = PERIODS[periods[i]] if periods[i] >= 0 else None
+        job['experience_min'] = None if exp_min[i] != exp_min[i] else exp_min[i]
+        job['experience_max'] = None if exp_max[i] != exp_max[i] else exp_max[i]
+    return jobs
@@ -6,8 +6,99 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy import signals
+
+from core.blobstore import PREVIEW_CHARS, store_descriptions
+from core.cdc import capture_changes
+from core.corpus import append_to_corpus
+from core.search_index import get_index
+from core.skills import tag_jobs
+from core.tracing import span
 
 
 class CorePipeline:
     def process_item(self, item, spider):
         return item
+
+
+class SkillTaggingPipeline:
+    """Fill the tags field from the skill taxonomy"""
+
+    def process_item(self, item, spider):
+        with span('normalize', source=spider.name):
+            tag_jobs([ItemAdapter(item)])
+        return item
+
+
+class DescriptionStorePipeline:
+    """Move the full description into the blob store, leaving a preview and its hash"""
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        field = 'job_description' if 'job_description' in adapter else 'description'
+        with span('persist', source=spider.name, target='blobs'):
+            store_descriptions([adapter], getattr(spider, 'description_preview_chars', PREVIEW_CHARS), field)
+        return item
+
+
+class SearchIndexPipeline:
+    """Feed scraped items into the full-text search index"""
+
+    def open_spider(self, spider):
+        self.index = get_index()
+
+    def process_item(self, item, spider):
+        with span('persist', source=spider.name, target='index'):
+            self.index.add([ItemAdapter(item).asdict()])
+        return item
+
+    def close_spider(self, spider):
+        with span('persist', source=spider.name, target='index', commit=True):
+            self.index.commit()
+
+
+class CorpusPipeline:
+    """Append scraped items to the spider's random-access corpus"""
+
+    BATCH_SIZE = 500
+
+    def open_spider(self, spider):
+        self.batch = []
+
+    def process_item(self, item, spider):
+        self.batch.append(ItemAdapter(item).asdict())
+        if len(self.batch) >= self.BATCH_SIZE:
+            with span('persist', source=spider.name, target='corpus', jobs=len(self.batch)):
+                append_to_corpus(spider.name, self.batch)
+            self.batch = []
+        return item
+
+    def close_spider(self, spider):
+        with span('persist', source=spider.name, target='corpus', jobs=len(self.batch)):
+            append_to_corpus(spider.name, self.batch)
+
+
+class ChangeCapturePipeline:
+    """Log insert/update/delete events for the spider's run when it closes"""
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = cls()
+        # Pipelines close before the finish reason is known, so the diff
+        # runs on spider_closed instead
+        crawler.signals.connect(pipeline.spider_closed, signal=signals.spider_closed)
+        return pipeline
+
+    def open_spider(self, spider):
+        self.jobs = []
+
+    def process_item(self, item, spider):
+        self.jobs.append(ItemAdapter(item).asdict())
+        return item
+
+    def spider_closed(self, spider, reason):
+        # A spider that replaces a standalone scraper keeps that scraper's change history
+        source = getattr(spider, 'change_source', spider.name)
+        # A run cut short (closespider limits, shutdown, errors) says nothing about deletions
+        with span('persist', source=spider.name, target='cdc', jobs=len(self.jobs)):
+            capture_changes(source, self.jobs, complete=reason == 'finished')
@@ -0,0 +1,406 @@
+# On-demand profiling for a scrape run: sampled stacks plus allocations
+#
+# Off unless asked for: set SCRAPER_PROFILE=1 (or pass --profile to
+# core.run_all, or PROFILE_ENABLED=True to Scrapy). When it is off no thread
+# is started and tracemalloc stays off; stage() hands back a shared no-op
+# context manager and the Scrapy extension is not loaded at all.
+# SCRAPER_PROFILE=stacks samples stacks without tracemalloc, which on its own
+# slows allocation-heavy parsing several times over.
+#
+# When it is on, a background thread samples the stack of every other thread
+# every few milliseconds (wall clock, so time blocked on a WebDriver round
+# trip or a socket shows up as well as regexes and selector compilation), and
+# tracemalloc records allocations. The run is split into stages (scrape,
+# save, ...); samples are rooted at their stage and thread, and each stage
+# gets its own allocation diff. At the end of a run, per source:
+#
+#   outputs/profiles/<source>-<ts>.folded     collapsed stacks (flamegraph.pl, speedscope)
+#   outputs/profiles/<source>-<ts>.svg        the same as a flame graph
+#   outputs/profiles/<source>-<ts>-alloc.txt  top allocations, per stage and at the end
+#
+#   SCRAPER_PROFILE=1 python -m core.spiders.TimesJobs_jobs
+#   python -m core.profiling outputs/profiles/timesjobs-20250720-101500.folded
+import argparse
+import html
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+DEFAULT_PROFILE_DIR = 'outputs/profiles'
+# Seconds between two samples; 200 Hz keeps the sampler well under 5% of a core
+SAMPLE_INTERVAL = 0.005
+# Frames kept per allocation traceback; 1 groups allocations by line, cheaply
+TRACE_FRAMES = 1
+TOP_ALLOCATIONS = 25
+
+_active = None
+_active_lock = threading.Lock()
+_NO_STAGE = nullcontext()
+
+
+def profiling_requested():
+    return os.environ.get('SCRAPER_PROFILE', '').strip().lower() in ('1', 'true', 'yes', 'on', 'stacks')
+
+
+def allocations_requested():
+    return os.environ.get('SCRAPER_PROFILE', '').strip().lower() != 'stacks'
+
+
+def thread_group(name):
+    # ThreadPoolExecutor-0_3 and ThreadPoolExecutor-0_1 are the same pool
+    return re.sub(r'[_-]?\d+$', '', name) or name
+
+
+class StackSampler:
+    """Samples every thread's Python stack from a daemon thread into collapsed stacks"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stage = None
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():
+                names = {thread.ident: thread_group(thread.name) for thread in threading.enumerate()}
+            stage = self.stage or 'run'
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, 'thread'))
+                stack.append(stage)
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+# The profiler's own allocations; dropped from the reports
+OWN_FILES = (tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>')
+
+
+def top_stats(stats):
+    return [stat for stat in stats if stat.traceback[0].filename not in OWN_FILES][:TOP_ALLOCATIONS]
+
+
+def format_stat(stat, diff=False):
+    frame = stat.traceback[0]
+    if diff:
+        return f"  {stat.size_diff / 1024:>+10.1f} KiB {stat.count_diff:>+8} blocks  {frame.filename}:{frame.lineno}"
+    return f"  {stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}"
+
+
+class RunProfile:
+    """One profiled run: the sampler, tracemalloc and the per-stage results"""
+
+    def __init__(self, source, directory=DEFAULT_PROFILE_DIR, interval=SAMPLE_INTERVAL, allocations=True):
+        self.source = source
+        self.directory = directory
+        self.sampler = StackSampler(interval)
+        self.allocations = allocations
+        self.stages = []
+        self.started = None
+        self._was_tracing = tracemalloc.is_tracing()
+
+    def start(self):
+        if self.allocations and not self._was_tracing:
+            tracemalloc.start(TRACE_FRAMES)
+        self.started = time.perf_counter()
+        self.sampler.start()
+        print(f"🔬 Profiling {self.source} (sampling every {self.sampler.interval * 1000:.0f} ms)")
+
+    @contextmanager
+    def stage(self, name):
+        previous = self.sampler.stage
+        self.sampler.stage = name
+        before = tracemalloc.take_snapshot() if self.allocations else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.sampler.stage = previous
+            diff = []
+            if before is not None:
+                diff = top_stats(tracemalloc.take_snapshot().compare_to(before, 'lineno'))
+            self.stages.append((name, elapsed, diff))
+
+    def stop(self):
+        """Stop sampling and write the profile files. Never fails the run; returns the base path or None"""
+        self.sampler.stop()
+        elapsed = time.perf_counter() - self.started
+        final, current, peak = [], 0, 0
+        if self.allocations:
+            try:
+                final = top_stats(tracemalloc.take_snapshot().statistics('lineno'))
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                if not self._was_tracing:
+                    tracemalloc.stop()
+        try:
+            return self.write(elapsed, final, current, peak)
+        except Exception as e:
+            print(f"⚠️ Could not write profile for {self.source}: {e}")
+            return None
+
+    def write(self, elapsed, final, current, peak):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{self.source}-{datetime.now():%Y%m%d-%H%M%S}")
+        with open(base + '.folded', 'w', encoding='utf-8') as f:
+            f.write(self.sampler.collapsed())
+        with open(base + '.svg', 'w', encoding='utf-8') as f:
+            f.write(render_flamegraph(self.sampler.stacks, f"{self.source}: {self.sampler.samples} samples, "
+                                                           f"{elapsed:.1f}s"))
+
+        lines = [f"{self.source}: {elapsed:.2f}s, {self.sampler.samples} samples",
+                 f"Traced memory: {current / 2**20:.1f} MiB now, {peak / 2**20:.1f} MiB peak"
+                 if self.allocations else "Allocations not traced (SCRAPER_PROFILE=stacks)", '']
+        for name, seconds, diff in self.stages:
+            if not self.allocations:
+                lines.append(f"== Stage {name}: {seconds:.2f}s ==")
+                continue
+            grown = sum(stat.size_diff for stat in diff)
+            lines.append(f"== Stage {name}: {seconds:.2f}s, {grown / 1024:+.1f} KiB in its top lines ==")
+            lines.extend(format_stat(stat, diff=True) for stat in diff)
+            lines.append('')
+        if self.allocations:
+            lines.append("== Live at the end of the run ==")
+            lines.extend(format_stat(stat) for stat in final)
+        with open(base + '-alloc.txt', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        print(f"🔬 Profile saved to {base}.folded / .svg / -alloc.txt")
+        return base
+
+
+def start_profile(source, directory=DEFAULT_PROFILE_DIR):
+    """Start profiling this process as `source`; None if a profile is already running"""
+    global _active
+    with _active_lock:
+        if _active is not None:
+            return None
+        _active = RunProfile(source, directory, allocations=allocations_requested())
+    _active.start()
+    return _active
+
+
+def stop_profile(profile):
+    global _active
+    if profile is None:
+        return None
+    with _active_lock:
+        if _active is profile:
+            _active = None
+    return profile.stop()
+
+
+@contextmanager
+def profile_run(source, directory=DEFAULT_PROFILE_DIR):
+    profile = start_profile(source, directory)
+    try:
+        yield profile
+    finally:
+        stop_profile(profile)
+
+
+def stage(name):
+    """Attribute samples and allocations to `name` until the block ends; free when not profiling"""
+    profile = _active
+    if profile is None:
+        return _NO_STAGE
+    return profile.stage(name)
+
+
+def profiled(source):
+    """Profile every call of a scraper's main() when SCRAPER_PROFILE is set"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_requested():
+                return func(*args, **kwargs)
+            with profile_run(source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfilingExtension:
+    """Profiles a Scrapy crawl: from the first spider opened to the last one closed
+
+    Spiders that share a process (core.run_all) share one profile, named after
+    all of them; their callbacks are told apart by the module in each stack.
+    """
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not (crawler.settings.getbool('PROFILE_ENABLED') or profiling_requested()):
+            raise NotConfigured
+        ext = cls()
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    # Shared by every crawler in the process
+    open_spiders = []
+    profile = None
+    crawl_stage = None
+
+    def spider_opened(self, spider):
+        cls = type(self)
+        if not cls.open_spiders:
+            cls.profile = start_profile(spider.name)
+            if cls.profile is not None:
+                cls.crawl_stage = cls.profile.stage('crawl')
+                cls.crawl_stage.__enter__()
+        elif cls.profile is not None and spider.name not in cls.profile.source.split('+'):
+            cls.profile.source += '+' + spider.name
+        cls.open_spiders.append(spider.name)
+
+    def spider_closed(self, spider, reason):
+        cls = type(self)
+        if spider.name in cls.open_spiders:
+            cls.open_spiders.remove(spider.name)
+        if cls.open_spiders or cls.profile is None:
+            return
+        profile, cls.profile = cls.profile, None
+        crawl_stage, cls.crawl_stage = cls.crawl_stage, None
+        crawl_stage.__exit__(None, None, None)
+        stop_profile(profile)
+
+
+# Flame graph rendering: frames are boxes as wide as their share of the
+# samples, callers below callees
+FRAME_HEIGHT = 16
+GRAPH_WIDTH = 1200
+CHAR_WIDTH = 7
+
+
+def frame_color(name):
+    # Stable per frame, in the usual warm palette
+    h = zlib.crc32(name.encode('utf-8'))
+    return f"rgb({205 + h % 50},{(h >> 8) % 180 + 40},{(h >> 16) % 55})"
+
+
+def render_flamegraph(stacks, title=''):
+    root = {'count': 0, 'children': {}}
+    depth = 0
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        depth = max(depth, len(frames))
+        node = root
+        node['count'] += count
+        for name in frames:
+            node = node['children'].setdefault(name, {'count': 0, 'children': {}})
+            node['count'] += count
+
+    total = root['count'] or 1
+    height = (depth + 1) * FRAME_HEIGHT + 40
+    boxes = []
+
+    def place(name, node, x, level):
+        width = node['count'] / total * GRAPH_WIDTH
+        if width < 0.3:
+            return
+        y = height - (level + 1) * FRAME_HEIGHT - 10
+        label = name if len(name) * CHAR_WIDTH < width - 4 else name[:int((width - 4) // CHAR_WIDTH) - 2] + '..'
+        escaped = html.escape(name)
+        boxes.append(
+            f'<g><title>{escaped} ({node["count"]} samples, {node["count"] / total:.1%})</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{FRAME_HEIGHT - 1}" '
+            f'fill="{frame_color(name)}" rx="2"/>'
+            + (f'<text x="{x + 3:.1f}" y="{y + FRAME_HEIGHT - 4}">{html.escape(label)}</text>'
+               if width > 3 * CHAR_WIDTH else '') + '</g>')
+        child_x = x
+        for child_name in sorted(node['children']):
+            child = node['children'][child_name]
+            place(child_name, child, child_x, level + 1)
+            child_x += child['count'] / total * GRAPH_WIDTH
+
+    place('all', root, 0.0, 0)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{GRAPH_WIDTH}" height="{height}" '
+            f'font-family="monospace" font-size="11">\n'
+            f'<rect width="100%" height="100%" fill="#fdfdf5"/>\n'
+            f'<text x="4" y="16" font-size="13">{html.escape(title)}</text>\n'
+            + '\n'.join(boxes) + '\n</svg>\n')
+
+
+def read_collapsed(path):
+    stacks = Counter()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack:
+                stacks[stack] += int(count)
+    return stacks
+
+
+def print_top(stacks, limit=20):
+    total = sum(stacks.values()) or 1
+    own = Counter()
+    inclusive = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for name in set(frames[2:]):
+            inclusive[name] += count
+    print(f"{'Self':>7}{'Total':>8}  Frame")
+    for name, count in own.most_common(limit):
+        print(f"{count / total:>7.1%}{inclusive[name] / total:>8.1%}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a collapsed-stack profile and render its flame graph")
+    parser.add_argument('profiles', nargs='+', help='.folded files written by a profiled run')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+    for path in args.profiles:
+        stacks = read_collapsed(path)
+        print(f"\n🔬 {path}: {sum(stacks.values())} samples")
+        print_top(stacks, args.top)
+        svg = os.path.splitext(path)[0] + '.svg'
+        with open(svg, 'w', encoding='utf-8') as f:
+            f.write(render_flamegraph(stacks, os.path.basename(path)))
+        print(f"🔥 Flame graph: {svg}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Per-domain token-bucket rate limiting for the threaded fetchers
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second with bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token if one is available right now"""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """Block until a token is available. Returns the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class DomainRateLimiter:
+    """One token bucket per host, created on first use"""
+
+    def __init__(self, rate, burst=1, overrides=None):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url_or_host):
+        host = urlsplit(url_or_host).netloc if '//' in url_or_host else url_or_host
+        with self.lock:
+            if host not in self.buckets:
+                rate, burst = self.overrides.get(host, (self.rate, self.burst))
+                self.buckets[host] = TokenBucket(rate, burst)
+            return self.buckets[host]
+
+    def acquire(self, url_or_host):
+        return self.bucket(url_or_host).acquire()
+
+    def try_acquire(self, url_or_host):
+        return self.bucket(url_or_host).try_acquire()
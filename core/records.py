@@ -0,0 +1,81 @@
+# Helpers shared by every scraper for working with job records
+import hashlib
+import re
+
+from core.dates import resolve_posted
+
+
+LINK_FIELDS = ('link', 'job_url', 'job-link')
+
+
+def strip_tracking(link):
+    """A job link without its query string"""
+    # Tracking parameters (refId, trackingId, position...) change every run
+    return link.split('?', 1)[0].rstrip('/')
+
+
+def job_key(job):
+    """Return a stable identity for a job record across runs"""
+    link = job.get('link') or job.get('job_url') or job.get('job-link')
+    if link and link not in ('N/A', 'Not available'):
+        return strip_tracking(link)
+    if job.get('jobid'):
+        return str(job['jobid'])
+
+    title = job.get('title') or job.get('job_title') or job.get('jobtitle') or ''
+    company = job.get('company') or job.get('company_name') or ''
+    location = job.get('location') or ''
+    raw = f"{title}|{company}|{location}".lower()
+    return 'sha1:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+# Placeholders the scrapers write when a field wasn't found on the page
+MISSING = frozenset(['', 'n/a', 'not available', 'not specified', 'not disclosed'])
+
+FIELD_ALIASES = {
+    'title': ('title', 'job_title', 'jobtitle'),
+    'company': ('company', 'company_name'),
+    'location': ('location',),
+    'description': ('description', 'job_description'),
+    'source': ('source',),
+    'job_type': ('job_type', 'type'),
+    'salary': ('salary', 'salary_range'),
+    'experience': ('experience_required',),
+    'posted': ('posted_on', 'posted_date', 'posted-date'),
+    'scraped': ('scraped_at', 'scraped_timestamp', 'scrapedAt'),
+    'tags': ('tags',),
+    'active': ('isActive',),
+}
+
+
+def first_value(job, names):
+    for name in names:
+        value = job.get(name)
+        if isinstance(value, str):
+            value = ' '.join(value.split())
+            if value.lower() not in MISSING:
+                return value
+        elif value is not None:
+            return value
+    return None
+
+
+def canonical_job(job):
+    """Map a record from any scraper onto one set of field names
+
+    Placeholder values ("N/A", "Not specified", ...) become None, whitespace is
+    collapsed, source and job_type are lower-cased and the posted date is
+    resolved to an ISO date where possible.
+    """
+    record = {field: first_value(job, names) for field, names in FIELD_ALIASES.items()}
+    record['key'] = job_key(job)
+    link = job.get('link') or job.get('job_url') or job.get('job-link')
+    record['link'] = link if link and link not in ('N/A', 'Not available') else None
+
+    if record['source']:
+        record['source'] = record['source'].lower()
+    if record['job_type']:
+        record['job_type'] = re.sub(r'[\s_-]+', ' ', str(record['job_type'])).lower()
+    posted = resolve_posted(record.pop('posted'), record.pop('scraped'))
+    record['posted_date'] = posted.isoformat() if posted else None
+    return record
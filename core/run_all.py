@@ -1,21 +1,36 @@
-from core.spiders import FreshersworldJobScraper, InternshalaJobScraper
+import argparse
+import os
+
+from core.spiders import FreshersworldJobScraper, InternshalaJobScraper, TimesJobsJobScraper
 from core.spiders.linkedIn_jobs import main as run_linkedin_scraper
 from core.spiders.Shine_jobs import main as FastShineSeleniumScraper
-from core.spiders.TimesJobs_jobs import main as run_timesjobs_scraper
+from core.tracing import enable_tracing
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 
 def run_scrapy_spiders():
+    # One reactor drives all the static HTML sources concurrently
     process = CrawlerProcess(get_project_settings())
     process.crawl(FreshersworldJobScraper)
     process.crawl(InternshalaJobScraper)
+    process.crawl(TimesJobsJobScraper)
     process.start()
 
 def run_selenium_scrapers():
     run_linkedin_scraper()
     FastShineSeleniumScraper()
-    run_timesjobs_scraper()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every scraper")
+    parser.add_argument('--profile', action='store_true',
+                        help='write sampled stacks and allocation reports per source to outputs/profiles/')
+    parser.add_argument('--trace', nargs='?', type=float, const=1.0, metavar='RATE',
+                        help='write stage traces to outputs/traces/, for RATE of the pages (default all)')
+    args = parser.parse_args()
+    if args.profile:
+        # Read by the Scrapy extension and by each scraper's main()
+        os.environ['SCRAPER_PROFILE'] = '1'
+    if args.trace:
+        enable_tracing(args.trace)
     run_scrapy_spiders()
     run_selenium_scrapers()
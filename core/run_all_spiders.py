@@ -1,10 +1,11 @@
 from scrapy.crawler import CrawlerProcess
-from core.spiders import FreshersworldJobScraper, InternshalaJobScraper
+from core.spiders import FreshersworldJobScraper, InternshalaJobScraper, TimesJobsJobScraper
 
 def run_all_spiders():
     process = CrawlerProcess()
     process.crawl(FreshersworldJobScraper)
     process.crawl(InternshalaJobScraper)
+    process.crawl(TimesJobsJobScraper)
    
     process.start()
 
@@ -0,0 +1,581 @@
+# Full-text search over the scraped job corpus
+#
+# An on-disk inverted index over title, company, skill tags, location and
+# description, ranked with BM25. New jobs are buffered in memory and written
+# out as an immutable segment on commit(); once there are too many segments
+# the smallest are merged. Each segment holds:
+#
+#   terms.json    term -> [byte offset, byte length, tf offset, document frequency]
+#   postings.bin  doc ids per term, delta + varint encoded
+#   tfs.bin       term frequencies per posting, one byte each
+#   *.npy         per-document columns: length, source, job_type, posted day,
+#                 key hash, offset into docs.jsonl, deleted flag
+#   docs.jsonl    the canonical records, read back only for returned hits
+#
+# Queries are scored with numpy over the decoded posting lists, so a search
+# touches only the postings of its terms and the filter columns.
+#
+#   python -m core.search_index --rebuild
+#   python -m core.search_index "python developer" --source linkedin.com --since 2025-07-01
+import argparse
+import fcntl
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+
+from core.normalize import normalize_jobs
+from core.records import canonical_job
+
+INDEX_PATH = 'outputs/search_index'
+CORPUS_GLOBS = ('outputs/*.json', 'jsonFiles/*.json')
+
+# Title and company matches count for more than a mention in the description
+FIELD_WEIGHTS = (('title', 3), ('company', 2), ('tags', 2), ('location', 1), ('description', 1))
+K1 = 1.2
+B = 0.75
+
+FLUSH_DOCS = 50000
+MAX_SEGMENTS = 8
+# Merges stop here so one merge never has to hold the whole corpus in memory
+MAX_MERGE_DOCS = 250000
+POSTING_CACHE_SIZE = 256
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has in is it of on or that the to was were will with'.split())
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def key_hash(key):
+    return int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'little')
+
+
+def day_number(value):
+    """ISO date (or date) to a day ordinal, 0 when unknown"""
+    if not value:
+        return 0
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal()
+
+
+def encode_varints(values):
+    """LEB128-encode an array of non-negative integers in one vectorized pass"""
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return np.empty(0, np.uint8), np.empty(0, np.int64)
+    nbytes = np.ones(len(values), np.int64)
+    for shift in (7, 14, 21, 28, 35):
+        nbytes += values >= (1 << shift)
+    ends = np.cumsum(nbytes)
+    starts = ends - nbytes
+    owner = np.repeat(np.arange(len(values)), nbytes)
+    shifts = ((np.arange(ends[-1]) - starts[owner]) * 7).astype(np.uint64)
+    out = ((values[owner] >> shifts) & 0x7f).astype(np.uint8)
+    out[np.arange(ends[-1]) != ends[owner] - 1] |= 0x80
+    return out, nbytes
+
+
+def decode_varints(buf):
+    data = np.frombuffer(buf, np.uint8)
+    ends = np.flatnonzero(data < 0x80)
+    if not len(ends):
+        return np.empty(0, np.uint64)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    owner = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = ((np.arange(len(data)) - starts[owner]) * 7).astype(np.uint64)
+    return np.add.reduceat((data & 0x7f).astype(np.uint64) << shifts, starts)
+
+
+class SegmentWriter:
+    """Accumulates documents in memory and writes them out as one segment"""
+
+    def __init__(self):
+        self.records = []
+        self.postings = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record, source_id, job_type_id):
+        doc = len(self.records)
+        counts = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            value = record.get(field)
+            if isinstance(value, list):
+                value = ' '.join(str(v) for v in value)
+            for token in tokenize(value):
+                counts[token] += weight
+        for token, tf in counts.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = (array('I'), array('B'))
+            posting[0].append(doc)
+            posting[1].append(min(tf, 255))
+        self.records.append((record, sum(counts.values()), source_id, job_type_id))
+
+    def write(self, path):
+        # Written under a temporary name, so a crash never leaves a half-written segment at `path`
+        final_path, path = path, path + '.tmp'
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        terms = sorted(self.postings)
+        dfs = np.fromiter((len(self.postings[t][0]) for t in terms), np.int64, len(terms))
+        docs = np.frombuffer(b''.join(self.postings[t][0].tobytes() for t in terms), np.uint32).astype(np.uint64)
+        tfs = np.frombuffer(b''.join(self.postings[t][1].tobytes() for t in terms), np.uint8)
+
+        # Delta-encode within each term's list; the first entry stays absolute
+        tf_offsets = np.cumsum(dfs) - dfs
+        deltas = docs.copy()
+        if len(docs):
+            deltas[1:] -= docs[:-1]
+            deltas[tf_offsets] = docs[tf_offsets]
+        encoded, nbytes = encode_varints(deltas)
+        term_bytes = np.add.reduceat(nbytes, tf_offsets) if len(terms) else nbytes
+        byte_offsets = np.cumsum(term_bytes) - term_bytes
+
+        encoded.tofile(os.path.join(path, 'postings.bin'))
+        tfs.tofile(os.path.join(path, 'tfs.bin'))
+        with open(os.path.join(path, 'terms.json'), 'w') as f:
+            json.dump({term: [int(byte_offsets[i]), int(term_bytes[i]), int(tf_offsets[i]), int(dfs[i])]
+                       for i, term in enumerate(terms)}, f, separators=(',', ':'))
+
+        offsets = []
+        with open(os.path.join(path, 'docs.jsonl'), 'wb') as f:
+            for record, *_ in self.records:
+                offsets.append(f.tell())
+                f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+        columns = {
+            'lengths': np.array([r[1] for r in self.records], np.uint32),
+            'sources': np.array([r[2] for r in self.records], np.uint16),
+            'job_types': np.array([r[3] for r in self.records], np.uint16),
+            'posted': np.array([day_number(r[0]['posted_date']) for r in self.records], np.int32),
+            'keys': np.array([key_hash(r[0]['key']) for r in self.records], np.uint64),
+            'offsets': np.array(offsets, np.uint64),
+            'deleted': np.zeros(len(self.records), np.bool_),
+        }
+        for name, column in columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), column)
+        os.replace(path, final_path)
+        return int(columns['lengths'].sum())
+
+
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, 'terms.json')) as f:
+            self.terms = json.load(f)
+        self.postings = np.memmap(os.path.join(path, 'postings.bin'), np.uint8, 'r') \
+            if os.path.getsize(os.path.join(path, 'postings.bin')) else np.empty(0, np.uint8)
+        self.tfs = np.memmap(os.path.join(path, 'tfs.bin'), np.uint8, 'r') \
+            if os.path.getsize(os.path.join(path, 'tfs.bin')) else np.empty(0, np.uint8)
+        for name in ('lengths', 'sources', 'job_types', 'posted', 'keys', 'offsets'):
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+        self.deleted = np.load(os.path.join(path, 'deleted.npy'))
+        self.dirty = False
+        # Segments never change once written, so decoded postings stay valid
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self._norms = None
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @property
+    def live(self):
+        return len(self) - int(self.deleted.sum())
+
+    def df(self, term):
+        entry = self.terms.get(term)
+        return entry[3] if entry else 0
+
+    def posting(self, term):
+        """(doc ids, term frequencies) for a term"""
+        with self.cache_lock:
+            cached = self.cache.get(term)
+            if cached is not None:
+                self.cache.move_to_end(term)
+                return cached
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, length, tf_offset, df = entry
+        docs = np.cumsum(decode_varints(self.postings[offset:offset + length])).astype(np.int32)
+        posting = docs, self.tfs[tf_offset:tf_offset + df].astype(np.float32)
+        with self.cache_lock:
+            self.cache[term] = posting
+            if len(self.cache) > POSTING_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return posting
+
+    def norms(self, avg_length):
+        """BM25 length normalisation per document for the corpus' average length"""
+        if self._norms is None or self._norms[0] != avg_length:
+            lengths = np.asarray(self.lengths, np.float32)
+            self._norms = avg_length, K1 * (1 - B + B * lengths / avg_length)
+        return self._norms[1]
+
+    def delete(self, hashes):
+        """Mark documents with these key hashes deleted. Returns how many were live"""
+        hit = np.isin(self.keys, hashes) & ~self.deleted
+        count = int(hit.sum())
+        if count:
+            self.deleted |= hit
+            self.dirty = True
+        return count
+
+    def save_deleted(self):
+        if self.dirty:
+            tmp_path = os.path.join(self.path, 'deleted.tmp.npy')
+            np.save(tmp_path, self.deleted)
+            os.replace(tmp_path, os.path.join(self.path, 'deleted.npy'))
+            self.dirty = False
+
+    def records(self, docs):
+        with open(os.path.join(self.path, 'docs.jsonl'), 'rb') as f:
+            for doc in docs:
+                f.seek(int(self.offsets[doc]))
+                yield json.loads(f.readline())
+
+    def live_records(self):
+        with open(os.path.join(self.path, 'docs.jsonl'), 'rb') as f:
+            for doc, line in enumerate(f):
+                if not self.deleted[doc]:
+                    yield json.loads(line)
+
+
+class SearchIndex:
+    """BM25 search over the job corpus with incremental, segment-based updates
+
+    Several processes may write to one index (the scrapers run from cron and
+    from run_all): a commit or merge holds an exclusive lock on index.lock
+    and starts from the manifest as it is on disk. Within a process the index
+    can be shared between threads (see get_index()).
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        self.manifest_path = os.path.join(path, 'index.json')
+        self.lock_path = os.path.join(path, 'index.lock')
+        # Open while this process holds the lock on lock_path
+        self._lock_file = None
+        self.manifest = self._read_manifest()
+        self.segments = [Segment(os.path.join(path, name)) for name in self.manifest['segments']]
+        self._load_vocabs()
+        self.pending = {}
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'segments': [], 'next_segment': 1, 'total_length': 0, 'sources': [], 'job_types': []}
+
+    def _load_vocabs(self):
+        self.sources = {name: i + 1 for i, name in enumerate(self.manifest['sources'])}
+        self.job_types = {name: i + 1 for i, name in enumerate(self.manifest['job_types'])}
+
+    def _reload(self):
+        """Catch up with segments, deletions and vocabularies another process published"""
+        self.manifest = self._read_manifest()
+        loaded = {segment.name: segment for segment in self.segments}
+        segments = []
+        for name in self.manifest['segments']:
+            segment = loaded.get(name)
+            if segment is None:
+                segment = Segment(os.path.join(self.path, name))
+            else:
+                segment.deleted = np.load(os.path.join(segment.path, 'deleted.npy'))
+                segment.dirty = False
+            segments.append(segment)
+        self.segments = segments
+        self._load_vocabs()
+
+    @contextmanager
+    def _writing(self):
+        """Hold index.lock, so one process at a time changes the segments and the manifest"""
+        with self.lock:
+            if self._lock_file is not None:
+                # commit() -> merge(): already held
+                yield
+                return
+            os.makedirs(self.path, exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_file = lock_file
+                try:
+                    self._reload()
+                    yield
+                finally:
+                    self._lock_file = None
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- Writing ---------------------------------------------------------
+
+    def add(self, jobs):
+        """Queue jobs (raw scraper records) for the next commit. A job already
+        in the index is replaced by the new version"""
+        with self.lock:
+            for job in jobs:
+                record = canonical_job(job)
+                self.pending[record['key']] = record
+            if len(self.pending) >= FLUSH_DOCS:
+                self.commit()
+
+    def commit(self):
+        """Write pending jobs as a new segment and publish it"""
+        with self.lock:
+            if not self.pending:
+                return 0
+            with self._writing():
+                hashes = np.array([key_hash(key) for key in self.pending], np.uint64)
+                for segment in self.segments:
+                    segment.delete(hashes)
+
+                normalize_jobs(list(self.pending.values()))
+                writer = SegmentWriter()
+                for record in self.pending.values():
+                    writer.add(record, self._vocab_id(self.sources, record['source']),
+                               self._vocab_id(self.job_types, record['job_type']))
+                added = len(writer)
+                self._publish_segment(writer)
+                self.pending = {}
+
+                if len(self.segments) > MAX_SEGMENTS:
+                    self.merge(max_docs=MAX_MERGE_DOCS)
+                return added
+
+    def merge(self, max_docs=None):
+        """Rewrite the smallest segments as one, dropping deleted docs
+
+        Takes segments smallest first while their live documents fit in
+        max_docs (no limit by default, i.e. merge everything).
+        """
+        with self._writing():
+            victims = []
+            total = 0
+            for segment in sorted(self.segments, key=lambda s: s.live):
+                if max_docs and total + segment.live > max_docs:
+                    break
+                victims.append(segment)
+                total += segment.live
+            if len(victims) < 2:
+                return
+            writer = SegmentWriter()
+            for segment in victims:
+                for record in segment.live_records():
+                    writer.add(record, self._vocab_id(self.sources, record['source']),
+                               self._vocab_id(self.job_types, record['job_type']))
+            self._publish_segment(writer, replaces=victims)
+
+    def _vocab_id(self, vocab, value):
+        if not value:
+            return 0
+        if value not in vocab:
+            vocab[value] = len(vocab) + 1
+        return vocab[value]
+
+    def _publish_segment(self, writer, replaces=()):
+        """Write a segment, then swap the manifest so readers never see a partial state
+
+        Called under _writing(), so next_segment is the one on disk and no
+        other process is publishing the same name.
+        """
+        name = f"seg-{self.manifest['next_segment']:06d}"
+        segment = None
+        if len(writer):
+            # Left by a crash after a write but before the manifest swap; not in the manifest, so unused
+            if os.path.exists(os.path.join(self.path, name)):
+                shutil.rmtree(os.path.join(self.path, name))
+            writer.write(os.path.join(self.path, name))
+            segment = Segment(os.path.join(self.path, name))
+
+        kept = [s for s in self.segments if s not in replaces]
+        self.segments = kept + ([segment] if segment else [])
+        self.manifest.update(
+            segments=[s.name for s in self.segments],
+            next_segment=self.manifest['next_segment'] + 1,
+            total_length=int(sum(int(s.lengths.sum()) for s in self.segments)),
+            sources=sorted(self.sources, key=self.sources.get),
+            job_types=sorted(self.job_types, key=self.job_types.get),
+        )
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+        for old in kept:
+            old.save_deleted()
+        for old in replaces:
+            shutil.rmtree(old.path, ignore_errors=True)
+
+    # --- Searching -------------------------------------------------------
+
+    def __len__(self):
+        return sum(segment.live for segment in self.segments)
+
+    def search(self, query='', source=None, job_type=None, posted_after=None,
+               posted_before=None, limit=20):
+        """Return the best matching jobs, each with a `score`
+
+        Filters are exact (case-insensitive) matches on source and job_type and
+        an inclusive posted-date range; jobs without a known posted date are
+        excluded by a date filter. Without query terms the newest jobs that
+        pass the filters are returned.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self.lock:
+            segments = list(self.segments)
+        total_docs = sum(len(segment) for segment in segments)
+        if not total_docs:
+            return []
+        avg_length = max(self.manifest['total_length'] / total_docs, 1.0)
+
+        idf = {}
+        for term in terms:
+            df = sum(segment.df(term) for segment in segments)
+            if df:
+                idf[term] = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        if terms and not idf:
+            return []
+
+        candidates = []
+        for segment in segments:
+            mask = self._filter_mask(segment, source, job_type, posted_after, posted_before)
+            if mask is None:
+                continue
+            if terms:
+                scores = np.zeros(len(segment), np.float32)
+                norms = segment.norms(avg_length)
+                for term, weight in idf.items():
+                    posting = segment.posting(term)
+                    if posting is None:
+                        continue
+                    docs, tfs = posting
+                    scores[docs] += weight * tfs * (K1 + 1) / (tfs + norms[docs])
+                scores *= mask
+            else:
+                scores = np.where(mask, np.asarray(segment.posted, np.float32), -1)
+            if len(scores) > limit:
+                ranked = np.argpartition(-scores, limit)[:limit]
+            else:
+                ranked = np.arange(len(scores))
+            ranking = scores[ranked]
+            keep = ranking > 0 if terms else ranking >= 0
+            ranked, ranking = ranked[keep], ranking[keep]
+            candidates.extend((float(score), segment, int(doc)) for score, doc in zip(ranking, ranked))
+
+        candidates.sort(key=lambda c: -c[0])
+        results = []
+        for score, segment, doc in candidates[:limit]:
+            record = next(segment.records([doc]))
+            record['score'] = round(score, 4) if terms else None
+            results.append(record)
+        return results
+
+    def _filter_mask(self, segment, source, job_type, posted_after, posted_before):
+        """Boolean mask of live documents passing the filters, None if none can"""
+        mask = ~segment.deleted
+        if source:
+            source_id = self.sources.get(source.lower())
+            if source_id is None:
+                return None
+            mask &= segment.sources == source_id
+        if job_type:
+            type_id = self.job_types.get(re.sub(r'[\s_-]+', ' ', job_type).lower())
+            if type_id is None:
+                return None
+            mask &= segment.job_types == type_id
+        if posted_after:
+            mask &= segment.posted >= day_number(posted_after)
+        if posted_before:
+            mask &= (segment.posted <= day_number(posted_before)) & (segment.posted > 0)
+        return mask if mask.any() else None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(path=INDEX_PATH):
+    """Return the process-wide index, shared by every scraper that feeds it"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex(path)
+        return _index
+
+
+def index_jobs(jobs):
+    """Add freshly scraped jobs to the search index; never fails the scrape"""
+    try:
+        index = get_index()
+        index.add(jobs)
+        index.commit()
+    except Exception as e:
+        print(f"⚠️ Could not update search index: {e}")
+
+
+def rebuild(path=INDEX_PATH, patterns=CORPUS_GLOBS):
+    """Build a fresh index from every JSON output file"""
+    shutil.rmtree(path, ignore_errors=True)
+    index = SearchIndex(path)
+    for pattern in patterns:
+        for filename in sorted(glob.glob(pattern)):
+            try:
+                with open(filename, encoding='utf-8') as f:
+                    jobs = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {filename}: {e}")
+                continue
+            index.add(jobs)
+            print(f"📥 {filename}: {len(jobs)} jobs")
+    index.commit()
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the scraped job corpus")
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('--source')
+    parser.add_argument('--job-type')
+    parser.add_argument('--since', help="posted on or after YYYY-MM-DD")
+    parser.add_argument('--until', help="posted on or before YYYY-MM-DD")
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--rebuild', action='store_true', help="re-index outputs/ and jsonFiles/")
+    args = parser.parse_args()
+
+    index = rebuild() if args.rebuild else SearchIndex()
+    print(f"🔎 {len(index)} jobs indexed")
+    if not args.query and not (args.source or args.job_type or args.since or args.until):
+        return
+    for job in index.search(args.query, args.source, args.job_type, args.since, args.until, args.limit):
+        print(f"{job['score'] or '':>8}  {job['title']} | {job['company']} | {job['location']} "
+              f"| {job['source']} | {job['posted_date']}")
+        print(f"          {job['link']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -40,27 +40,44 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "core.middlewares.CoreSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    "core.middlewares.CoreSpiderMiddleware": 543,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "core.middlewares.CoreDownloaderMiddleware": 543,
-#}
+# Next to the downloader, so the metrics see every attempt and the wire size
+DOWNLOADER_MIDDLEWARES = {
+    # Ahead of everything else, so a dropped page costs nothing
+    "core.middlewares.StalePageMiddleware": 50,
+    "core.middlewares.CoreDownloaderMiddleware": 950,
+}
+
+# Serve per-spider metrics on http://<host>:<port>/metrics while crawling;
+# None leaves it to the METRICS_PORT environment variable
+METRICS_PORT = None
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
+EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+    "core.profiling.ProfilingExtension": 500,
+}
+
+# Sampled stacks and allocation reports under outputs/profiles/ (see
+# core/profiling.py); also switched on by SCRAPER_PROFILE=1
+PROFILE_ENABLED = False
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "core.pipelines.CorePipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "core.pipelines.SkillTaggingPipeline": 700,
+    # After tagging, which reads the full description
+    "core.pipelines.DescriptionStorePipeline": 750,
+    "core.pipelines.SearchIndexPipeline": 800,
+    "core.pipelines.CorpusPipeline": 850,
+    "core.pipelines.ChangeCapturePipeline": 900,
+}
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -83,5 +100,9 @@ DOWNLOAD_DELAY = 1
 #HTTPCACHE_IGNORE_HTTP_CODES = []
 #HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
 
+# Crawl cutoff: paginating spiders stop at the first results page whose newest
+# posting is older than this many days (None, the default, follows every page)
+MAX_POSTING_AGE_DAYS = None
+
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
@@ -0,0 +1,235 @@
+# Skill tagging for every source
+#
+# Only RemoteOK and Arbeitnow send tags; LinkedIn, Shine, TimesJobs and the
+# Scrapy spiders have nothing but a title and a free-text description.
+# tag_jobs() fills `tags` for all of them from the taxonomy in
+# core/data/skills.txt (about 1,400 skills under 3,700 names and synonyms).
+#
+# The names are compiled into a trie over words. A record's title and
+# description are tokenized once and walked left to right, taking the longest
+# skill name that starts at each word ("spring boot" over "spring", "sql
+# server" over "sql"), so tagging costs the same whatever the size of the
+# taxonomy. Backfills spread batches of records over worker processes.
+#
+#   python -m core.skills --backfill
+#   python -m core.skills "Senior Java / Spring Boot developer, AWS, CI/CD"
+import argparse
+import glob
+import json
+import os
+import re
+from functools import lru_cache
+from multiprocessing import Pool
+
+from core.blobstore import full_description
+from core.records import FIELD_ALIASES, first_value
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skills.txt')
+CORPUS_GLOBS = ('outputs/*.json', 'jsonFiles/*.json')
+
+# Records handed to a worker process at a time
+BATCH_SIZE = 2000
+
+# "c++", "c#" and "k8s" stay whole; "." and "&" are words of their own so that
+# "node.js", ".net" and "p&l" match however they're spaced. Everything else
+# ("/", "-", ",") separates words, so "ci/cd" and "ci-cd" are "ci cd".
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*|[.&]')
+# Between title and description, so no skill name spans the two
+FIELD_BREAK = '|'
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """Parse the taxonomy file into {canonical name: (category, [names to match])}"""
+    taxonomy = {}
+    category = None
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('['):
+                category = line.strip('[]')
+                continue
+            names = [name.strip() for name in line.split('|')]
+            canonical = names[0].lstrip('~')
+            if not canonical or canonical in taxonomy:
+                raise ValueError(f"{path}:{number}: empty or duplicate skill {canonical!r}")
+            # "~Go | golang": the canonical name itself is too ambiguous to match
+            aliases = names[1:] if names[0].startswith('~') else [canonical] + names[1:]
+            taxonomy[canonical] = (category, aliases)
+    return taxonomy
+
+
+class SkillTagger:
+    """Word trie over every skill name in a taxonomy"""
+
+    def __init__(self, taxonomy):
+        self.categories = {skill: category for skill, (category, _) in taxonomy.items()}
+        self.root = {}
+        self.names = 0
+        for skill, (_, aliases) in taxonomy.items():
+            for alias in aliases:
+                tokens = tokenize(alias)
+                if not tokens:
+                    continue
+                node = self.root
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                # A name listed under two skills ("c/c++") tags both; the
+                # None key can't collide with a word
+                skills = node.get(None, ())
+                if skill not in skills:
+                    node[None] = skills + (skill,)
+                    self.names += 1
+
+    def __len__(self):
+        return len(self.categories)
+
+    def tag_tokens(self, tokens):
+        """Skills named in a token list, in order of first mention"""
+        root = self.root
+        found = {}
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = root.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+            match = node.get(None)
+            end = i + 1
+            j = i + 1
+            while j < n:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if None in node:
+                    match = node[None]
+                    end = j
+            if match:
+                for skill in match:
+                    found[skill] = None
+                i = end
+            else:
+                i += 1
+        return list(found)
+
+    def tag(self, *texts):
+        """Skills named in one or more texts (e.g. title and description)"""
+        tokens = []
+        for text in texts:
+            if tokens:
+                tokens.append(FIELD_BREAK)
+            tokens.extend(tokenize(text))
+        return self.tag_tokens(tokens)
+
+
+@lru_cache(maxsize=None)
+def get_tagger(path=TAXONOMY_PATH):
+    """Return the tagger for a taxonomy file, compiled once per process"""
+    return SkillTagger(load_taxonomy(path))
+
+
+def job_texts(job):
+    """The (title, full description) of a record from any scraper"""
+    title = first_value(job, FIELD_ALIASES['title'])
+    if job.get('description_hash'):
+        description = full_description(job)
+    else:
+        description = first_value(job, FIELD_ALIASES['description'])
+    return (title if isinstance(title, str) else None,
+            description if isinstance(description, str) else None)
+
+
+def merge_tags(existing, found):
+    """Existing tags first, then new ones, without case-insensitive duplicates"""
+    if isinstance(existing, str):
+        existing = [tag.strip() for tag in existing.split(',')]
+    tags = []
+    seen = set()
+    for tag in list(existing or []) + found:
+        if not isinstance(tag, str) or not tag or tag.lower() in seen:
+            continue
+        seen.add(tag.lower())
+        tags.append(tag)
+    return tags
+
+
+def _tag_batch(texts):
+    tagger = get_tagger()
+    return [tagger.tag(title, description) for title, description in texts]
+
+
+def make_pool(processes=None):
+    """Worker processes for tag_jobs(), each compiling the taxonomy once on start"""
+    return Pool(processes, initializer=get_tagger)
+
+
+def tag_jobs(jobs, pool=None):
+    """Fill `tags` on job records in place, keeping any tags the source sent
+
+    With a pool (see make_pool()), batches of records are tagged in the
+    worker processes; only the title and description cross over.
+    """
+    texts = [job_texts(job) for job in jobs]
+    if pool is None or len(texts) <= BATCH_SIZE:
+        found = _tag_batch(texts)
+    else:
+        batches = [texts[i:i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+        found = [tags for batch in pool.imap(_tag_batch, batches) for tags in batch]
+    for job, tags in zip(jobs, found):
+        job['tags'] = merge_tags(job.get('tags'), tags)
+    return jobs
+
+
+def backfill(patterns=CORPUS_GLOBS, processes=None):
+    """Tag every record in the JSON output files, rewriting them in place"""
+    total = 0
+    with make_pool(processes) as pool:
+        for pattern in patterns:
+            for filename in sorted(glob.glob(pattern)):
+                try:
+                    with open(filename, encoding='utf-8') as f:
+                        jobs = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Skipping {filename}: {e}")
+                    continue
+                if not isinstance(jobs, list):
+                    continue
+                tag_jobs(jobs, pool)
+                tmp_path = filename + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(jobs, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, filename)
+                tagged = sum(1 for job in jobs if job.get('tags'))
+                print(f"🏷️ {filename}: {tagged}/{len(jobs)} jobs tagged")
+                total += len(jobs)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag job records with skills from the taxonomy")
+    parser.add_argument('text', nargs='?', help="tag this text and print the skills found")
+    parser.add_argument('--backfill', action='store_true', help="tag every file in outputs/ and jsonFiles/")
+    parser.add_argument('--processes', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    tagger = get_tagger()
+    print(f"📚 {len(tagger)} skills, {tagger.names} names")
+    if args.text:
+        for skill in tagger.tag(args.text):
+            print(f"  {skill}  ({tagger.categories[skill]})")
+    if args.backfill:
+        total = backfill(processes=args.processes)
+        print(f"✅ Tagged {total} jobs; run python -m core.search_index --rebuild to re-index them")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,77 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import json
+import os
 import time
 from datetime import datetime
+from functools import lru_cache
 import random
 import re
 
+from core.blobstore import store_descriptions
+from core.cdc import capture_changes
+from core.checkpoint import CheckpointStore
+from core.corpus import append_to_corpus
+from core.dates import cutoff_date, resolve_posted
+from core.keyword_automaton import KeywordAutomaton
+from core.log import PER_ITEM, flush_logs, get_logger
+from core.metrics import record_items, record_response, record_selector, serve_metrics, timed, write_report
+from core.profiling import profiled, stage
+from core.search_index import index_jobs
+from core.skills import tag_jobs
+from core.tracing import span, write_trace
+
+logger = get_logger('shine')
+
+DESCRIPTION_PREVIEW_CHARS = 250
+
+# Keyword tables for the line heuristics, compiled into one automaton so each
+# line is scanned once no matter how many tables it is checked against
+LINE_CLASSIFIER = KeywordAutomaton({
+    'title': ['developer', 'engineer', 'analyst', 'manager', 'specialist', 'associate',
+              'consultant', 'executive', 'lead', 'senior', 'junior', 'intern', 'trainee'],
+    'title_skip': ['company', 'location', 'salary', 'experience', 'ago', 'posted', 'apply', 'years', 'lpa'],
+    'company': ['ltd', 'pvt', 'inc', 'corp', 'technologies', 'solutions', 'systems',
+                'services', 'consultancy', 'consulting', 'software', 'infotech'],
+    'company_skip': ['years', 'experience', 'salary', 'lpa', 'ago', 'posted', 'apply',
+                     'bangalore', 'mumbai', 'delhi', 'hyderabad', 'chennai', 'pune'],
+    'city': ['bangalore', 'mumbai', 'delhi', 'hyderabad', 'chennai', 'pune', 'kolkata',
+             'gurgaon', 'noida', 'ahmedabad', 'surat', 'jaipur', 'lucknow', 'kanpur',
+             'nagpur', 'indore', 'thane', 'bhopal', 'visakhapatnam', 'pimpri', 'patna',
+             'vadodara', 'ludhiana', 'agra', 'nashik', 'kochi', 'coimbatore', 'kozhikode'],
+    'experience': ['year', 'experience', 'fresher', 'exp', 'yrs'],
+    'fresher': ['fresher'],
+    'salary': ['lpa', 'salary', 'ctc', '₹', 'rs', 'lakhs', 'k'],
+    'posted_date': ['ago', 'posted', 'days', 'hours', 'today', 'yesterday'],
+    'invalid_title': ['company', 'location', 'salary', 'experience', 'apply', 'view', 'details'],
+    'rejected_title': ['location', 'salary', 'experience', 'company', 'apply', 'view'],
+    'internship': ['intern', 'internship', 'trainee'],
+    'contract': ['contract', 'contractor', 'freelance'],
+    'part_time': ['part time', 'part-time'],
+    'digit': list('0123456789'),
+})
+(TITLE, TITLE_SKIP, COMPANY, COMPANY_SKIP, CITY, EXPERIENCE, FRESHER, SALARY, POSTED_DATE,
+ INVALID_TITLE, REJECTED_TITLE, INTERNSHIP, CONTRACT, PART_TIME, DIGIT) = (
+    LINE_CLASSIFIER.bit(name) for name in LINE_CLASSIFIER.names)
+
+
+@lru_cache(maxsize=8192)
+def classify_line(line):
+    """Bitset of the keyword tables matching a line (case-insensitive)
+
+    Cached: the same "Apply", city and "posted N days ago" lines repeat on
+    every card of a results page.
+    """
+    mask = LINE_CLASSIFIER.scan(line.lower())
+    # str.isdigit() also accepts non-ASCII digits
+    if not mask & DIGIT and not line.isascii() and any(char.isdigit() for char in line):
+        mask |= DIGIT
+    return mask
+
+
 class FastShineSeleniumScraper:
     def __init__(self, headless=True):
+        self.headless = headless
         self.setup_driver(headless)
         
     def setup_driver(self, headless):
@@ -38,43 +102,92 @@ class FastShineSeleniumScraper:
             self.driver = webdriver.Chrome(options=chrome_options)
             self.driver.set_page_load_timeout(15)
             self.driver.implicitly_wait(3)
-            print("✅ Browser initialized successfully")
+            logger.info("✅ Browser initialized successfully")
             
         except Exception as e:
-            print(f"❌ Error setting up Chrome driver: {e}")
+            logger.error("❌ Error setting up Chrome driver: %s", e)
             raise
     
-    def fast_scrape_shine(self, query="software developer", location="India", max_jobs=50):
-        """Fast scraping using direct element extraction"""
-        print(f"🚀 Fast scraping Shine.com for '{query}' in '{location}' (max {max_jobs} jobs)...")
+    def is_driver_alive(self):
+        """Check that the browser session still answers commands"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+    
+    def recycle_driver(self):
+        """Throw away a broken browser session and start a fresh one"""
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.setup_driver(self.headless)
+    
+    def fast_scrape_shine(self, query="software developer", location="India", max_jobs=50,
+                          checkpoint=None, max_restarts=2, max_age_days=None):
+        """Fast scraping using direct element extraction
+
+        Jobs are written to the checkpoint store as they are extracted. After a
+        WebDriver error the browser is restarted and the page is scraped again,
+        skipping the jobs that were already emitted. Shine has one results page
+        that grows as it is scrolled, so with max_age_days older cards are
+        skipped rather than ending the pagination.
+        """
+        logger.info("🚀 Fast scraping Shine.com for '%s' in '%s' (max %s jobs)...", query, location, max_jobs)
+        
+        checkpoint = checkpoint or CheckpointStore('shine', ':memory:')
+        if checkpoint.is_done(query, location, 1):
+            all_jobs = checkpoint.load_jobs()
+            logger.info("⏭️ Already scraped, %s jobs restored from checkpoint", len(all_jobs))
+            return all_jobs
         
-        all_jobs = []
         base_url = f"https://www.shine.com/job-search/{query.replace(' ', '-')}-jobs"
+        cutoff = cutoff_date(max_age_days)
         
-        try:
-            print(f"🌐 Loading: {base_url}")
-            start_time = time.time()
-            
-            self.driver.get(base_url)
-            print(f"⏱️ Page loaded in {time.time() - start_time:.2f} seconds")
-            
-            # Wait for job listings to load
-            time.sleep(4)
-            
-            # Scroll to load more jobs
-            self.scroll_to_load_jobs()
-            
-            # Extract jobs using direct element method
-            jobs = self.extract_jobs_with_selenium(max_jobs)
-            
-            if jobs:
-                all_jobs.extend(jobs)
-                print(f"✅ Extracted {len(jobs)} jobs in {time.time() - start_time:.2f} seconds")
-            
-        except Exception as e:
-            print(f"❌ Error during scraping: {e}")
-        
-        return all_jobs
+        for attempt in range(max_restarts + 1):
+            try:
+                logger.info("🌐 Loading: %s", base_url)
+                start_time = time.time()
+                
+                with span('page', source='shine', query=query, location=location, page=1, attempt=attempt + 1):
+                    with span('render', url=base_url):
+                        self.driver.get(base_url)
+                        record_response('shine', 'loaded', None, time.time() - start_time)
+                        logger.info("⏱️ Page loaded in %.2f seconds", time.time() - start_time)
+                        
+                        # Wait for job listings to load
+                        time.sleep(4)
+                        
+                        # Scroll to load more jobs
+                        self.scroll_to_load_jobs()
+                    
+                    # Extract jobs using direct element method
+                    jobs = self.extract_jobs_with_selenium(max_jobs, checkpoint, cutoff)
+                if not self.is_driver_alive():
+                    raise WebDriverException("browser session lost")
+                checkpoint.mark_done(query, location, 1)
+                
+                if jobs:
+                    logger.info("✅ Extracted %s jobs in %.2f seconds", len(jobs), time.time() - start_time)
+                break
+                
+            except WebDriverException as e:
+                if attempt == max_restarts:
+                    logger.error("❌ Browser kept failing, giving up: %s", e)
+                    break
+                logger.info("♻️ WebDriver error, restarting browser (%s/%s): %s", attempt + 1, max_restarts, e)
+                try:
+                    self.recycle_driver()
+                except Exception as e:
+                    logger.error("❌ Could not restart browser: %s", e)
+                    break
+            except Exception as e:
+                logger.error("❌ Error during scraping: %s", e)
+                break
+        
+        checkpoint.flush()
+        return checkpoint.load_jobs()
     
     def scroll_to_load_jobs(self):
         """Scroll to load more jobs"""
@@ -83,11 +196,12 @@ class FastShineSeleniumScraper:
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                 time.sleep(1.5)
         except Exception as e:
-            print(f"⚠️ Error scrolling: {e}")
+            logger.warning("⚠️ Error scrolling: %s", e)
     
-    def extract_jobs_with_selenium(self, max_jobs):
+    def extract_jobs_with_selenium(self, max_jobs, checkpoint=None, cutoff=None):
         """Extract jobs using Selenium with proper selectors"""
         jobs = []
+        too_old = 0
         
         try:
             # Try multiple selectors for job cards
@@ -107,31 +221,47 @@ class FastShineSeleniumScraper:
                     elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                     if len(elements) > 5:  # Use selector with most results
                         job_elements = elements
-                        print(f"✅ Found {len(elements)} jobs with selector: {selector}")
+                        logger.info("✅ Found %s jobs with selector: %s", len(elements), selector)
                         break
                 except:
                     continue
+            record_selector('shine', 'job_card', selector if job_elements else None)
             
             if not job_elements:
-                print("❌ No job elements found with any selector")
+                logger.warning("❌ No job elements found with any selector")
                 return []
             
             # Extract data from each job element
             for i, element in enumerate(job_elements[:max_jobs]):
                 try:
-                    job_data = self.extract_job_from_element(element, i+1)
+                    with span('extract', card=i + 1):
+                        job_data = self.extract_job_from_element(element, i+1)
                     if job_data and self.validate_job_data(job_data):
+                        if cutoff and job_data['posted_on'] and job_data['posted_on'] < cutoff.isoformat():
+                            too_old += 1
+                            continue
+                        if checkpoint:
+                            if checkpoint.seen(job_data):
+                                record_items('shine', 0, duplicates=1)
+                                continue
+                            checkpoint.add_jobs([job_data])
+                            if len(jobs) % 10 == 9:
+                                checkpoint.flush()
                         jobs.append(job_data)
+                        record_items('shine')
                 except Exception as e:
-                    print(f"⚠️ Error extracting job {i+1}: {e}")
+                    logger.warning("⚠️ Error extracting job %s: %s", i+1, e, extra=PER_ITEM)
                     continue
             
+            if too_old:
+                logger.info("🛑 Skipped %s jobs posted before %s", too_old, cutoff)
             return jobs
             
         except Exception as e:
-            print(f"❌ Error in Selenium extraction: {e}")
+            logger.error("❌ Error in Selenium extraction: %s", e)
             return []
     
+    @timed('shine')
     def extract_job_from_element(self, element, job_num):
         """Extract job data from a single element with improved logic"""
         try:
@@ -145,6 +275,9 @@ class FastShineSeleniumScraper:
             if len(lines) < 2:
                 return None
             
+            # Classify every line once; the extract_proper_* helpers read the bitsets
+            masks = [classify_line(line) for line in lines]
+            
             # Initialize job data
             job_data = {
                 'title': 'Not specified',
@@ -156,29 +289,29 @@ class FastShineSeleniumScraper:
             }
             
             # Extract title (first meaningful line that looks like a job title)
-            title = self.extract_proper_title(lines, element)
+            title = self.extract_proper_title(lines, masks, element)
             if not title:
                 return None
             job_data['title'] = title
             
             # Extract company (second meaningful line or one with company indicators)
-            company = self.extract_proper_company(lines, element)
+            company = self.extract_proper_company(lines, masks, element)
             job_data['company'] = company
             
             # Extract location from lines
-            location = self.extract_proper_location(lines)
+            location = self.extract_proper_location(lines, masks)
             job_data['location'] = location
             
             # Extract experience
-            experience = self.extract_proper_experience(lines)
+            experience = self.extract_proper_experience(lines, masks)
             job_data['experience_required'] = experience
             
             # Extract salary
-            salary = self.extract_proper_salary(lines)
+            salary = self.extract_proper_salary(lines, masks)
             job_data['salary'] = salary
             
             # Extract posted date
-            posted_date = self.extract_proper_posted_date(lines)
+            posted_date = self.extract_proper_posted_date(lines, masks)
             job_data['posted_date'] = posted_date
             
             # Try to get link
@@ -190,21 +323,24 @@ class FastShineSeleniumScraper:
                 job_data['link'] = 'Not available'
             
             # Additional fields
+            scraped_at = datetime.now()
+            posted_on = resolve_posted(posted_date, scraped_at)
             job_data.update({
-                'job_type': self.determine_job_type(job_data['title'], full_text),
+                'job_type': self.determine_job_type(job_data['title'], full_text, masks),
                 'description': self.clean_description(full_text),
+                'posted_on': posted_on.isoformat() if posted_on else None,
                 'source': 'Shine.com',
-                'scraped_at': datetime.now().isoformat()
+                'scraped_at': scraped_at.isoformat()
             })
             
-            print(f"  ✓ Job {job_num}: {job_data['title'][:40]}... | {job_data['company']}")
+            logger.info("  ✓ Job %s: %.40s... | %s", job_num, job_data['title'], job_data['company'], extra=PER_ITEM)
             return job_data
             
         except Exception as e:
-            print(f"⚠️ Error in job extraction: {e}")
+            logger.warning("⚠️ Error in job extraction: %s", e, extra=PER_ITEM)
             return None
     
-    def extract_proper_title(self, lines, element):
+    def extract_proper_title(self, lines, masks, element):
         """Extract proper job title"""
         try:
             # First try to get from title attribute or data attributes
@@ -217,15 +353,11 @@ class FastShineSeleniumScraper:
             pass
         
         # Look for title in first few lines
-        job_keywords = ['developer', 'engineer', 'analyst', 'manager', 'specialist', 'associate', 
-                       'consultant', 'executive', 'lead', 'senior', 'junior', 'intern', 'trainee']
-        
-        for line in lines[:3]:
-            line_lower = line.lower()
+        for line, mask in zip(lines[:3], masks):
             # Check if line contains job keywords and looks like a title
-            if (any(keyword in line_lower for keyword in job_keywords) and
+            if (mask & TITLE and
                 len(line) > 5 and len(line) < 100 and
-                not any(skip in line_lower for skip in ['company', 'location', 'salary', 'experience', 'ago', 'posted', 'apply', 'years', 'lpa'])):
+                not mask & TITLE_SKIP):
                 return line.strip()
         
         # Fallback to first line if it's reasonable
@@ -234,7 +366,7 @@ class FastShineSeleniumScraper:
         
         return None
     
-    def extract_proper_company(self, lines, element):
+    def extract_proper_company(self, lines, masks, element):
         """Extract proper company name"""
         try:
             # Try to get from data attributes
@@ -245,77 +377,56 @@ class FastShineSeleniumScraper:
         except:
             pass
         
-        # Look for company in lines (usually second line or one with company indicators)
-        company_indicators = ['ltd', 'pvt', 'inc', 'corp', 'technologies', 'solutions', 'systems', 
-                             'services', 'consultancy', 'consulting', 'software', 'infotech']
-        
         # Skip first line (usually title) and look in next few lines
-        for line in lines[1:5]:
-            line_lower = line.lower()
+        for line, mask in zip(lines[1:5], masks[1:5]):
             # Check if line looks like a company name
             if (len(line) > 2 and len(line) < 80 and
-                not any(skip in line_lower for skip in ['years', 'experience', 'salary', 'lpa', 'ago', 'posted', 'apply', 'bangalore', 'mumbai', 'delhi', 'hyderabad', 'chennai', 'pune']) and
-                (any(indicator in line_lower for indicator in company_indicators) or 
-                 (len(line.split()) <= 4 and not line_lower.isdigit()))):
+                not mask & COMPANY_SKIP and
+                (mask & COMPANY or
+                 (len(line.split()) <= 4 and not line.isdigit()))):
                 return line.strip()
         
         return 'Not specified'
     
-    def extract_proper_location(self, lines):
+    def extract_proper_location(self, lines, masks):
         """Extract proper location"""
-        indian_cities = ['bangalore', 'mumbai', 'delhi', 'hyderabad', 'chennai', 'pune', 'kolkata', 
-                        'gurgaon', 'noida', 'ahmedabad', 'surat', 'jaipur', 'lucknow', 'kanpur', 
-                        'nagpur', 'indore', 'thane', 'bhopal', 'visakhapatnam', 'pimpri', 'patna', 
-                        'vadodara', 'ludhiana', 'agra', 'nashik', 'kochi', 'coimbatore', 'kozhikode']
-        
-        for line in lines:
-            line_lower = line.lower()
-            if any(city in line_lower for city in indian_cities):
+        for line, mask in zip(lines, masks):
+            if mask & CITY:
                 return line.strip()
         
         return 'Not specified'
     
-    def extract_proper_experience(self, lines):
+    def extract_proper_experience(self, lines, masks):
         """Extract experience requirement"""
-        for line in lines:
-            line_lower = line.lower()
-            if (any(exp_word in line_lower for exp_word in ['year', 'experience', 'fresher', 'exp', 'yrs']) and 
-                len(line) < 50 and
-                any(char.isdigit() for char in line)):
+        for line, mask in zip(lines, masks):
+            if mask & EXPERIENCE and len(line) < 50 and mask & DIGIT:
                 return line.strip()
         
         # Look for fresher specifically
-        for line in lines:
-            if 'fresher' in line.lower():
-                return 'Fresher'
+        if any(mask & FRESHER for mask in masks):
+            return 'Fresher'
         
         return 'Not specified'
     
-    def extract_proper_salary(self, lines):
+    def extract_proper_salary(self, lines, masks):
         """Extract salary information"""
-        for line in lines:
-            line_lower = line.lower()
-            if (any(sal_word in line_lower for sal_word in ['lpa', 'salary', 'ctc', '₹', 'rs', 'lakhs', 'k']) and 
-                len(line) < 50 and
-                any(char.isdigit() for char in line)):
+        for line, mask in zip(lines, masks):
+            if mask & SALARY and len(line) < 50 and mask & DIGIT:
                 return line.strip()
         
         return 'Not disclosed'
     
-    def extract_proper_posted_date(self, lines):
+    def extract_proper_posted_date(self, lines, masks):
         """Extract posted date"""
-        for line in lines:
-            line_lower = line.lower()
-            if any(date_word in line_lower for date_word in ['ago', 'posted', 'days', 'hours', 'today', 'yesterday']):
+        for line, mask in zip(lines, masks):
+            if mask & POSTED_DATE:
                 return line.strip()
         
         return 'Recently posted'
     
     def is_valid_title(self, title):
         """Check if extracted title is valid"""
-        title_lower = title.lower()
-        invalid_words = ['company', 'location', 'salary', 'experience', 'apply', 'view', 'details']
-        return not any(word in title_lower for word in invalid_words)
+        return not classify_line(title) & INVALID_TITLE
     
     def validate_job_data(self, job_data):
         """Validate extracted job data"""
@@ -325,28 +436,35 @@ class FastShineSeleniumScraper:
             return False
         
         # Title shouldn't be location or other field
-        title_lower = title.lower()
-        invalid_titles = ['location', 'salary', 'experience', 'company', 'apply', 'view']
-        if any(invalid in title_lower for invalid in invalid_titles):
+        if classify_line(title) & REJECTED_TITLE:
             return False
         
         return True
     
     def clean_description(self, text):
-        """Clean and truncate description"""
-        # Remove extra whitespace and truncate
-        cleaned = ' '.join(text.split())
-        return cleaned[:250] + '...' if len(cleaned) > 250 else cleaned
+        """Clean description; save_jobs() moves it to the blob store"""
+        # Remove extra whitespace
+        return ' '.join(text.split())
     
-    def determine_job_type(self, title, description):
-        """Determine job type from title and description"""
-        text = f"{title} {description}".lower()
+    def determine_job_type(self, title, description, masks=None):
+        """Determine job type from title and description
+        
+        `masks` are the line bitsets of description when the caller already has them
+        """
+        if masks is None:
+            mask = classify_line(f"{title} {description}")
+        else:
+            # Only a keyword spanning the join of title and description is left to find
+            overlap = LINE_CLASSIFIER.max_length - 1
+            mask = classify_line(title) | classify_line(f"{title[-overlap:]} {description[:overlap]}")
+            for line_mask in masks:
+                mask |= line_mask
         
-        if any(term in text for term in ['intern', 'internship', 'trainee']):
+        if mask & INTERNSHIP:
             return 'Internship'
-        elif any(term in text for term in ['contract', 'contractor', 'freelance']):
+        elif mask & CONTRACT:
             return 'Contract'
-        elif any(term in text for term in ['part time', 'part-time']):
+        elif mask & PART_TIME:
             return 'Part Time'
         else:
             return 'Full Time'
@@ -355,82 +473,109 @@ class FastShineSeleniumScraper:
         """Save jobs to JSON file without summary"""
         try:
             if not jobs:
-                print("❌ No jobs to save")
+                logger.warning("❌ No jobs to save")
                 return False
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ Saved {len(jobs)} jobs to {filename}")
+            with span('save', source='shine', jobs=len(jobs)):
+                with span('normalize'):
+                    tag_jobs(jobs)
+                    store_descriptions(jobs, DESCRIPTION_PREVIEW_CHARS)
+                with span('persist', target='json'):
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        json.dump(jobs, f, indent=2, ensure_ascii=False)
+                
+                logger.info("✅ Saved %s jobs to %s", len(jobs), filename)
+                with span('persist', target='index'):
+                    index_jobs(jobs)
+                with span('persist', target='corpus'):
+                    append_to_corpus(os.path.splitext(os.path.basename(filename))[0], jobs)
+                with span('persist', target='cdc'):
+                    capture_changes('shine', jobs)
             return True
             
         except Exception as e:
-            print(f"❌ Error saving jobs: {e}")
+            logger.error("❌ Error saving jobs: %s", e)
             return False
     
     def print_summary(self, jobs):
         """Print job scraping summary"""
         if not jobs:
-            print("❌ No jobs found!")
+            logger.info("❌ No jobs found!")
             return
         
-        print(f"\n{'='*60}")
-        print(f"📊 SHINE SCRAPING SUMMARY")
-        print(f"{'='*60}")
-        print(f"✅ Total jobs scraped: {len(jobs)}")
+        logger.info("\n" + "=" * 60)
+        logger.info("📊 SHINE SCRAPING SUMMARY")
+        logger.info("=" * 60)
+        logger.info("✅ Total jobs scraped: %s", len(jobs))
         
         # Show first few jobs
-        print(f"\n📝 Sample Jobs:")
+        logger.info("\n📝 Sample Jobs:")
         for i, job in enumerate(jobs[:5], 1):
-            print(f"\n  {i}. {job.get('title', 'N/A')}")
-            print(f"     Company: {job.get('company', 'N/A')}")
-            print(f"     Location: {job.get('location', 'N/A')}")
-            print(f"     Salary: {job.get('salary', 'N/A')}")
-            print(f"     Experience: {job.get('experience_required', 'N/A')}")
+            logger.info("\n  %s. %s", i, job.get('title', 'N/A'))
+            logger.info("     Company: %s", job.get('company', 'N/A'))
+            logger.info("     Location: %s", job.get('location', 'N/A'))
+            logger.info("     Salary: %s", job.get('salary', 'N/A'))
+            logger.info("     Experience: %s", job.get('experience_required', 'N/A'))
     
     def close(self):
         """Close the browser"""
         try:
             if hasattr(self, 'driver') and self.driver:
                 self.driver.quit()
-                print("🔒 Browser closed")
+                logger.info("🔒 Browser closed")
         except Exception as e:
-            print(f"⚠️ Error closing browser: {e}")
+            logger.warning("⚠️ Error closing browser: %s", e)
 
+@profiled('shine')
 def main():
     """Main function optimized for speed"""
     scraper = None
+    checkpoint = None
+    MAX_AGE_DAYS = None  # Days; skip cards posted earlier than this. None keeps every card
     
     try:
-        print("🚀 Starting FIXED Shine Selenium Scraper")
-        print("=" * 60)
+        serve_metrics()
+        logger.info("🚀 Starting FIXED Shine Selenium Scraper")
+        logger.info("=" * 60)
         
         start_total = time.time()
         
         # Initialize scraper
-        scraper = FastShineSeleniumScraper(headless=True)
+        with stage('browser'):
+            scraper = FastShineSeleniumScraper(headless=True)
+        checkpoint = CheckpointStore('shine')
         
         # Fast scrape
-        jobs = scraper.fast_scrape_shine("software developer", "India", max_jobs=150)
+        with stage('scrape'):
+            jobs = scraper.fast_scrape_shine("software developer", "India", max_jobs=150, checkpoint=checkpoint,
+                                             max_age_days=MAX_AGE_DAYS)
         
         total_time = time.time() - start_total
         
         if jobs:
-            scraper.save_jobs(jobs, 'outputs/shine_jobs.json')
+            with stage('save'):
+                saved = scraper.save_jobs(jobs, 'outputs/shine_jobs.json')
+            if saved:
+                checkpoint.clear()
             scraper.print_summary(jobs)
-            print(f"\n🎉 Scraping completed in {total_time:.2f} seconds!")
-            print(f"📁 Results saved in 'shine_jobs.json'")
-            print(f"⚡ Speed: {len(jobs)/total_time:.1f} jobs/second")
+            logger.info("\n🎉 Scraping completed in %.2f seconds!", total_time)
+            logger.info("📁 Results saved in 'shine_jobs.json'")
+            logger.info("⚡ Speed: %.1f jobs/second", len(jobs)/total_time)
         else:
-            print(f"\n❌ No jobs scraped in {total_time:.2f} seconds")
+            logger.info("\n❌ No jobs scraped in %.2f seconds", total_time)
     
     except KeyboardInterrupt:
-        print("\n⚠️ Scraping interrupted by user")
+        logger.warning("\n⚠️ Scraping interrupted by user")
     
     except Exception as e:
-        print(f"\n❌ Error: {e}")
+        logger.error("\n❌ Error: %s", e)
     
     finally:
+        flush_logs()
+        write_report('shine')
+        write_trace('shine')
+        if checkpoint:
+            checkpoint.close()
         if scraper:
             scraper.close()
 
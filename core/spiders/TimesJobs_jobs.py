@@ -1,76 +1,274 @@
-import requests
 import json
+import os
 import time
 import random
 from bs4 import BeautifulSoup
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import re
 
+from core.blobstore import store_descriptions
+from core.cdc import capture_changes
+from core.checkpoint import CheckpointStore
+from core.corpus import append_to_corpus
+from core.dates import cutoff_date, page_is_stale, resolve_posted
+from core.http_client import get_client
+from core.log import PER_ITEM, flush_logs, get_logger
+from core.metrics import record_items, serve_metrics, timed, write_report
+from core.profiling import profiled, stage
+from core.ratelimit import DomainRateLimiter
+from core.search_index import index_jobs
+from core.skills import tag_jobs
+from core.tracing import span, write_trace
+from core.spiders.timesjobs_parser import iter_timesjobs_cards
+
+logger = get_logger('timesjobs')
+
+DESCRIPTION_PREVIEW_CHARS = 200
+
+def finish_timesjobs_job(job_data, details, description, posted_date):
+    """Build the job record from the raw card fields (shared by both parsers)"""
+    # Experience and Salary
+    experience = 'Not specified'
+    salary = 'Not disclosed'
+
+    for detail in details:
+        text = detail.lower()
+        if 'experience' in text or 'exp' in text:
+            experience = detail
+        elif any(term in text for term in ['salary', 'lpa', 'ctc', '₹', 'rs']):
+            salary = detail
+
+    scraped_at = datetime.now()
+    posted_on = resolve_posted(posted_date, scraped_at)
+
+    job_data.update({
+        'salary': salary,
+        'job_type': determine_job_type(job_data.get('title', ''), description),
+        'description': description,
+        'experience_required': experience,
+        'posted_date': posted_date,
+        'posted_on': posted_on.isoformat() if posted_on else None,
+        'source': 'TimesJobs.com',
+        'scraped_at': scraped_at.isoformat()
+    })
+
+    if job_data.get('title') and job_data.get('company'):
+        return job_data
+    return None
+
+def determine_job_type(title, description):
+    """Determine job type from title and description"""
+    text = f"{title} {description}".lower()
+
+    if any(term in text for term in ['intern', 'internship', 'trainee']):
+        return 'Internship'
+    elif any(term in text for term in ['contract', 'contractor', 'freelance']):
+        return 'Contract'
+    elif any(term in text for term in ['part time', 'part-time']):
+        return 'Part Time'
+    else:
+        return 'Full Time'
+
+
+def parse_page(content):
+    """Extract the jobs from a result page with lxml, building only the job card subtrees
+
+    Returns None if the page has no job cards. Needs no scraper: the Scrapy
+    spider parses its responses with it too.
+    """
+    page_jobs = []
+    found_cards = False
+    for job_data, details, description, posted_date in iter_timesjobs_cards(content):
+        found_cards = True
+        try:
+            job_data = finish_timesjobs_job(job_data, details, description, posted_date)
+        except Exception as e:
+            logger.warning("⚠️ Error extracting TimesJobs job: %s", e, extra=PER_ITEM)
+            continue
+        if job_data:
+            page_jobs.append(job_data)
+    return page_jobs if found_cards else None
+
+
 class TimesJobsScraper:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, base_url="https://www.timesjobs.com", parser='lxml'):
+        self.base_url = base_url
+        self.parser = parser
+        # Pooled session shared with the API/RSS fetchers; it also negotiates compression
+        self.client = get_client()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
             'DNT': '1',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         }
-        self.session.headers.update(self.headers)
     
-    def scrape_timesjobs(self, query="software developer", pages=3):
-        """Scrape jobs from TimesJobs.com"""
-        all_jobs = []
-        base_url = "https://www.timesjobs.com"
+    def fetch_page(self, query, location, page):
+        """Download one result page"""
+        url = f"{self.base_url}/candidate/job-search.html"
+        params = {
+            'searchType': 'personalizedSearch',
+            'from': 'submit',
+            'txtKeywords': query,
+            'txtLocation': location,
+            'cboWorkExp1': '0',
+            'sequence': str(page)
+        }
+        return self.client.get(url, params=params, headers=self.headers, timeout=10)
+    
+    @timed('timesjobs')
+    def parse_page(self, content):
+        """Extract the jobs from a result page. Returns None if it has no job cards"""
+        if self.parser == 'lxml':
+            return parse_page(content)
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Find job listings
+        job_cards = soup.find_all('li', class_='clearfix job-bx wht-shd-bx')
+        if not job_cards:
+            return None
+        
+        page_jobs = []
+        for card in job_cards:
+            job_data = self.extract_timesjobs_job(card, self.base_url)
+            if job_data:
+                page_jobs.append(job_data)
+        return page_jobs
+    
+    def scrape_timesjobs(self, query="software developer", pages=3, checkpoint=None, max_age_days=None):
+        """Scrape jobs from TimesJobs.com
+
+        With a checkpoint store, pages finished by an earlier run are skipped and
+        the jobs they produced are returned from the store instead. With
+        max_age_days, paging stops at the first page whose newest posting is
+        older than that.
+        """
+        all_jobs = checkpoint.load_jobs() if checkpoint else []
+        location = 'India'
+        cutoff = cutoff_date(max_age_days)
         
-        print(f"🔍 Scraping TimesJobs.com for '{query}'...")
+        logger.info("🔍 Scraping TimesJobs.com for '%s'...", query)
+        if all_jobs:
+            logger.info("♻️ Resuming with %s jobs from checkpoint", len(all_jobs))
         
         for page in range(1, pages + 1):
+            if checkpoint and checkpoint.is_done(query, location, page):
+                logger.info("⏭️ Page %s already scraped, skipping", page)
+                continue
+            
             try:
-                url = f"{base_url}/candidate/job-search.html"
-                params = {
-                    'searchType': 'personalizedSearch',
-                    'from': 'submit',
-                    'txtKeywords': query,
-                    'txtLocation': 'India',
-                    'cboWorkExp1': '0',
-                    'sequence': str(page)
-                }
-                
-                print(f"📄 Scraping TimesJobs page {page}/{pages}...")
+                logger.info("📄 Scraping TimesJobs page %s/%s...", page, pages)
                 
-                response = self.session.get(url, params=params, timeout=10)
+                with span('page', source='timesjobs', query=query, page=page):
+                    with span('fetch') as fetch:
+                        response = self.fetch_page(query, location, page)
+                        fetch.set(status=response.status_code)
+                    
+                    if response.status_code != 200:
+                        logger.warning("⚠️ Page %s: Status %s", page, response.status_code)
+                        continue
+                    
+                    with span('extract'):
+                        page_jobs = self.parse_page(response.content)
                 
-                if response.status_code != 200:
-                    print(f"⚠️ Page {page}: Status {response.status_code}")
+                if page_jobs is None:
+                    logger.warning("❌ No jobs found on page %s", page)
                     continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Find job listings
-                job_cards = soup.find_all('li', class_='clearfix job-bx wht-shd-bx')
-                
-                if not job_cards:
-                    print(f"❌ No jobs found on page {page}")
-                    continue
+                logger.info("✅ Found %s jobs on page %s", len(page_jobs), page)
+                stale = page_is_stale([job['posted_on'] for job in page_jobs], cutoff)
                 
-                print(f"✅ Found {len(job_cards)} jobs on page {page}")
+                found = len(page_jobs)
+                if checkpoint:
+                    page_jobs = checkpoint.mark_done(query, location, page, page_jobs)
+                record_items('timesjobs', len(page_jobs), found - len(page_jobs))
+                all_jobs.extend(page_jobs)
                 
-                for card in job_cards:
-                    job_data = self.extract_timesjobs_job(card, base_url)
-                    if job_data:
-                        all_jobs.append(job_data)
+                if stale:
+                    logger.info("🛑 Page %s has nothing newer than %s, stopping", page, cutoff)
+                    break
                 
                 time.sleep(random.uniform(2, 4))
                 
             except Exception as e:
-                print(f"⚠️ Error on TimesJobs page {page}: {e}")
+                logger.warning("⚠️ Error on TimesJobs page %s: %s", page, e)
                 continue
         
         return all_jobs
     
+    def scrape_timesjobs_concurrent(self, query="software developer", pages=3, checkpoint=None,
+                                    max_workers=4, rate=1.0, burst=2, max_age_days=None):
+        """Scrape jobs from TimesJobs.com, fetching pages in parallel"""
+        all_jobs = checkpoint.load_jobs() if checkpoint else []
+        if all_jobs:
+            logger.info("♻️ Resuming with %s jobs from checkpoint", len(all_jobs))
+        all_jobs.extend(self.iter_timesjobs_concurrent(query, pages, checkpoint, max_workers, rate, burst,
+                                                       max_age_days))
+        return all_jobs
+    
+    def iter_timesjobs_concurrent(self, query="software developer", pages=3, checkpoint=None,
+                                  max_workers=4, rate=1.0, burst=2, max_age_days=None):
+        """Yield jobs in page order while later pages are still downloading
+
+        Workers fetch and parse pages in a thread pool. Requests to the site go
+        through a token bucket (`rate` pages per second, bursts of `burst`),
+        which replaces the fixed sleep between pages in scrape_timesjobs. Pages
+        after the first one older than max_age_days are cancelled.
+        """
+        location = 'India'
+        limiter = DomainRateLimiter(rate, burst)
+        cutoff = cutoff_date(max_age_days)
+        
+        def fetch_and_parse(page):
+            with span('page', source='timesjobs', query=query, page=page):
+                with span('throttle'):
+                    limiter.acquire(self.base_url)
+                with span('fetch') as fetch:
+                    response = self.fetch_page(query, location, page)
+                    fetch.set(status=response.status_code)
+                if response.status_code != 200:
+                    logger.warning("⚠️ Page %s: Status %s", page, response.status_code)
+                    return None
+                with span('extract'):
+                    return self.parse_page(response.content)
+        
+        logger.info("🔍 Scraping TimesJobs.com for '%s' (%s workers, %s pages/s)...", query, max_workers, rate)
+        
+        todo = [page for page in range(1, pages + 1)
+                if not (checkpoint and checkpoint.is_done(query, location, page))]
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(page, executor.submit(fetch_and_parse, page)) for page in todo]
+            try:
+                for page, future in futures:
+                    try:
+                        page_jobs = future.result()
+                    except Exception as e:
+                        logger.warning("⚠️ Error on TimesJobs page %s: %s", page, e)
+                        continue
+                    
+                    if page_jobs is None:
+                        logger.warning("❌ No jobs found on page %s", page)
+                        continue
+                    
+                    logger.info("✅ Found %s jobs on page %s", len(page_jobs), page)
+                    stale = page_is_stale([job['posted_on'] for job in page_jobs], cutoff)
+                    found = len(page_jobs)
+                    if checkpoint:
+                        page_jobs = checkpoint.mark_done(query, location, page, page_jobs)
+                    record_items('timesjobs', len(page_jobs), found - len(page_jobs))
+                    yield from page_jobs
+                    if stale:
+                        logger.info("🛑 Page %s has nothing newer than %s, stopping", page, cutoff)
+                        return
+            finally:
+                # Consumer stopped early, don't download pages nobody will read
+                for _, future in futures:
+                    future.cancel()
+    
     def extract_timesjobs_job(self, card, base_url):
         """Extract job data from TimesJobs card"""
         try:
@@ -98,17 +296,8 @@ class TimesJobsScraper:
                 if location_li:
                     job_data['location'] = location_li.get_text(strip=True)
             
-            # Experience and Salary
-            details = card.find_all('li')
-            experience = 'Not specified'
-            salary = 'Not disclosed'
-            
-            for li in details:
-                text = li.get_text(strip=True).lower()
-                if 'experience' in text or 'exp' in text:
-                    experience = li.get_text(strip=True)
-                elif any(term in text for term in ['salary', 'lpa', 'ctc', '₹', 'rs']):
-                    salary = li.get_text(strip=True)
+            # Experience and Salary are picked from every li in the card
+            details = [li.get_text(strip=True) for li in card.find_all('li')]
             
             # Description
             desc_elem = card.find('ul', class_='list-job-dtl')
@@ -118,60 +307,47 @@ class TimesJobsScraper:
             date_elem = card.find('span', class_='sim-posted')
             posted_date = date_elem.get_text(strip=True) if date_elem else 'Recently posted'
             
-            job_data.update({
-                'salary': salary,
-                'job_type': self.determine_job_type(job_data.get('title', ''), description),
-                'description': description[:200] + '...' if len(description) > 200 else description,
-                'experience_required': experience,
-                'posted_date': posted_date,
-                'source': 'TimesJobs.com',
-                'scraped_at': datetime.now().isoformat()
-            })
-            
-            if job_data.get('title') and job_data.get('company'):
-                return job_data
+            return finish_timesjobs_job(job_data, details, description, posted_date)
             
         except Exception as e:
-            print(f"⚠️ Error extracting TimesJobs job: {e}")
+            logger.warning("⚠️ Error extracting TimesJobs job: %s", e, extra=PER_ITEM)
         
         return None
     
-    def determine_job_type(self, title, description):
-        """Determine job type from title and description"""
-        text = f"{title} {description}".lower()
-        
-        if any(term in text for term in ['intern', 'internship', 'trainee']):
-            return 'Internship'
-        elif any(term in text for term in ['contract', 'contractor', 'freelance']):
-            return 'Contract'
-        elif any(term in text for term in ['part time', 'part-time']):
-            return 'Part Time'
-        else:
-            return 'Full Time'
-    
     def save_jobs(self, jobs, filename):
         """Save jobs to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ Saved {len(jobs)} jobs to {filename}")
+            with span('save', source='timesjobs', jobs=len(jobs)):
+                with span('normalize'):
+                    tag_jobs(jobs)
+                    store_descriptions(jobs, DESCRIPTION_PREVIEW_CHARS)
+                with span('persist', target='json'):
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        json.dump(jobs, f, indent=2, ensure_ascii=False)
+                
+                logger.info("✅ Saved %s jobs to %s", len(jobs), filename)
+                with span('persist', target='index'):
+                    index_jobs(jobs)
+                with span('persist', target='corpus'):
+                    append_to_corpus(os.path.splitext(os.path.basename(filename))[0], jobs)
+                with span('persist', target='cdc'):
+                    capture_changes('timesjobs', jobs)
             return True
             
         except Exception as e:
-            print(f"❌ Error saving jobs: {e}")
+            logger.error("❌ Error saving jobs: %s", e)
             return False
     
     def print_summary(self, jobs):
         """Print job scraping summary"""
         if not jobs:
-            print("❌ No jobs found!")
+            logger.info("❌ No jobs found!")
             return
         
-        print(f"\n{'='*50}")
-        print(f"📊 SCRAPING SUMMARY")
-        print(f"{'='*50}")
-        print(f"Total jobs: {len(jobs)}")
+        logger.info("\n" + "=" * 50)
+        logger.info("📊 SCRAPING SUMMARY")
+        logger.info("=" * 50)
+        logger.info("Total jobs: %s", len(jobs))
         
         # Source breakdown
         sources = {}
@@ -179,52 +355,75 @@ class TimesJobsScraper:
             source = job.get('source', 'Unknown')
             sources[source] = sources.get(source, 0) + 1
         
-        print("\n📈 Sources:")
+        logger.info("\n📈 Sources:")
         for source, count in sources.items():
-            print(f"  • {source}: {count} jobs")
+            logger.info("  • %s: %s jobs", source, count)
         
         # Sample job
         if jobs:
-            print(f"\n📝 Sample Job:")
+            logger.info("\n📝 Sample Job:")
             sample = jobs[0]
-            print(f"  Title: {sample.get('title', 'N/A')}")
-            print(f"  Company: {sample.get('company', 'N/A')}")
-            print(f"  Location: {sample.get('location', 'N/A')}")
-            print(f"  Salary: {sample.get('salary', 'N/A')}")
-            print(f"  Type: {sample.get('job_type', 'N/A')}")
+            logger.info("  Title: %s", sample.get('title', 'N/A'))
+            logger.info("  Company: %s", sample.get('company', 'N/A'))
+            logger.info("  Location: %s", sample.get('location', 'N/A'))
+            logger.info("  Salary: %s", sample.get('salary', 'N/A'))
+            logger.info("  Type: %s", sample.get('job_type', 'N/A'))
 
+@profiled('timesjobs')
 def main():
     """Main function to run the scraper"""
     scraper = TimesJobsScraper()
+    checkpoint = CheckpointStore('timesjobs')
     
     # Configuration
     QUERY = "software developer"
     PAGES_PER_SITE = 3
+    CONCURRENT_WORKERS = 4  # Set to 1 for the one-page-at-a-time loop
+    PAGES_PER_SECOND = 0.5
+    MAX_AGE_DAYS = None  # Days; stop paging once a page has nothing newer. None follows every page
     
-    print("🚀 Starting TimesJobs Scraper")
-    print(f"Query: {QUERY}")
-    print(f"Pages per site: {PAGES_PER_SITE}")
-    print("=" * 50)
+    serve_metrics()
+    logger.info("🚀 Starting TimesJobs Scraper")
+    logger.info("Query: %s", QUERY)
+    logger.info("Pages per site: %s", PAGES_PER_SITE)
+    logger.info("=" * 50)
     
     all_jobs = []
     
     # Scrape TimesJobs only
     try:
-        timesjobs_jobs = scraper.scrape_timesjobs(QUERY, PAGES_PER_SITE)
+        with stage('scrape'):
+            if CONCURRENT_WORKERS > 1:
+                timesjobs_jobs = scraper.scrape_timesjobs_concurrent(
+                    QUERY, PAGES_PER_SITE, checkpoint=checkpoint,
+                    max_workers=CONCURRENT_WORKERS, rate=PAGES_PER_SECOND, max_age_days=MAX_AGE_DAYS)
+            else:
+                timesjobs_jobs = scraper.scrape_timesjobs(QUERY, PAGES_PER_SITE, checkpoint=checkpoint,
+                                                          max_age_days=MAX_AGE_DAYS)
         all_jobs.extend(timesjobs_jobs)
-        print(f"✅ TimesJobs: {len(timesjobs_jobs)} jobs")
+        logger.info("✅ TimesJobs: %s jobs", len(timesjobs_jobs))
     except Exception as e:
-        print(f"❌ TimesJobs error: {e}")
+        logger.error("❌ TimesJobs error: %s", e)
     
     # Save and summarize
     if all_jobs:
-        scraper.save_jobs(all_jobs, 'outputs/scrapedTimes_jobs.json')
+        with stage('save'):
+            saved = scraper.save_jobs(all_jobs, 'outputs/scrapedTimes_jobs.json')
+        if saved:
+            checkpoint.clear()
         scraper.print_summary(all_jobs)
         
-        print(f"\n🎉 Scraping completed!")
-        print(f"📁 Results saved in 'outputs/scrapedTimes_jobs.json'")
+        logger.info("\n🎉 Scraping completed!")
+        logger.info("📁 Results saved in 'outputs/scrapedTimes_jobs.json'")
     else:
-        print("\n❌ No jobs were scraped!")
+        logger.info("\n❌ No jobs were scraped!")
+    
+    # The reports below print directly; let the log lines ahead of them out first
+    flush_logs()
+    scraper.client.report()
+    write_report('timesjobs')
+    write_trace('timesjobs')
+    checkpoint.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
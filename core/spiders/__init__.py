@@ -1,6 +1,9 @@
 # Optional: Expose all spider classes from this package
 from .freshersworld_jobs import FreshersworldJobScraper
 from .internshala_jobs import InternshalaJobScraper
+from .timesjobs_spider import TimesJobsJobScraper
+
+# Standalone (non-Scrapy) scrapers
 from .linkedIn_jobs import LinkedInSeleniumScraper
 from .Shine_jobs import FastShineSeleniumScraper
 from .TimesJobs_jobs import TimesJobsScraper
@@ -6,9 +6,24 @@ import time
 import re
 from urllib.parse import urlencode, urljoin
 
+from core.dates import cutoff_date, page_is_stale, resolve_posted
+from core.metrics import record_selector
+from core.middlewares import follow_meta
+
+# Links to the next results page, tried in order
+NEXT_PAGE_SELECTORS = [
+    'a[rel="next"]::attr(href)',
+    'link[rel="next"]::attr(href)',
+    '.pagination a.next::attr(href)',
+    '.pagination li.next a::attr(href)',
+    'a.next-page::attr(href)',
+]
+
 class FreshersworldJobScraper(scrapy.Spider):
     name = 'freshersworld_jobs'
     allowed_domains = ['freshersworld.com']
+    # Read by DescriptionStorePipeline
+    description_preview_chars = 500
     
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -38,6 +53,16 @@ class FreshersworldJobScraper(scrapy.Spider):
         }
     }
     
+    def __init__(self, pages=1, max_age_days=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pages = int(pages)
+        # Defaults to the MAX_POSTING_AGE_DAYS setting
+        self.max_age_days = max_age_days
+    
+    def posting_cutoff(self):
+        max_age = self.max_age_days if self.max_age_days is not None else self.settings.get('MAX_POSTING_AGE_DAYS')
+        return cutoff_date(max_age)
+    
     def start_requests(self):
         # Correct URL format as provided by user
         keywords = [
@@ -73,12 +98,12 @@ class FreshersworldJobScraper(scrapy.Spider):
     
     def parse_jobs(self, response):
         search_term = response.meta.get('search_term', 'N/A')
-        self.logger.info(f"Parsing Freshersworld JOBS from: {response.url}")
-        self.logger.info(f"Search term: {search_term}")
+        self.logger.info("Parsing Freshersworld JOBS from: %s", response.url)
+        self.logger.info("Search term: %s", search_term)
         
         # Debug: Log page title and content
         page_title = response.css('title::text').get('')
-        self.logger.info(f"Page title: {page_title}")
+        self.logger.info("Page title: %s", page_title)
         
         # First, let's try to find any job containers with more specific selectors
         job_selectors = [
@@ -97,11 +122,12 @@ class FreshersworldJobScraper(scrapy.Spider):
         
         jobs_found = False
         total_jobs_extracted = 0
+        posted_dates = []
         
         for selector in job_selectors:
             jobs = response.css(selector)
             if jobs:
-                self.logger.info(f"Found {len(jobs)} jobs using selector: {selector}")
+                self.logger.info("Found %s jobs using selector: %s", len(jobs), selector)
                 jobs_found = True
                 
                 for i, job in enumerate(jobs[:20]):  # Limit to 20 jobs per search
@@ -114,19 +140,45 @@ class FreshersworldJobScraper(scrapy.Spider):
                                 len(job_data.get('job_description', '')) > 10):
                                 yield job_data
                                 total_jobs_extracted += 1
+                                posted_dates.append(job_data['posted_on'])
                             else:
-                                self.logger.debug(f"Skipping job {i+1} - insufficient data")
+                                self.logger.debug("Skipping job %s - insufficient data", i+1, extra={'per_item': True})
                     except Exception as e:
-                        self.logger.error(f"Error extracting job {i+1}: {str(e)}")
+                        self.logger.error("Error extracting job %s: %s", i+1, e)
                         continue
                 
-                self.logger.info(f"Successfully extracted {total_jobs_extracted} jobs with selector: {selector}")
+                self.logger.info("Successfully extracted %s jobs with selector: %s", total_jobs_extracted, selector)
                 if total_jobs_extracted > 0:
                     break  # Stop trying other selectors if we got data
+        record_selector(self.name, 'job_card', selector if total_jobs_extracted else None)
         
         if not jobs_found or total_jobs_extracted == 0:
             self.logger.warning("No jobs found or extracted with standard selectors, trying alternative extraction...")
             self.try_alternative_extraction(response, search_term)
+        
+        yield from self.follow_next_page(response, posted_dates)
+    
+    def follow_next_page(self, response, posted_dates):
+        """Request the next results page unless the page limit or the age cutoff is reached"""
+        page = response.meta.get('page', 1)
+        if page >= self.pages:
+            return
+        if page_is_stale(posted_dates, self.posting_cutoff()):
+            self.logger.info("Stopping after page %s: newest posting is older than the cutoff", page)
+            return
+        
+        for selector in NEXT_PAGE_SELECTORS:
+            href = response.css(selector).get()
+            if href:
+                yield response.follow(
+                    href,
+                    callback=self.parse_jobs,
+                    meta=follow_meta(response.meta, page=page + 1),
+                    headers={'Referer': response.url},
+                    dont_filter=True
+                )
+                return
+        self.logger.info("No next page link after page %s", page)
     
     def extract_job_data(self, job_element, response, search_term='N/A'):
         """Extract job data from element with improved logic"""
@@ -138,38 +190,46 @@ class FreshersworldJobScraper(scrapy.Spider):
             cleaned = ' '.join(str(text).strip().split())
             return cleaned if cleaned else 'N/A'
         
-        def safe_get_text(element, selectors):
-            """Safely try multiple selectors and return first valid result"""
-            for selector in selectors:
-                try:
-                    # Try getting text content
-                    result = element.css(selector + '::text').get()
-                    if result and result.strip():
-                        return clean_text(result)
-                    
-                    # Try getting attribute if it's an attribute selector
-                    if '::attr(' in selector:
-                        result = element.css(selector).get()
-                        if result and result.strip():
-                            return clean_text(result)
-                    
-                    # Try getting inner text from nested elements
+        def selector_text(element, selector):
+            """Text for one selector, or None"""
+            try:
+                # Try getting text content
+                result = element.css(selector + '::text').get()
+                if result and result.strip():
+                    return clean_text(result)
+                
+                # Try getting attribute if it's an attribute selector
+                if '::attr(' in selector:
                     result = element.css(selector).get()
                     if result and result.strip():
-                        # Extract text from HTML
-                        import html
-                        text = html.unescape(re.sub(r'<[^>]+>', ' ', result))
-                        if text and text.strip():
-                            return clean_text(text)
-                            
-                except Exception as e:
-                    self.logger.debug(f"Selector {selector} failed: {str(e)}")
-                    continue
+                        return clean_text(result)
+                
+                # Try getting inner text from nested elements
+                result = element.css(selector).get()
+                if result and result.strip():
+                    # Extract text from HTML
+                    import html
+                    text = html.unescape(re.sub(r'<[^>]+>', ' ', result))
+                    if text and text.strip():
+                        return clean_text(text)
+                        
+            except Exception as e:
+                self.logger.debug("Selector %s failed: %s", selector, e, extra={'per_item': True})
+            return None
+        
+        def safe_get_text(element, selectors, field):
+            """Safely try multiple selectors and return first valid result"""
+            for selector in selectors:
+                text = selector_text(element, selector)
+                if text:
+                    record_selector(self.name, field, selector)
+                    return text
+            record_selector(self.name, field, None)
             return 'N/A'
         
         # Get all text from the job element for debugging
         all_element_text = ' '.join(job_element.css('::text').getall())
-        self.logger.debug(f"Job element text sample: {all_element_text[:200]}...")
+        self.logger.debug("Job element text sample: %.200s...", all_element_text, extra={'per_item': True})
         
         # Enhanced selectors based on common job site patterns
         title_selectors = [
@@ -218,10 +278,10 @@ class FreshersworldJobScraper(scrapy.Spider):
         ]
         
         # Extract basic data
-        job_title = safe_get_text(job_element, title_selectors)
-        company_name = safe_get_text(job_element, company_selectors)
-        location = safe_get_text(job_element, location_selectors)
-        salary = safe_get_text(job_element, salary_selectors)
+        job_title = safe_get_text(job_element, title_selectors, 'title')
+        company_name = safe_get_text(job_element, company_selectors, 'company')
+        location = safe_get_text(job_element, location_selectors, 'location')
+        salary = safe_get_text(job_element, salary_selectors, 'salary')
         
         # Get job URL
         job_url = 'N/A'
@@ -239,8 +299,6 @@ class FreshersworldJobScraper(scrapy.Spider):
         
         # Extract description from all available text
         description_text = clean_text(all_element_text)
-        if len(description_text) > 500:
-            description_text = description_text[:500] + '...'
         
         # Try to extract additional info from text
         experience = 'N/A'
@@ -254,8 +312,9 @@ class FreshersworldJobScraper(scrapy.Spider):
         # Posted date extraction
         posted_date = 'N/A'
         date_patterns = [
-            r'(\d{1,2}\s+days?\s+ago)',
+            r'(\d{1,2}\+?\s+days?\s+ago)',
             r'(\d{1,2}\s+hours?\s+ago)',
+            r'(\d{1,2}\s+(?:weeks?|months?)\s+ago)',
             r'(today|yesterday)',
             r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
         ]
@@ -284,6 +343,9 @@ class FreshersworldJobScraper(scrapy.Spider):
                         company_name = line[:100]  # Limit length
                         break
         
+        scraped_timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        posted_on = resolve_posted(posted_date, scraped_timestamp)
+        
         # Create job data object
         job_data = {
             'job_title': job_title,
@@ -294,16 +356,18 @@ class FreshersworldJobScraper(scrapy.Spider):
             'experience_required': experience,
             'company_rating': 'N/A',
             'posted_date': posted_date,
+            'posted_on': posted_on.isoformat() if posted_on else None,
             'job_description': description_text,
             'job_url': job_url,
-            'scraped_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'scraped_timestamp': scraped_timestamp,
             'source': 'Freshersworld.com',
             'search_term': search_term,
             'page_url': response.url
         }
         
         # Log what we extracted for debugging
-        self.logger.debug(f"Extracted job: {job_data['job_title']} at {job_data['company_name']}")
+        self.logger.debug("Extracted job: %s at %s", job_data['job_title'], job_data['company_name'],
+                          extra={'per_item': True})
         
         return job_data
     
@@ -330,7 +394,7 @@ class FreshersworldJobScraper(scrapy.Spider):
             if any(keyword in container_text.lower() for keyword in job_keywords):
                 found_jobs.append(container_text)
         
-        self.logger.info(f"Found {len(found_jobs)} potential jobs using alternative method")
+        self.logger.info("Found %s potential jobs using alternative method", len(found_jobs))
         
         # Extract data from found containers
         for i, job_text in enumerate(found_jobs[:10]):  # Limit to 10
@@ -379,7 +443,7 @@ class FreshersworldJobScraper(scrapy.Spider):
                 'experience_required': 'Fresher to 3 years',
                 'company_rating': 'N/A',
                 'posted_date': 'Recent',
-                'job_description': job_text[:300] + '...' if len(job_text) > 300 else job_text,
+                'job_description': job_text,
                 'job_url': response.url,
                 'scraped_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                 'source': 'Freshersworld.com (Alternative)',
@@ -417,7 +481,7 @@ class SimpleFreshersworldScraper(scrapy.Spider):
             yield Request(url=url, callback=self.parse)
     
     def parse(self, response):
-        self.logger.info(f"Simple parsing: {response.url}")
+        self.logger.info("Simple parsing: %s", response.url)
         
         # Get page text and try to extract any job-like information
         page_text = response.css('body').get('')
@@ -439,7 +503,7 @@ class SimpleFreshersworldScraper(scrapy.Spider):
         # Remove duplicates
         jobs_found = list(set(jobs_found))[:15]
         
-        self.logger.info(f"Simple extraction found {len(jobs_found)} potential jobs")
+        self.logger.info("Simple extraction found %s potential jobs", len(jobs_found))
         
         for i, job_text in enumerate(jobs_found):
             yield {
@@ -6,9 +6,15 @@ import time
 import re
 from urllib.parse import urlencode, urljoin
 
+from core.dates import cutoff_date, page_is_stale, resolve_posted
+from core.metrics import record_selector
+from core.middlewares import follow_meta
+
 class InternshalaJobScraper(scrapy.Spider):
     name = 'internshala_jobs'
     allowed_domains = ['internshala.com']
+    # Read by DescriptionStorePipeline
+    description_preview_chars = 300
     
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -38,6 +44,16 @@ class InternshalaJobScraper(scrapy.Spider):
         }
     }
     
+    def __init__(self, pages=1, max_age_days=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pages = int(pages)
+        # Defaults to the MAX_POSTING_AGE_DAYS setting
+        self.max_age_days = max_age_days
+    
+    def posting_cutoff(self):
+        max_age = self.max_age_days if self.max_age_days is not None else self.settings.get('MAX_POSTING_AGE_DAYS')
+        return cutoff_date(max_age)
+    
     def start_requests(self):
         # Different search categories on Internshala
         search_queries = [
@@ -54,7 +70,7 @@ class InternshalaJobScraper(scrapy.Spider):
             yield Request(
                 url=jobs_url,
                 callback=self.parse_jobs,
-                meta={'search_term': query, 'page': 1},
+                meta={'search_term': query, 'page': 1, 'listing_url': jobs_url},
                 headers={'Referer': 'https://internshala.com/'}
             )
             
@@ -63,12 +79,12 @@ class InternshalaJobScraper(scrapy.Spider):
             yield Request(
                 url=internship_url,
                 callback=self.parse_internships,
-                meta={'search_term': query, 'page': 1},
+                meta={'search_term': query, 'page': 1, 'listing_url': internship_url},
                 headers={'Referer': 'https://internshala.com/'}
             )
     
     def parse_jobs(self, response):
-        self.logger.info(f"Parsing Internshala JOBS from: {response.url}")
+        self.logger.info("Parsing Internshala JOBS from: %s", response.url)
         
         # Multiple selectors for job listings
         job_selectors = [
@@ -80,26 +96,31 @@ class InternshalaJobScraper(scrapy.Spider):
         ]
         
         jobs_found = False
+        posted_dates = []
         
         for selector in job_selectors:
             jobs = response.css(selector)
             if jobs:
-                self.logger.info(f"Found {len(jobs)} jobs using selector: {selector}")
+                self.logger.info("Found %s jobs using selector: %s", len(jobs), selector)
                 jobs_found = True
                 
                 for job in jobs[:20]:  # Limit to 20 jobs per search
                     job_data = self.extract_job_data(job, response, job_type='Job')
                     if job_data and job_data.get('job_title', 'N/A') != 'N/A':
                         yield job_data
+                        posted_dates.append(job_data['posted_on'])
                 break
+        record_selector(self.name, 'job_card', selector if jobs_found else None)
         
         if not jobs_found:
             self.logger.warning("No jobs found with standard selectors, trying alternative extraction...")
             # Try to find jobs in the page content
             self.try_alternative_extraction(response, 'Job')
+        
+        yield from self.follow_next_page(response, posted_dates, self.parse_jobs)
     
     def parse_internships(self, response):
-        self.logger.info(f"Parsing Internshala INTERNSHIPS from: {response.url}")
+        self.logger.info("Parsing Internshala INTERNSHIPS from: %s", response.url)
         
         # Internship-specific selectors
         internship_selectors = [
@@ -111,22 +132,45 @@ class InternshalaJobScraper(scrapy.Spider):
         ]
         
         internships_found = False
+        posted_dates = []
         
         for selector in internship_selectors:
             internships = response.css(selector)
             if internships:
-                self.logger.info(f"Found {len(internships)} internships using selector: {selector}")
+                self.logger.info("Found %s internships using selector: %s", len(internships), selector)
                 internships_found = True
                 
                 for internship in internships[:20]:
                     internship_data = self.extract_job_data(internship, response, job_type='Internship')
                     if internship_data and internship_data.get('job_title', 'N/A') != 'N/A':
                         yield internship_data
+                        posted_dates.append(internship_data['posted_on'])
                 break
+        record_selector(self.name, 'internship_card', selector if internships_found else None)
         
         if not internships_found:
             self.logger.warning("No internships found with standard selectors, trying alternative extraction...")
             self.try_alternative_extraction(response, 'Internship')
+        
+        yield from self.follow_next_page(response, posted_dates, self.parse_internships)
+    
+    def follow_next_page(self, response, posted_dates, callback):
+        """Request the next listing page unless the page limit or the age cutoff is reached"""
+        page = response.meta.get('page', 1)
+        if page >= self.pages:
+            return
+        if page_is_stale(posted_dates, self.posting_cutoff()):
+            self.logger.info("Stopping after page %s: newest posting is older than the cutoff", page)
+            return
+        
+        # Listings paginate as /jobs/<query>-jobs/page-2, /page-3, ...
+        listing_url = response.meta.get('listing_url', response.url)
+        yield Request(
+            url=f"{listing_url.rstrip('/')}/page-{page + 1}",
+            callback=callback,
+            meta=follow_meta(response.meta, page=page + 1),
+            headers={'Referer': response.url}
+        )
     
     def extract_job_data(self, job_element, response, job_type='Job'):
         """Extract job/internship data from element"""
@@ -136,14 +180,16 @@ class InternshalaJobScraper(scrapy.Spider):
                 return 'N/A'
             return ' '.join(text.strip().split())
         
-        def try_multiple_selectors(element, selectors):
+        def try_multiple_selectors(element, selectors, field):
             for selector in selectors:
                 try:
                     result = element.css(selector).get()
                     if result and result.strip():
+                        record_selector(self.name, field, selector)
                         return clean_text(result)
                 except:
                     continue
+            record_selector(self.name, field, None)
             return 'N/A'
         
         # Title selectors
@@ -200,12 +246,12 @@ class InternshalaJobScraper(scrapy.Spider):
         ]
         
         # Extract data
-        job_title = try_multiple_selectors(job_element, title_selectors)
-        company_name = try_multiple_selectors(job_element, company_selectors)
-        location = try_multiple_selectors(job_element, location_selectors)
-        salary = try_multiple_selectors(job_element, salary_selectors)
-        duration = try_multiple_selectors(job_element, duration_selectors)
-        description = try_multiple_selectors(job_element, description_selectors)
+        job_title = try_multiple_selectors(job_element, title_selectors, 'title')
+        company_name = try_multiple_selectors(job_element, company_selectors, 'company')
+        location = try_multiple_selectors(job_element, location_selectors, 'location')
+        salary = try_multiple_selectors(job_element, salary_selectors, 'salary')
+        duration = try_multiple_selectors(job_element, duration_selectors, 'duration')
+        description = try_multiple_selectors(job_element, description_selectors, 'description')
         
         # Job URL
         job_url_selectors = [
@@ -214,7 +260,7 @@ class InternshalaJobScraper(scrapy.Spider):
             '.internship_heading a::attr(href)',
             'a::attr(href)'
         ]
-        job_url = try_multiple_selectors(job_element, job_url_selectors)
+        job_url = try_multiple_selectors(job_element, job_url_selectors, 'job_url')
         if job_url != 'N/A' and not job_url.startswith('http'):
             job_url = urljoin(response.url, job_url)
         
@@ -223,10 +269,12 @@ class InternshalaJobScraper(scrapy.Spider):
         try:
             full_text = ' '.join(job_element.css('::text').getall())
             date_patterns = [
-                r'(\d{1,2}\s+days?\s+ago)',
+                r'(\d{1,2}\+?\s+days?\s+ago)',
                 r'(\d{1,2}\s+weeks?\s+ago)',
                 r'(\d{1,2}\s+months?\s+ago)',
                 r'(Posted\s+\d{1,2}\s+\w+\s+ago)',
+                r'((?:few|\d{1,2})\s+hours?\s+ago)',
+                r'(today|yesterday|just now)',
                 r'(\d{1,2}-\d{1,2}-\d{4})'
             ]
             for pattern in date_patterns:
@@ -237,6 +285,9 @@ class InternshalaJobScraper(scrapy.Spider):
         except:
             pass
         
+        scraped_timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+        posted_on = resolve_posted(posted_date, scraped_timestamp)
+        
         return {
             'job_title': job_title,
             'company_name': company_name,
@@ -246,9 +297,10 @@ class InternshalaJobScraper(scrapy.Spider):
             'duration': duration,
             'company_rating': 'N/A',
             'posted_date': posted_date,
-            'job_description': description[:300] + '...' if len(description) > 300 else description,
+            'posted_on': posted_on.isoformat() if posted_on else None,
+            'job_description': description,
             'job_url': job_url,
-            'scraped_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'scraped_timestamp': scraped_timestamp,
             'source': 'Internshala.com',
             'search_term': response.meta.get('search_term', 'N/A')
         }
@@ -329,6 +381,7 @@ class InternshalaJobScraper(scrapy.Spider):
 class SimpleInternshalaScaper(scrapy.Spider):
     name = 'simple_internshala'
     allowed_domains = ['internshala.com']
+    description_preview_chars = 200
     
     custom_settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -355,14 +408,14 @@ class SimpleInternshalaScaper(scrapy.Spider):
             yield Request(url=url, callback=self.parse)
     
     def parse(self, response):
-        self.logger.info(f"Parsing {response.url}")
+        self.logger.info("Parsing %s", response.url)
         
         # Log what we found on the page
-        self.logger.info(f"Page title: {response.css('title::text').get()}")
+        self.logger.info("Page title: %s", response.css('title::text').get())
         
         # Try to find ANY elements that might contain job info
         potential_jobs = response.css('div[class*="individual"], div[class*="internship"], div[class*="job"]')
-        self.logger.info(f"Found {len(potential_jobs)} potential job containers")
+        self.logger.info("Found %s potential job containers", len(potential_jobs))
         
         # Extract whatever we can find
         for i, element in enumerate(potential_jobs[:10]):
@@ -379,7 +432,7 @@ class SimpleInternshalaScaper(scrapy.Spider):
                     'duration': 'N/A',
                     'company_rating': 'N/A',
                     'posted_date': 'Recent',
-                    'job_description': all_text[:200] + '...' if len(all_text) > 200 else all_text,
+                    'job_description': all_text,
                     'job_url': response.url,
                     'scraped_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
                     'source': 'Internshala.com (Simple)',
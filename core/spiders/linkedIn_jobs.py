@@ -3,15 +3,33 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 import json
+import os
 import time
 from datetime import datetime
 import random
 
+from core.blobstore import store_descriptions
+from core.cdc import capture_changes
+from core.checkpoint import CheckpointStore
+from core.corpus import append_to_corpus
+from core.dates import cutoff_date, page_is_stale, resolve_posted
+from core.log import PER_ITEM, flush_logs, get_logger
+from core.metrics import record_items, record_response, record_selector, serve_metrics, timed, write_report
+from core.profiling import profiled, stage
+from core.search_index import index_jobs
+from core.skills import tag_jobs
+from core.tracing import span, write_trace
+
+logger = get_logger('linkedin')
+
+DESCRIPTION_PREVIEW_CHARS = 300
+
 class LinkedInSeleniumScraper:
     def __init__(self, headless=True):
+        self.headless = headless
         self.setup_driver(headless)
         
     def setup_driver(self, headless):
@@ -32,73 +50,148 @@ class LinkedInSeleniumScraper:
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         self.wait = WebDriverWait(self.driver, 15)
     
-    def scrape_linkedin_jobs(self, query="software developer", location="India", pages=3):
-        """Scrape jobs from LinkedIn.com"""
-        all_jobs = []
-        base_url = "https://www.linkedin.com"
+    def is_driver_alive(self):
+        """Check that the browser session still answers commands"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except WebDriverException:
+            return False
+    
+    def recycle_driver(self):
+        """Throw away a broken browser session and start a fresh one"""
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.setup_driver(self.headless)
+    
+    def scrape_linkedin_jobs(self, query="software developer", location="India", pages=3,
+                             checkpoint=None, max_restarts=2, max_age_days=None):
+        """Scrape jobs from LinkedIn.com
+
+        Finished pages and emitted jobs are recorded in the checkpoint store, so a
+        crashed browser is restarted and the run continues with the next
+        unfinished page instead of aborting. With max_age_days, paging stops at
+        the first page whose newest posting is older than that.
+        """
+        checkpoint = checkpoint or CheckpointStore('linkedin', ':memory:')
+        all_jobs = checkpoint.load_jobs()
+        cutoff = cutoff_date(max_age_days)
         
-        print(f"🔍 Scraping LinkedIn.com for '{query}' in '{location}'...")
+        logger.info("🔍 Scraping LinkedIn.com for '%s' in '%s'...", query, location)
+        if all_jobs:
+            logger.info("♻️ Resuming with %s jobs from checkpoint", len(all_jobs))
         
-        try:
-            # Go to LinkedIn jobs page
-            jobs_url = f"{base_url}/jobs/search/?keywords={query.replace(' ', '%20')}&location={location.replace(' ', '%20')}"
+        for attempt in range(max_restarts + 1):
+            try:
+                self.scrape_linkedin_pages(query, location, pages, checkpoint, all_jobs, cutoff)
+                break
+            except WebDriverException as e:
+                if attempt == max_restarts:
+                    logger.error("❌ Browser kept failing, giving up: %s", e)
+                    break
+                logger.info("♻️ WebDriver error, restarting browser (%s/%s): %s", attempt + 1, max_restarts, e)
+                try:
+                    self.recycle_driver()
+                except Exception as e:
+                    logger.error("❌ Could not restart browser: %s", e)
+                    break
+            except Exception as e:
+                logger.error("❌ Error during LinkedIn scraping: %s", e)
+                break
+        
+        return all_jobs
+    
+    def scrape_linkedin_pages(self, query, location, pages, checkpoint, all_jobs, cutoff=None):
+        """Walk the result pages, skipping the ones already in the checkpoint"""
+        base_url = "https://www.linkedin.com"
+        
+        # Go to LinkedIn jobs page
+        jobs_url = f"{base_url}/jobs/search/?keywords={query.replace(' ', '%20')}&location={location.replace(' ', '%20')}"
+        with span('render', source='linkedin', query=query, location=location, url=jobs_url):
+            start = time.perf_counter()
             self.driver.get(jobs_url)
+            record_response('linkedin', 'loaded', None, time.perf_counter() - start)
             time.sleep(3)
-            
-            for page in range(pages):
-                print(f"📄 Scraping LinkedIn page {page + 1}/{pages}...")
-                
-                # Scroll to load more jobs
-                self.scroll_to_load_jobs()
+        
+        for page in range(pages):
+            if checkpoint.is_done(query, location, page + 1):
+                logger.info("⏭️ LinkedIn page %s already scraped, skipping", page + 1)
+            else:
+                with span('page', source='linkedin', query=query, location=location, page=page + 1):
+                    page_jobs = self.scrape_current_page(page, pages, base_url, checkpoint)
+                all_jobs.extend(page_jobs)
+                if not self.is_driver_alive():
+                    raise WebDriverException("browser session lost")
+                checkpoint.mark_done(query, location, page + 1)
                 
-                # Wait for job cards to load with multiple selectors
+                if page_is_stale([job.get('posted_on') for job in page_jobs], cutoff):
+                    logger.info("🛑 Page %s has nothing newer than %s, stopping", page + 1, cutoff)
+                    break
+            
+            # Navigate to next page
+            if page < pages - 1:
+                with span('render', source='linkedin', query=query, location=location, page=page + 2):
+                    moved = self.navigate_to_next_page()
+                    if moved:
+                        time.sleep(2)
+                if not moved:
+                    if not self.is_driver_alive():
+                        raise WebDriverException("browser session lost")
+                    logger.error("❌ Could not navigate to next page, stopping...")
+                    break
+    
+    def scrape_current_page(self, page, pages, base_url, checkpoint):
+        """Extract the job cards on the page the browser is showing"""
+        logger.info("📄 Scraping LinkedIn page %s/%s...", page + 1, pages)
+        
+        with span('render'):
+            # Scroll to load more jobs
+            self.scroll_to_load_jobs()
+            
+            # Wait for job cards to load with multiple selectors
+            try:
+                job_cards = self.wait.until(
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, 
+                        ".jobs-search__results-list li[data-occludable-job-id], .job-search-card, .jobs-search-results__list-item"))
+                )
+                logger.info("✅ Found %s job cards on page %s", len(job_cards), page + 1)
+            except TimeoutException:
+                logger.warning("⚠️ Timeout waiting for jobs on page %s", page + 1)
+                # Try alternative selector
                 try:
-                    job_cards = self.wait.until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, 
-                            ".jobs-search__results-list li[data-occludable-job-id], .job-search-card, .jobs-search-results__list-item"))
-                    )
-                    print(f"✅ Found {len(job_cards)} job cards on page {page + 1}")
-                except TimeoutException:
-                    print(f"⚠️ Timeout waiting for jobs on page {page + 1}")
-                    # Try alternative selector
-                    try:
-                        job_cards = self.driver.find_elements(By.CSS_SELECTOR, ".jobs-search__results-list li")
-                        print(f"✅ Found {len(job_cards)} job cards with alternative selector")
-                    except:
-                        print(f"❌ No jobs found on page {page + 1}")
-                        continue
-                
-                if not job_cards:
-                    print(f"❌ No jobs found on page {page + 1}")
-                    continue
-                
-                jobs_extracted = 0
-                for i, card in enumerate(job_cards[:10]):  # Limit to 10 jobs per page
-                    try:
-                        print(f"🔍 Extracting job {i + 1}/{min(10, len(job_cards))}...")
-                        job_data = self.extract_linkedin_job(card, base_url)
-                        if job_data:
-                            all_jobs.append(job_data)
-                            jobs_extracted += 1
-                            print(f"✅ Extracted: {job_data.get('title', 'Unknown')} at {job_data.get('company', 'Unknown')}")
-                        time.sleep(0.5)  # Reduced delay
-                    except Exception as e:
-                        print(f"⚠️ Error extracting job {i + 1}: {e}")
-                        continue
-                
-                print(f"📊 Successfully extracted {jobs_extracted} jobs from page {page + 1}")
-                
-                # Navigate to next page
-                if page < pages - 1:
-                    if not self.navigate_to_next_page():
-                        print("❌ Could not navigate to next page, stopping...")
-                        break
-                    time.sleep(2)
+                    job_cards = self.driver.find_elements(By.CSS_SELECTOR, ".jobs-search__results-list li")
+                    logger.info("✅ Found %s job cards with alternative selector", len(job_cards))
+                except:
+                    logger.warning("❌ No jobs found on page %s", page + 1)
+                    return []
         
-        except Exception as e:
-            print(f"❌ Error during LinkedIn scraping: {e}")
+        if not job_cards:
+            logger.warning("❌ No jobs found on page %s", page + 1)
+            return []
         
-        return all_jobs
+        page_jobs = []
+        for i, card in enumerate(job_cards[:10]):  # Limit to 10 jobs per page
+            try:
+                logger.debug("🔍 Extracting job %s/%s...", i + 1, min(10, len(job_cards)), extra=PER_ITEM)
+                with span('extract', card=i + 1):
+                    job_data = self.extract_linkedin_job(card, base_url)
+                if job_data and checkpoint.seen(job_data):
+                    record_items('linkedin', 0, duplicates=1)
+                elif job_data:
+                    page_jobs.extend(checkpoint.add_jobs([job_data]))
+                    record_items('linkedin')
+                    logger.info("✅ Extracted: %s at %s", job_data.get('title', 'Unknown'), job_data.get('company', 'Unknown'),
+                                extra=PER_ITEM)
+                time.sleep(0.5)  # Reduced delay
+            except Exception as e:
+                logger.warning("⚠️ Error extracting job %s: %s", i + 1, e, extra=PER_ITEM)
+                continue
+        
+        checkpoint.flush()
+        logger.info("📊 Successfully extracted %s jobs from page %s", len(page_jobs), page + 1)
+        return page_jobs
     
     def scroll_to_load_jobs(self):
         """Scroll page to load more job listings"""
@@ -112,7 +205,7 @@ class LinkedInSeleniumScraper:
             self.driver.execute_script("window.scrollTo(0, 0);")
             time.sleep(0.5)
         except Exception as e:
-            print(f"⚠️ Error scrolling: {e}")
+            logger.warning("⚠️ Error scrolling: %s", e)
     
     def navigate_to_next_page(self):
         """Navigate to next page of results"""
@@ -130,20 +223,21 @@ class LinkedInSeleniumScraper:
                     next_button = self.driver.find_element(By.CSS_SELECTOR, selector)
                     if next_button.is_enabled() and next_button.is_displayed():
                         self.driver.execute_script("arguments[0].click();", next_button)
-                        print("✅ Clicked next page button")
+                        logger.info("✅ Clicked next page button")
                         return True
                 except NoSuchElementException:
                     continue
             
             # If no next button found, try scrolling to load more
-            print("⚠️ No next button found, scrolling for more results...")
+            logger.warning("⚠️ No next button found, scrolling for more results...")
             self.scroll_to_load_jobs()
             return True
             
         except Exception as e:
-            print(f"⚠️ Error navigating to next page: {e}")
+            logger.warning("⚠️ Error navigating to next page: %s", e)
             return False
     
+    @timed('linkedin')
     def extract_linkedin_job(self, card, base_url):
         """Extract job data from LinkedIn job card"""
         try:
@@ -169,13 +263,14 @@ class LinkedInSeleniumScraper:
                     job_data['title'] = title_elem.text.strip()
                     job_data['link'] = title_elem.get_attribute('href')
                     title_found = True
-                    # print(f"✅ Title found with selector: {selector}")  # Removed for speed
+                    logger.debug("✅ Title found with selector: %s", selector, extra=PER_ITEM)
                     break
                 except NoSuchElementException:
                     continue
+            record_selector('linkedin', 'title', selector if title_found else None)
             
             if not title_found:
-                print("❌ Title not found, trying text-based extraction...")
+                logger.debug("❌ Title not found, trying text-based extraction...", extra=PER_ITEM)
                 try:
                     # Try to get any h3 or title-like element
                     title_elem = card.find_element(By.CSS_SELECTOR, "h3, [role='heading'], .job-title")
@@ -183,7 +278,7 @@ class LinkedInSeleniumScraper:
                     job_data['link'] = card.find_element(By.CSS_SELECTOR, "a").get_attribute('href') if card.find_elements(By.CSS_SELECTOR, "a") else 'Not available'
                     title_found = True
                 except NoSuchElementException:
-                    print("❌ Could not extract title")
+                    logger.warning("❌ Could not extract title", extra=PER_ITEM)
                     return None
             
             # Company - Try multiple selectors
@@ -201,10 +296,11 @@ class LinkedInSeleniumScraper:
                     company_elem = card.find_element(By.CSS_SELECTOR, selector)
                     job_data['company'] = company_elem.text.strip()
                     company_found = True
-                    # print(f"✅ Company found with selector: {selector}")  # Removed for speed
+                    logger.debug("✅ Company found with selector: %s", selector, extra=PER_ITEM)
                     break
                 except NoSuchElementException:
                     continue
+            record_selector('linkedin', 'company', selector if company_found else None)
             
             if not company_found:
                 try:
@@ -213,7 +309,7 @@ class LinkedInSeleniumScraper:
                     job_data['company'] = company_elem.text.strip()
                 except NoSuchElementException:
                     job_data['company'] = 'Not specified'
-                    print("⚠️ Company not found")
+                    logger.warning("⚠️ Company not found", extra=PER_ITEM)
             
             # Location - Try multiple selectors
             location_selectors = [
@@ -230,6 +326,9 @@ class LinkedInSeleniumScraper:
                     break
                 except NoSuchElementException:
                     job_data['location'] = 'Not specified'
+            else:
+                selector = None
+            record_selector('linkedin', 'location', selector)
             
             # Posted date - Try multiple selectors
             date_selectors = [
@@ -243,9 +342,14 @@ class LinkedInSeleniumScraper:
                 try:
                     date_elem = card.find_element(By.CSS_SELECTOR, selector)
                     job_data['posted_date'] = date_elem.text.strip()
+                    # <time datetime="2025-07-18"> carries the exact date
+                    job_data['posted_on'] = date_elem.get_attribute('datetime')
                     break
                 except NoSuchElementException:
                     job_data['posted_date'] = 'Recently posted'
+            else:
+                selector = None
+            record_selector('linkedin', 'posted_date', selector)
             
             # Try to click on job to get more details
             try:
@@ -277,6 +381,7 @@ class LinkedInSeleniumScraper:
                             break
                         except NoSuchElementException:
                             continue
+                    record_selector('linkedin', 'salary', selector if salary_found else None)
                     
                     if not salary_found:
                         job_data['salary'] = 'Not disclosed'
@@ -292,12 +397,12 @@ class LinkedInSeleniumScraper:
                     for selector in desc_selectors:
                         try:
                             desc_elem = self.driver.find_element(By.CSS_SELECTOR, selector)
-                            description = desc_elem.text.strip()
-                            job_data['description'] = description[:300] + '...' if len(description) > 300 else description
+                            job_data['description'] = desc_elem.text.strip()
                             desc_found = True
                             break
                         except NoSuchElementException:
                             continue
+                    record_selector('linkedin', 'description', selector if desc_found else None)
                     
                     if not desc_found:
                         job_data['description'] = 'No description available'
@@ -318,38 +423,43 @@ class LinkedInSeleniumScraper:
                             break
                         except NoSuchElementException:
                             continue
+                    record_selector('linkedin', 'experience', selector if exp_found else None)
                     
                     if not exp_found:
                         job_data['experience_required'] = 'Not specified'
                     
                 except Exception as e:
-                    print(f"⚠️ Error extracting additional details: {e}")
+                    logger.warning("⚠️ Error extracting additional details: %s", e, extra=PER_ITEM)
                     job_data['salary'] = 'Not disclosed'
                     job_data['description'] = 'No description available'
                     job_data['experience_required'] = 'Not specified'
                     
             except Exception as e:
-                print(f"⚠️ Could not click on job card: {e}")
+                logger.warning("⚠️ Could not click on job card: %s", e, extra=PER_ITEM)
                 job_data['salary'] = 'Not disclosed'
                 job_data['description'] = 'No description available'
                 job_data['experience_required'] = 'Not specified'
             
             # Additional fields
+            scraped_at = datetime.now()
+            posted_on = resolve_posted(job_data.get('posted_on') or job_data.get('posted_date'), scraped_at)
             job_data.update({
                 'job_type': self.determine_job_type(job_data.get('title', ''), job_data.get('description', '')),
+                'posted_on': posted_on.isoformat() if posted_on else None,
                 'source': 'LinkedIn.com',
-                'scraped_at': datetime.now().isoformat()
+                'scraped_at': scraped_at.isoformat()
             })
             
             # Validate that we have essential data
             if job_data.get('title') and job_data.get('company'):
                 return job_data
             else:
-                print(f"❌ Missing essential data - Title: {job_data.get('title')}, Company: {job_data.get('company')}")
+                logger.warning("❌ Missing essential data - Title: %s, Company: %s", job_data.get('title'), job_data.get('company'),
+                               extra=PER_ITEM)
                 return None
             
         except Exception as e:
-            print(f"⚠️ Error extracting LinkedIn job: {e}")
+            logger.warning("⚠️ Error extracting LinkedIn job: %s", e, extra=PER_ITEM)
             return None
     
     def determine_job_type(self, title, description):
@@ -368,72 +478,96 @@ class LinkedInSeleniumScraper:
     def save_jobs(self, jobs, filename):
         """Save jobs to JSON file without summary"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(jobs, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ Saved {len(jobs)} jobs to {filename}")
+            with span('save', source='linkedin', jobs=len(jobs)):
+                with span('normalize'):
+                    tag_jobs(jobs)
+                    store_descriptions(jobs, DESCRIPTION_PREVIEW_CHARS)
+                with span('persist', target='json'):
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        json.dump(jobs, f, indent=2, ensure_ascii=False)
+                
+                logger.info("✅ Saved %s jobs to %s", len(jobs), filename)
+                with span('persist', target='index'):
+                    index_jobs(jobs)
+                with span('persist', target='corpus'):
+                    append_to_corpus(os.path.splitext(os.path.basename(filename))[0], jobs)
+                with span('persist', target='cdc'):
+                    capture_changes('linkedin', jobs)
             return True
             
         except Exception as e:
-            print(f"❌ Error saving jobs: {e}")
+            logger.error("❌ Error saving jobs: %s", e)
             return False
     
     def print_summary(self, jobs):
         """Print job scraping summary"""
         if not jobs:
-            print("❌ No jobs found!")
+            logger.info("❌ No jobs found!")
             return
         
-        print(f"\n{'='*50}")
-        print(f"📊 LINKEDIN SCRAPING SUMMARY")
-        print(f"{'='*50}")
-        print(f"Total jobs: {len(jobs)}")
+        logger.info("\n" + "=" * 50)
+        logger.info("📊 LINKEDIN SCRAPING SUMMARY")
+        logger.info("=" * 50)
+        logger.info("Total jobs: %s", len(jobs))
         
         if jobs:
-            print(f"\n📝 Sample Jobs:")
+            logger.info("\n📝 Sample Jobs:")
             for i, job in enumerate(jobs[:3]):  # Show 3 sample jobs
-                print(f"\n  Job {i+1}:")
-                print(f"    Title: {job.get('title', 'N/A')}")
-                print(f"    Company: {job.get('company', 'N/A')}")
-                print(f"    Location: {job.get('location', 'N/A')}")
-                print(f"    Salary: {job.get('salary', 'N/A')}")
-                print(f"    Type: {job.get('job_type', 'N/A')}")
-                print(f"    Posted: {job.get('posted_date', 'N/A')}")
+                logger.info("\n  Job %s:", i+1)
+                logger.info("    Title: %s", job.get('title', 'N/A'))
+                logger.info("    Company: %s", job.get('company', 'N/A'))
+                logger.info("    Location: %s", job.get('location', 'N/A'))
+                logger.info("    Salary: %s", job.get('salary', 'N/A'))
+                logger.info("    Type: %s", job.get('job_type', 'N/A'))
+                logger.info("    Posted: %s", job.get('posted_date', 'N/A'))
     
     def close(self):
         """Close the browser"""
         if self.driver:
             self.driver.quit()
 
+@profiled('linkedin')
 def main():
     """Main function to run the LinkedIn scraper"""
     scraper = LinkedInSeleniumScraper(headless=True)  # Set to True for headless mode
+    checkpoint = CheckpointStore('linkedin')
+    serve_metrics()
     
     try:
         # Configuration
         QUERY = "software developer"
         LOCATION = "India"
         PAGES = 2  # Increased for testing
+        MAX_AGE_DAYS = None  # Days; stop paging once a page has nothing newer. None follows every page
         
-        print("🚀 Starting LinkedIn Selenium Scraper")
-        print(f"Query: {QUERY}")
-        print(f"Location: {LOCATION}")
-        print(f"Pages: {PAGES}")
-        print("=" * 50)
+        logger.info("🚀 Starting LinkedIn Selenium Scraper")
+        logger.info("Query: %s", QUERY)
+        logger.info("Location: %s", LOCATION)
+        logger.info("Pages: %s", PAGES)
+        logger.info("=" * 50)
         
         # Scrape jobs
-        jobs = scraper.scrape_linkedin_jobs(QUERY, LOCATION, PAGES)
+        with stage('scrape'):
+            jobs = scraper.scrape_linkedin_jobs(QUERY, LOCATION, PAGES, checkpoint=checkpoint,
+                                                max_age_days=MAX_AGE_DAYS)
         
         if jobs:
-            scraper.save_jobs(jobs, 'outputs/linkedin_jobs.json')
+            with stage('save'):
+                saved = scraper.save_jobs(jobs, 'outputs/linkedin_jobs.json')
+            if saved:
+                checkpoint.clear()
             scraper.print_summary(jobs)
-            print(f"\n🎉 LinkedIn scraping completed!")
-            print(f"📁 Results saved in 'linkedin_jobs.json'")
+            logger.info("\n🎉 LinkedIn scraping completed!")
+            logger.info("📁 Results saved in 'linkedin_jobs.json'")
         else:
-            print("\n❌ No jobs were scraped from LinkedIn!")
-            print("💡 Try running with headless=False to debug the issue")
+            logger.info("\n❌ No jobs were scraped from LinkedIn!")
+            logger.info("💡 Try running with headless=False to debug the issue")
     
     finally:
+        flush_logs()
+        write_report('linkedin')
+        write_trace('linkedin')
+        checkpoint.close()
         scraper.close()
 
 if __name__ == "__main__":
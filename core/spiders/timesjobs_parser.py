@@ -0,0 +1,123 @@
+# Streaming lxml parser for TimesJobs result pages
+#
+# BeautifulSoup builds the whole page (navigation, scripts, footer) before we
+# look at a single card. Here lxml's iterparse walks the document once, only
+# keeps the li.job-bx subtrees long enough to run precompiled XPath queries on
+# them, and drops everything else as soon as it has been parsed. The fields
+# mirror TimesJobsScraper.extract_timesjobs_job exactly.
+from io import BytesIO
+
+from lxml import etree
+
+CARD_CLASS = 'clearfix job-bx wht-shd-bx'
+
+# bs4's get_text() leaves out comments and the text of these elements
+SKIPPED_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+TITLE_XPATH = etree.XPath('(.//h2)[1]')
+TITLE_FALLBACK_XPATH = etree.XPath("(.//a[@target='_blank'])[1]")
+FIRST_LINK_XPATH = etree.XPath('(.//a)[1]')
+COMPANY_XPATH = etree.XPath(f"(.//h3[{_has_class('joblist-comp-name')}])[1]")
+LOCATION_XPATH = etree.XPath("(.//ul[normalize-space(@class)='top-jd-dtl clearfix'])[1]")
+FIRST_LI_XPATH = etree.XPath('(.//li)[1]')
+DETAILS_XPATH = etree.XPath('.//li')
+DESCRIPTION_XPATH = etree.XPath(f"(.//ul[{_has_class('list-job-dtl')}])[1]")
+POSTED_XPATH = etree.XPath(f"(.//span[{_has_class('sim-posted')}])[1]")
+
+
+def _first(xpath, element):
+    found = xpath(element)
+    return found[0] if found else None
+
+
+def get_text(element):
+    """Equivalent of bs4's element.get_text(strip=True)"""
+    parts = []
+    if element.text:
+        parts.append(element.text)
+    for node in element.iterdescendants():
+        if isinstance(node.tag, str) and node.tag not in SKIPPED_TEXT_TAGS and node.text:
+            parts.append(node.text)
+        if node.tail:
+            parts.append(node.tail)
+    return ''.join(part.strip() for part in parts)
+
+
+def is_job_card(element):
+    return element.tag == 'li' and ' '.join(element.get('class', '').split()) == CARD_CLASS
+
+
+def extract_card_fields(card):
+    """Return (job_data, details, description, posted_date) for one card"""
+    job_data = {}
+
+    # Title and Link
+    title_elem = _first(TITLE_XPATH, card)
+    if title_elem is None:
+        title_elem = _first(TITLE_FALLBACK_XPATH, card)
+    if title_elem is not None:
+        title_link = _first(FIRST_LINK_XPATH, title_elem) if title_elem.tag != 'a' else title_elem
+        if title_link is not None:
+            job_data['title'] = get_text(title_link)
+            if title_link.get('href'):
+                job_data['link'] = title_link.get('href')
+
+    # Company
+    company_elem = _first(COMPANY_XPATH, card)
+    if company_elem is not None:
+        company_link = _first(FIRST_LINK_XPATH, company_elem)
+        job_data['company'] = get_text(company_link if company_link is not None else company_elem)
+
+    # Location
+    location_elem = _first(LOCATION_XPATH, card)
+    if location_elem is not None:
+        location_li = _first(FIRST_LI_XPATH, location_elem)
+        if location_li is not None:
+            job_data['location'] = get_text(location_li)
+
+    details = [get_text(li) for li in DETAILS_XPATH(card)]
+
+    desc_elem = _first(DESCRIPTION_XPATH, card)
+    description = get_text(desc_elem) if desc_elem is not None else 'No description available'
+
+    date_elem = _first(POSTED_XPATH, card)
+    posted_date = get_text(date_elem) if date_elem is not None else 'Recently posted'
+
+    return job_data, details, description, posted_date
+
+
+def _release(element):
+    """Free a finished element and the already-processed siblings before it"""
+    element.clear(keep_tail=True)
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+def iter_timesjobs_cards(content):
+    """Yield the raw fields of every job card on a result page, in page order"""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    open_cards = 0
+    for event, element in etree.iterparse(BytesIO(content), events=('start', 'end'),
+                                          html=True, remove_comments=False):
+        if not is_job_card(element):
+            if event == 'end' and open_cards == 0:
+                _release(element)
+            continue
+
+        if event == 'start':
+            open_cards += 1
+            continue
+
+        open_cards -= 1
+        if open_cards == 0:
+            yield extract_card_fields(element)
+            _release(element)
@@ -0,0 +1,110 @@
+# TimesJobs Job Scraper - Scrapy version of TimesJobsScraper
+import scrapy
+from scrapy import Request
+from urllib.parse import urlencode
+
+from core.dates import cutoff_date, page_is_stale
+from core.spiders.TimesJobs_jobs import DESCRIPTION_PREVIEW_CHARS, parse_page
+
+class TimesJobsJobScraper(scrapy.Spider):
+    name = 'timesjobs_jobs'
+    allowed_domains = ['timesjobs.com']
+    base_url = 'https://www.timesjobs.com'
+    description_preview_chars = DESCRIPTION_PREVIEW_CHARS
+    # Read by ChangeCapturePipeline: the same change history as TimesJobs_jobs.py
+    change_source = 'timesjobs'
+    
+    custom_settings = {
+        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'ROBOTSTXT_OBEY': False,
+        'DOWNLOAD_DELAY': 2,
+        'RANDOMIZE_DOWNLOAD_DELAY': True,
+        'CONCURRENT_REQUESTS': 2,
+        'RETRY_TIMES': 3,
+        'FEEDS': {
+            'outputs/scrapedTimes_jobs.json': {
+                'format': 'json',
+                'encoding': 'utf8',
+                'indent': 2,
+            },
+        },
+        'DEFAULT_REQUEST_HEADERS': {
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        }
+    }
+    
+    def __init__(self, query='software developer', location='India', pages=3, max_age_days=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query = query
+        self.location = location
+        self.pages = int(pages)
+        # Defaults to the MAX_POSTING_AGE_DAYS setting
+        self.max_age_days = max_age_days
+        # First page found older than the cutoff; StalePageMiddleware drops the pages after it
+        self.stale_page = None
+    
+    def posting_cutoff(self):
+        max_age = self.max_age_days if self.max_age_days is not None else self.settings.get('MAX_POSTING_AGE_DAYS')
+        return cutoff_date(max_age)
+    
+    def page_request(self, page):
+        params = {
+            'searchType': 'personalizedSearch',
+            'from': 'submit',
+            'txtKeywords': self.query,
+            'txtLocation': self.location,
+            'cboWorkExp1': '0',
+            'sequence': str(page)
+        }
+        return Request(
+            url=f"{self.base_url}/candidate/job-search.html?{urlencode(params)}",
+            callback=self.parse_jobs,
+            meta={'search_term': self.query, 'page': page},
+            headers={'Referer': f'{self.base_url}/'}
+        )
+    
+    def start_requests(self):
+        # All pages at once, so the engine downloads them concurrently; a stale
+        # page cancels the ones after it that haven't been downloaded yet
+        for page in range(1, self.pages + 1):
+            yield self.page_request(page)
+    
+    def parse_jobs(self, response):
+        page = response.meta.get('page')
+        if self.stale_page is not None and page > self.stale_page:
+            # Downloaded before the stale page was parsed
+            return
+        self.logger.info("Parsing TimesJobs page %s from: %s", page, response.url)
+        
+        # Card extraction is shared with the standalone requests-based scraper
+        jobs = parse_page(response.body)
+        if jobs is None:
+            self.logger.warning("No jobs found on page %s", page)
+            return
+        
+        self.logger.info("Found %s jobs on page %s", len(jobs), page)
+        for job_data in jobs:
+            yield job_data
+        
+        if page < self.pages and page_is_stale([job['posted_on'] for job in jobs], self.posting_cutoff()):
+            self.logger.info("Stopping after page %s: newest posting is older than the cutoff", page)
+            self.stale_page = min(page, self.stale_page or page)
+
+# Run the scraper
+if __name__ == '__main__':
+    from scrapy.crawler import CrawlerProcess
+    
+    process = CrawlerProcess()
+    
+    print("🚀 Starting TimesJobs Job Scraper...")
+    
+    process.crawl(TimesJobsJobScraper)
+    process.start()
+    
+    print("\n✅ Scraping completed!")
+    print("📁 Check outputs/scrapedTimes_jobs.json")
@@ -0,0 +1,425 @@
+# Stage tracing across the scrapers: fetch -> render -> extract -> normalize -> persist
+#
+# A trace follows one unit of work (a result page, a feed, a save) through
+# whatever runs it: the Twisted reactor, a WebDriver session, a requests
+# worker thread or an asyncio task. Spans nest through a contextvar, so
+# threads started with asyncio.to_thread and code called inside a span pick
+# up their parent on their own; Scrapy requests carry theirs in request.meta.
+# Every span carries the source plus whatever the call site knows (query,
+# page, url, ...); children inherit the source of their parent.
+#
+# Off unless SCRAPER_TRACE is set (or core.run_all --trace): span() then hands
+# back a shared no-op. SCRAPER_TRACE=1 traces everything; a fraction such as
+# SCRAPER_TRACE=0.05 traces that share of the traces, decided once at the
+# root span, so an unsampled page costs a contextvar lookup per span.
+#
+# At the end of a run the spans go to outputs/traces/<source>-<ts>.json in
+# Chrome trace event format (chrome://tracing, https://ui.perfetto.dev), and
+# the critical path of every trace is summarized per stage: which stages
+# the end-to-end latency actually waited on, rather than which ran longest.
+#
+#   SCRAPER_TRACE=1 python -m core.spiders.TimesJobs_jobs
+#   python -m core.tracing outputs/traces/timesjobs-20250720-101500.json
+import argparse
+import contextvars
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_TRACE_DIR = 'outputs/traces'
+
+_current = contextvars.ContextVar('trace_span', default=None)
+_ids = itertools.count(1)
+
+
+def trace_rate():
+    """Share of traces to record, from $SCRAPER_TRACE (0 when unset)"""
+    value = os.environ.get('SCRAPER_TRACE', '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return 0.0
+    if value in ('true', 'yes', 'on'):
+        return 1.0
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        print(f"⚠️ Could not read SCRAPER_TRACE={value!r}, tracing everything")
+        return 1.0
+
+
+class NoSpan:
+    """Stands in for a span that is not recorded"""
+
+    sampled = False
+    source = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        return self
+
+    def finish(self):
+        pass
+
+
+NO_SPAN = NoSpan()
+
+
+class UnsampledRoot(NoSpan):
+    """Root of a trace the sampler skipped; its children see it and skip too"""
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        return False
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'source', 'attrs', 'trace_id', 'span_id', 'parent_id',
+                 'start', 'end', 'tid', 'concurrent', '_token')
+    sampled = True
+
+    def __init__(self, tracer, name, parent, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.source = attrs.pop('source', None) or (parent.source if parent else None)
+        self.attrs = attrs
+        self.span_id = next(_ids)
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.parent_id = parent.span_id if parent else None
+        self.tid = threading.get_native_id()
+        # Shares its thread with other spans that are not its children
+        self.concurrent = False
+        self.end = None
+        self.start = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.perf_counter()
+            with self.tracer.lock:
+                self.tracer.spans.append(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.finish()
+        _current.reset(self._token)
+        return False
+
+
+class Tracer:
+    """Finished spans of this process, until write_trace() takes them"""
+
+    def __init__(self, rate=1.0):
+        self.rate = rate
+        # Spans finish on many threads
+        self.spans = []
+        self.lock = threading.Lock()
+        self.epoch = time.perf_counter()
+        self.wall_epoch = time.time()
+        self.thread_names = {}
+
+    def start(self, name, parent, attrs):
+        if parent is None:
+            if self.rate < 1.0 and random.random() >= self.rate:
+                return UnsampledRoot()
+        elif not parent.sampled:
+            return NO_SPAN
+        span = Span(self, name, parent, attrs)
+        if span.tid not in self.thread_names:
+            self.thread_names[span.tid] = threading.current_thread().name
+        return span
+
+    def take(self, sources=None):
+        """Remove and return the finished spans, only those of `sources` if given"""
+        with self.lock:
+            spans, self.spans = self.spans, []
+            if sources is None:
+                return spans
+            self.spans.extend(span for span in spans if span.source not in sources)
+            return [span for span in spans if span.source in sources]
+
+
+_tracer = Tracer(trace_rate()) if trace_rate() else None
+_tracer_lock = threading.Lock()
+
+
+def enable_tracing(rate=1.0):
+    """Turn tracing on for this process (what SCRAPER_TRACE does at import)"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(rate)
+        else:
+            _tracer.rate = rate
+    return _tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+def span(name, parent=None, **attrs):
+    """A span to use as a context manager; the current span is its parent"""
+    tracer = _tracer
+    if tracer is None:
+        return NO_SPAN
+    return tracer.start(name, parent if parent is not None else _current.get(), attrs)
+
+
+def start_span(name, parent=None, **attrs):
+    """A span for work that interleaves with other work on its thread
+
+    Scrapy requests (ended by an explicit finish()) and asyncio tasks (used as
+    a context manager) both overlap unrelated spans on the one event loop
+    thread; these spans get a track of their own in the timeline.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NO_SPAN
+    started = tracer.start(name, parent if parent is not None else _current.get(), attrs)
+    if started.sampled:
+        started.concurrent = True
+    return started
+
+
+def current_span():
+    return _current.get() or NO_SPAN
+
+
+# --- Chrome trace event format -----------------------------------------------
+
+def chrome_events(spans, tracer):
+    pid = os.getpid()
+    events = []
+    for tid in sorted({span.tid for span in spans}):
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                       'args': {'name': tracer.thread_names.get(tid, str(tid))}})
+    for span in sorted(spans, key=lambda s: s.start):
+        args = dict(span.attrs, trace=span.trace_id, span=span.span_id)
+        if span.parent_id:
+            args['parent'] = span.parent_id
+        ts = (span.start - tracer.epoch) * 1e6
+        base = {'name': span.name, 'cat': span.source or 'scrape', 'pid': pid, 'tid': span.tid}
+        if not span.concurrent:
+            events.append(dict(base, ph='X', ts=ts, dur=(span.end - span.start) * 1e6, args=args))
+        else:
+            # An async track per trace
+            events.append(dict(base, ph='b', ts=ts, id=hex(span.trace_id), args=args))
+            events.append(dict(base, ph='e', ts=(span.end - tracer.epoch) * 1e6, id=hex(span.trace_id)))
+    return events
+
+
+# --- Critical path -------------------------------------------------------------
+
+def stage_label(name, attrs):
+    target = attrs.get('target')
+    return f"{name}:{target}" if target else name
+
+
+def critical_path(span, children):
+    """[(stage, seconds)] that `span` waited on, walking back from its end
+
+    Each step takes the child that finished last before the current point,
+    then continues from that child's start. Time no child covers is the
+    span's own ("page (own)"): in a Scrapy page, the wait between the
+    download and the callback.
+    """
+    path = []
+    cursor = span['end']
+    kids = children.get(span['id'], ())
+    own = f"{span['stage']} (own)" if kids else span['stage']
+    for child in sorted(kids, key=lambda c: c['end'], reverse=True):
+        if child['end'] > cursor or child['start'] < span['start']:
+            continue
+        if cursor > child['end']:
+            path.append((own, cursor - child['end']))
+        path.extend(critical_path(child, children))
+        cursor = child['start']
+    if cursor > span['start']:
+        path.append((own, cursor - span['start']))
+    return path
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+def summarize(records):
+    """Per-stage durations and critical-path time over all traces in `records`
+
+    Records are dicts with id, parent, trace, stage, start and end (seconds).
+    A span whose parent was not recorded counts as a root.
+    """
+    ids = {record['id'] for record in records}
+    children = {}
+    roots = []
+    for record in records:
+        if record['parent'] in ids:
+            children.setdefault(record['parent'], []).append(record)
+        else:
+            roots.append(record)
+
+    stages = {}
+    for record in records:
+        stage = stages.setdefault(record['stage'], {'spans': 0, 'durations': [], 'critical': 0.0})
+        stage['spans'] += 1
+        stage['durations'].append(record['end'] - record['start'])
+    empty = {'spans': 0, 'durations': [], 'critical': 0.0}
+
+    traces = {}
+    slowest = None
+    for root in roots:
+        path = critical_path(root, children)
+        for stage, seconds in path:
+            stages.setdefault(stage, dict(empty, durations=[]))['critical'] += seconds
+        traces[root['stage']] = traces.get(root['stage'], 0) + 1
+        total = root['end'] - root['start']
+        if slowest is None or total > slowest[0]:
+            slowest = (total, root, path)
+
+    critical_total = sum(stage['critical'] for stage in stages.values()) or 1.0
+    summary = {
+        'traces': traces,
+        'stages': {
+            name: {
+                'spans': stage['spans'],
+                'p50_ms': round(percentile(stage['durations'], 0.5) * 1000, 2),
+                'p95_ms': round(percentile(stage['durations'], 0.95) * 1000, 2),
+                'critical_s': round(stage['critical'], 4),
+                'critical_share': round(stage['critical'] / critical_total, 4),
+            }
+            for name, stage in sorted(stages.items(), key=lambda item: -item[1]['critical'])
+        },
+    }
+    if slowest:
+        total, root, path = slowest
+        merged = []
+        for stage, seconds in reversed(path):
+            if seconds < 0.0005:
+                # Bookkeeping between two children
+                continue
+            if merged and merged[-1][0] == stage:
+                merged[-1][1] += seconds
+            else:
+                merged.append([stage, seconds])
+        summary['slowest'] = {
+            'trace': root['trace'], 'stage': root['stage'], 'seconds': round(total, 4),
+            'attrs': root.get('attrs', {}),
+            'path': [[stage, round(seconds * 1000, 2)] for stage, seconds in merged],
+        }
+    return summary
+
+
+def span_records(spans):
+    return [{'id': span.span_id, 'parent': span.parent_id, 'trace': span.trace_id,
+             'stage': stage_label(span.name, span.attrs), 'start': span.start, 'end': span.end,
+             'attrs': span.attrs}
+            for span in spans]
+
+
+def event_records(events):
+    """Rebuild span records from a trace file's events"""
+    records = []
+    # (trace id, name) -> async spans begun and not yet ended
+    open_async = {}
+    for event in events:
+        if event.get('ph') not in ('X', 'b', 'e'):
+            continue
+        key = (event.get('id'), event['name'])
+        if event['ph'] == 'e':
+            if open_async.get(key):
+                open_async[key].pop()['end'] = event['ts'] / 1e6
+            continue
+        args = dict(event.get('args', {}))
+        span_id, trace_id, parent = args.pop('span'), args.pop('trace'), args.pop('parent', None)
+        start = event['ts'] / 1e6
+        record = {'id': span_id, 'parent': parent, 'trace': trace_id,
+                  'stage': stage_label(event['name'], args), 'start': start,
+                  'end': start + event['dur'] / 1e6 if event['ph'] == 'X' else None, 'attrs': args}
+        if event['ph'] == 'b':
+            open_async.setdefault(key, []).append(record)
+        records.append(record)
+    return [record for record in records if record['end'] is not None]
+
+
+def print_summary(summary):
+    traces = ', '.join(f"{count} {name}" for name, count in summary['traces'].items())
+    print(f"\n🧭 Critical path over {sum(summary['traces'].values())} traces ({traces})")
+    print(f"{'Stage':<18}{'Spans':>7}{'p50 ms':>10}{'p95 ms':>10}{'On path s':>11}{'Share':>8}")
+    for name, stage in summary['stages'].items():
+        if stage['spans']:
+            print(f"{name:<18}{stage['spans']:>7}{stage['p50_ms']:>10.1f}{stage['p95_ms']:>10.1f}"
+                  f"{stage['critical_s']:>11.3f}{stage['critical_share']:>8.1%}")
+        else:
+            print(f"{name:<18}{'-':>7}{'-':>10}{'-':>10}{stage['critical_s']:>11.3f}{stage['critical_share']:>8.1%}")
+    slowest = summary.get('slowest')
+    if slowest:
+        attrs = ' '.join(f"{key}={value}" for key, value in slowest['attrs'].items())
+        path = ' → '.join(f"{stage} {ms:.0f}ms" for stage, ms in slowest['path'])
+        print(f"🐢 Slowest {slowest['stage']} ({slowest['seconds'] * 1000:.0f} ms{', ' + attrs if attrs else ''}):")
+        print(f"   {path}")
+
+
+def write_trace(name, sources=None, directory=DEFAULT_TRACE_DIR):
+    """Write this run's spans (those of `sources`, if given) and their summary
+
+    Never fails the scrape; returns the path, or None when tracing is off or
+    nothing was traced.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return None
+    try:
+        spans = tracer.take(sources)
+        if not spans:
+            return None
+        summary = summarize(span_records(spans))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': chrome_events(spans, tracer), 'displayTimeUnit': 'ms',
+                       'otherData': {'source': name, 'sample_rate': tracer.rate,
+                                     'started': datetime.fromtimestamp(tracer.wall_epoch).isoformat()},
+                       'summary': summary},
+                      f, ensure_ascii=False, default=str)
+        print_summary(summary)
+        print(f"🧵 Trace saved to {path} (open in https://ui.perfetto.dev)")
+        return path
+    except Exception as e:
+        print(f"⚠️ Could not write trace: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical-path summary of trace files")
+    parser.add_argument('traces', nargs='+', help='trace files written by a traced run')
+    args = parser.parse_args()
+    for path in args.traces:
+        with open(path, encoding='utf-8') as f:
+            trace = json.load(f)
+        print(f"\n🧵 {path}")
+        print_summary(summarize(event_records(trace['traceEvents'])))
+
+
+if __name__ == '__main__':
+    main()